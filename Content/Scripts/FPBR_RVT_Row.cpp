@@ -18,6 +18,15 @@ struct FPBR_RVT_Row : public FTableRowBase
     UPROPERTY(EditAnywhere, BlueprintReadWrite)
     float UV_Scale = 1.0f;
 
+    UPROPERTY(EditAnywhere, BlueprintReadWrite)
+    float UV_RotateDeg = 0.0f;
+
+    UPROPERTY(EditAnywhere, BlueprintReadWrite)
+    float UV_OffsetU = 0.0f;
+
+    UPROPERTY(EditAnywhere, BlueprintReadWrite)
+    float UV_OffsetV = 0.0f;
+
     UPROPERTY(EditAnywhere, BlueprintReadWrite)
     float RoughnessOverride = -1.0f;
 
@@ -0,0 +1,177 @@
+# Builder benchmarks against the recording fake_unreal (no editor needed, runs on plain CI).
+#   cd Content && python -m Scripts.benchmark_pipeline [--case NAME] [--repeat N] [--verbose] [--write-baseline] [--wall]
+# Every case counts the `unreal` API calls it makes (expression creates, connects, recompiles, saves, ...)
+# and times itself. Call counts may not grow over Config/benchmark_baseline.json. The baseline wall times
+# come from whichever machine wrote it, so they are only checked with --wall (same machine): then they
+# may grow by `wall_tolerance` (plus `wall_slack_ms`, so tiny cases don't flap).
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from Scripts import fake_unreal
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "Config"
+NAMING_PATH = CONFIG_DIR / "naming.json"
+BASELINE_PATH = CONFIG_DIR / "benchmark_baseline.json"
+DEFAULT_REPEAT = 5
+WALL_TOLERANCE = 0.5
+WALL_SLACK_MS = 5.0
+
+# Summary columns: label -> library calls summed into it
+COLUMNS = {
+    "create": ("MaterialEditingLibrary.create_material_expression",
+               "MaterialEditingLibrary.create_material_expression_in_function", "Asset.add_expression"),
+    "connect": ("MaterialEditingLibrary.connect_material_expressions", "MaterialEditingLibrary.connect_material_property"),
+    "compile": ("MaterialEditingLibrary.recompile_material", "MaterialEditingLibrary.recompile_material_function",
+                "MaterialEditingLibrary.update_material_instance"),
+    "save": ("EditorAssetLibrary.save_asset", "EditorAssetLibrary.save_loaded_assets"),
+}
+
+# -------------- Cases --------------
+# A case is setup(workdir) -> run(); only run() is measured
+def _pipeline(workdir, naming=None):
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    naming = dict(naming or json.loads(NAMING_PATH.read_text(encoding="utf-8")))
+    config = Path(workdir) / f"naming_{naming['root'].strip('/').replace('/', '_')}.json"
+    config.write_text(json.dumps(naming), encoding="utf-8")
+    manifest = config.with_suffix(".manifest.json")
+
+    def run():
+        pipeline.CONFIG_PATH = config
+        pipeline.MANIFEST_PATH = manifest
+        return pipeline.main(force=True)
+    return run
+
+def case_pipeline(workdir):
+    # Cold build of the configured pipeline
+    return _pipeline(workdir)
+
+def case_pipeline_rebuild(workdir):
+    # Forced rebuild over existing assets: every graph diffs empty, nothing recompiles
+    run = _pipeline(workdir)
+    run()
+    fake_unreal.stats.clear()
+    return run
+
+def case_pipelines_x16(workdir):
+    # Synthetic large config: 16 independent pipeline roots in one session
+    base = json.loads(NAMING_PATH.read_text(encoding="utf-8"))
+    runs = [_pipeline(workdir, dict(base, root=f"/Game/Bench/P{i:02d}/")) for i in range(16)]
+    return lambda: [run() for run in runs]
+
+def case_instances_1000(workdir):
+    # Synthetic FPBR rows: 1000 instances of the master, created in 64-row chunks
+    from Scripts import bulk_instances
+    _pipeline(workdir)()
+    rows = [{"Name": f"Bench_{i:04d}", "BaseColor": f"/Game/Bench/T/T_{i % 32:02d}_BC", "UV_Scale": 1.0 + i % 4,
+             "bUseRVTRead": i % 2 == 0} for i in range(1000)]
+    source = Path(workdir) / "rows.json"
+    source.write_text(json.dumps(rows), encoding="utf-8")
+    fake_unreal.stats.clear()
+    return lambda: bulk_instances.build_instances(str(source))
+
+def case_texture_import_256(workdir):
+    # 64 synthetic source sets (BaseColor / Normal / ORM / Height) imported in batches and configured
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    from Scripts import texture_import
+    config = Path(workdir) / "naming.json"
+    config.write_text(NAMING_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    src = Path(workdir) / "src"
+    for i in range(64):
+        for suffix in ("_BaseColor", "_N", "_ORM", "_H"):
+            (src / f"Set{i:02d}").mkdir(parents=True, exist_ok=True)
+            (src / f"Set{i:02d}" / f"Set{i:02d}{suffix}.png").touch()
+
+    def run():
+        pipeline.CONFIG_PATH = config
+        return texture_import.import_sets(str(src), str(Path(workdir) / "rows.json"))
+    return run
+
+CASES = {
+    "pipeline": case_pipeline,
+    "pipeline_rebuild": case_pipeline_rebuild,
+    "pipelines_x16": case_pipelines_x16,
+    "instances_1000": case_instances_1000,
+    "texture_import_256": case_texture_import_256,
+}
+
+# -------------- Measure --------------
+def measure(setup, repeat=DEFAULT_REPEAT):
+    # -> {"wall_ms": median over repeats, "calls": {label: count}} (counts are per run, repeat-independent)
+    walls = []
+    calls = {}
+    for _ in range(repeat):
+        fake_unreal.reset()
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            fake_unreal.install(workdir)
+            run = setup(workdir)
+            t0 = time.perf_counter()
+            run()
+            walls.append((time.perf_counter() - t0) * 1000.0)
+        calls = fake_unreal.call_counts()
+    return {"wall_ms": round(statistics.median(walls), 3), "calls": calls}
+
+def run_cases(names, repeat=DEFAULT_REPEAT):
+    fake_unreal.install()
+    return {name: measure(CASES[name], repeat) for name in names}
+
+# -------------- Baseline --------------
+def column_counts(calls):
+    return {col: sum(calls.get(label, 0) for label in labels) for col, labels in COLUMNS.items()}
+
+def check_baseline(results, baseline, wall=False):
+    failures = []
+    tolerance = baseline.get("wall_tolerance", WALL_TOLERANCE)
+    slack = baseline.get("wall_slack_ms", WALL_SLACK_MS)
+    for name, result in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        for label, n in result["calls"].items():
+            old = base["calls"].get(label, 0)
+            if n > old:
+                failures.append(f"{name}: {label} called {n}x, baseline {old}x")
+        limit = base["wall_ms"] * (1.0 + tolerance) + slack
+        if wall and result["wall_ms"] > limit:
+            failures.append(f"{name}: {result['wall_ms']:.1f} ms exceeds {limit:.1f} ms "
+                            f"(baseline {base['wall_ms']:.1f} ms +{tolerance:.0%} +{slack:g} ms)")
+    return failures
+
+def print_summary(results, baseline=None, verbose=False):
+    cases = (baseline or {}).get("cases", {})
+    print(f"{'case':<20}{'wall ms':>10}{'base ms':>10}" + "".join(f"{c:>9}" for c in COLUMNS) + f"{'calls':>8}")
+    for name, result in results.items():
+        base = cases.get(name, {}).get("wall_ms")
+        cols = column_counts(result["calls"])
+        print(f"{name:<20}{result['wall_ms']:>10.1f}" + (f"{base:>10.1f}" if base is not None else f"{'-':>10}")
+              + "".join(f"{cols[c]:>9}" for c in COLUMNS) + f"{sum(result['calls'].values()):>8}")
+        if verbose:
+            for label, n in result["calls"].items():
+                print(f"   {label:<76}{n:>8}")
+
+def main(argv):
+    names = [argv[argv.index("--case") + 1]] if "--case" in argv else list(CASES)
+    repeat = int(argv[argv.index("--repeat") + 1]) if "--repeat" in argv else DEFAULT_REPEAT
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else None
+    results = run_cases(names, repeat)
+    print_summary(results, baseline, verbose="--verbose" in argv)
+    if "--write-baseline" in argv:
+        data = baseline or {"wall_tolerance": WALL_TOLERANCE, "wall_slack_ms": WALL_SLACK_MS, "cases": {}}
+        data["cases"].update(results)
+        BASELINE_PATH.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"baseline written -> {BASELINE_PATH}")
+        return 0
+    if baseline is None:
+        return 0
+    failures = check_baseline(results, baseline, wall="--wall" in argv)
+    for f in failures:
+        print(f"REGRESSION {f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,97 @@
+# Content-hashed build manifest for create_pbr_rvt_pipeline.py.
+# Pure Python (no `unreal` import) so it can be exercised outside the editor.
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+MANIFEST_NAME = "pbr_rvt_build_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def hash_text(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def source_of(func):
+    func = inspect.unwrap(func)  # traced builders hash as their originals
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        # No source on disk (frozen / pasted into the Output Log): fall back to bytecode
+        return func.__code__.co_code.hex()
+
+
+def package_file(content_dir, asset_path):
+    # /Game/Foo/Bar -> <Content>/Foo/Bar.uasset
+    rel = asset_path.replace("//", "/")
+    if rel.startswith("/Game/"):
+        rel = rel[len("/Game/"):]
+    return Path(content_dir) / f"{rel.lstrip('/')}.uasset"
+
+
+def package_fingerprint(content_dir, asset_path):
+    f = package_file(content_dir, asset_path)
+    if not f.is_file():
+        return None
+    return hashlib.sha1(f.read_bytes()).hexdigest()
+
+
+class BuildCache:
+    def __init__(self, manifest_path, content_dir, force=False):
+        self.manifest_path = Path(manifest_path)
+        self.content_dir = content_dir
+        self.force = force
+        self.entries = {}
+        if self.manifest_path.exists():
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except ValueError:
+                data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("assets", {})
+        self.hashes = {}
+
+    def input_hash(self, asset_path, config, sources, deps=()):
+        # Dependency hashes are folded in so a change upstream invalidates everything below it
+        dep_hashes = [f"{d}={self.hashes.get(d, '')}" for d in deps]
+        digest = hash_text(asset_path, json.dumps(config, sort_keys=True), *sources, *dep_hashes)
+        self.hashes[asset_path] = digest
+        return digest
+
+    def is_fresh(self, asset_path, digest):
+        if self.force:
+            return False
+        entry = self.entries.get(asset_path)
+        if not entry or entry.get("hash") != digest:
+            return False
+        pkg = package_fingerprint(self.content_dir, asset_path)
+        if pkg is None or pkg != entry.get("package"):
+            return False
+        self.hashes[asset_path] = entry.get("output", digest)
+        return True
+
+    def keep_output(self, asset_path):
+        # Rebuilt to identical content: dependents keep folding in the previous output hash
+        entry = self.entries.get(asset_path)
+        if entry:
+            self.hashes[asset_path] = entry.get("output", entry["hash"])
+
+    def record(self, asset_path, digest):
+        self.entries[asset_path] = {
+            "hash": digest,
+            "output": self.hashes.get(asset_path, digest),
+            "package": package_fingerprint(self.content_dir, asset_path),
+        }
+
+    def forget(self, asset_path):
+        self.entries.pop(asset_path, None)
+
+    def save(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": MANIFEST_VERSION, "assets": self.entries}
+        self.manifest_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
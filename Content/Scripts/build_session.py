@@ -0,0 +1,79 @@
+# Deferred recompile + batched save for the material builders.
+# Builders only register what they dirtied; finish() compiles each asset once, in dependency order.
+import time
+import unreal
+
+STAGE_FUNCTION = 0   # MaterialFunction: compiled before anything that calls it
+STAGE_MATERIAL = 1   # Material: compiled after its functions
+STAGE_INSTANCE = 2   # MaterialInstanceConstant: updated after its parent
+STAGE_ASSET = 3      # Anything else (RVT, textures): save only
+
+STAGE_NAMES = {STAGE_FUNCTION: "function", STAGE_MATERIAL: "material", STAGE_INSTANCE: "instance", STAGE_ASSET: "asset"}
+
+
+def _compile(asset, stage):
+    mat_lib = unreal.MaterialEditingLibrary
+    if stage == STAGE_FUNCTION:
+        mat_lib.recompile_material_function(asset)
+    elif stage == STAGE_MATERIAL:
+        mat_lib.recompile_material(asset)
+    elif stage == STAGE_INSTANCE:
+        mat_lib.update_material_instance(asset)
+
+
+def _save(assets):
+    unreal.EditorAssetLibrary.save_loaded_assets(assets, only_if_is_dirty=False)
+
+
+class BuildSession:
+    def __init__(self, name="PBR RVT build"):
+        self.name = name
+        self.dirty = {}
+        self.timings = []
+        self.finished = []
+
+    def register(self, asset, path, stage):
+        # Re-registering keeps the first slot so registration order stays the tie-breaker
+        if path in self.dirty:
+            self.dirty[path] = (self.dirty[path][0], stage, asset)
+        else:
+            self.dirty[path] = (len(self.dirty), stage, asset)
+        return asset
+
+    def ordered(self):
+        items = sorted(self.dirty.items(), key=lambda kv: (kv[1][1], kv[1][0]))
+        return [(path, stage, asset) for path, (_, stage, asset) in items]
+
+    def steps(self):
+        # Generator form of finish(): yields each path after its compile, then None after the save
+        ordered = self.ordered()
+        for path, stage, asset in ordered:
+            t0 = time.perf_counter()
+            _compile(asset, stage)
+            self.timings.append((path, STAGE_NAMES[stage], time.perf_counter() - t0))
+            yield path
+
+        if ordered:
+            t0 = time.perf_counter()
+            _save([asset for _, _, asset in ordered])
+            self.timings.append((f"save ({len(ordered)} packages)", "save", time.perf_counter() - t0))
+
+        self.dirty = {}
+        self.finished = [path for path, _, _ in ordered]
+        yield None
+
+    def finish(self, report=True):
+        for _ in self.steps():
+            pass
+        if report:
+            self.report()
+        return self.finished
+
+    def report(self):
+        if not self.timings:
+            return
+        width = max(len(p) for p, _, _ in self.timings)
+        print(f"{self.name}: compile/save timings")
+        for path, kind, dt in self.timings:
+            print(f"   {path:<{width}}  {kind:<8}  {dt * 1000.0:9.1f} ms")
+        print(f"   {'total':<{width}}  {'':<8}  {sum(t for _, _, t in self.timings) * 1000.0:9.1f} ms")
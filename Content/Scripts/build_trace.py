@@ -0,0 +1,171 @@
+# Opt-in span tracing for pipeline builds: Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev)
+# plus a summary table. Pure Python; nothing is wrapped unless tracing() is active, so a normal build
+# pays nothing for it.
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Tracer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.events = []
+        self.stack = []      # [name, cat, start, child seconds, args]
+        self.totals = {}     # (cat, name) -> [count, total s, self s]
+
+    # -------------- Spans --------------
+    def begin(self, name, cat, args=None):
+        self.stack.append([name, cat, time.perf_counter(), 0.0, args])
+
+    def end(self):
+        name, cat, start, children, args = self.stack.pop()
+        dur = time.perf_counter() - start
+        if self.stack:
+            self.stack[-1][3] += dur
+        row = self.totals.setdefault((cat, name), [0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += dur
+        row[2] += dur - children
+        event = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                 "ts": (start - self.t0) * 1e6, "dur": dur * 1e6}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat="build", args=None):
+        self.begin(name, cat, args)
+        try:
+            yield
+        finally:
+            self.end()
+
+    # -------------- Wrapping --------------
+    def wrap(self, fn, name, cat):
+        if inspect.isgeneratorfunction(fn):
+            # One span per resume, so time spent between yields (editor ticks) is not counted
+            @functools.wraps(fn)
+            def traced_gen(*args, **kwargs):
+                gen = fn(*args, **kwargs)
+                value = None
+                try:
+                    while True:
+                        self.begin(name, cat)
+                        try:
+                            label = gen.send(value)
+                        except StopIteration as stop:
+                            return stop.value
+                        finally:
+                            self.end()
+                        value = yield label
+                finally:
+                    gen.close()
+            return traced_gen
+
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            self.begin(name, cat)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.end()
+        return traced
+
+    def wrap_library(self, library, cat):
+        return _TracedLibrary(self, library, cat)
+
+    # -------------- Output --------------
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"traceEvents": sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+        path.write_text(json.dumps(payload), encoding="utf-8")
+
+    def summary(self):
+        # [(cat, name, count, total ms, self ms)], most self time first
+        rows = [(cat, name, n, total * 1000.0, own * 1000.0) for (cat, name), (n, total, own) in self.totals.items()]
+        return sorted(rows, key=lambda r: -r[4])
+
+    def print_summary(self, title="Build trace"):
+        rows = self.summary()
+        if not rows:
+            return
+        width = max(len(name) for _, name, *_ in rows)
+        print(f"{title}: {len(self.events)} spans")
+        print(f"   {'span':<{width}}  {'cat':<8}{'count':>7}{'total ms':>11}{'self ms':>11}{'mean ms':>10}")
+        for cat, name, n, total, own in rows:
+            print(f"   {name:<{width}}  {cat:<8}{n:>7}{total:>11.2f}{own:>11.2f}{total / n:>10.3f}")
+
+
+class _TracedLibrary:
+    # Stand-in for MaterialEditingLibrary / EditorAssetLibrary: every call becomes a span
+    def __init__(self, tracer, library, cat):
+        self._tracer = tracer
+        self._library = library
+        self._cat = cat
+        self._name = getattr(library, "__name__", type(library).__name__)
+
+    def __getattr__(self, attr):
+        value = getattr(self._library, attr)
+        if callable(value):
+            value = self._tracer.wrap(value, f"{self._name}.{attr}", self._cat)
+            setattr(self, attr, value)
+        return value
+
+
+def instrument(tracer, targets):
+    # targets: [(module, attribute names, category)] -> restore list
+    saved = []
+    for module, names, cat in targets:
+        for name in names:
+            original = getattr(module, name)
+            if inspect.isfunction(original):
+                traced = tracer.wrap(original, name.lstrip("_"), cat)
+            else:
+                traced = tracer.wrap_library(original, cat)
+            saved.append((module, name, original))
+            setattr(module, name, traced)
+    return saved
+
+def restore(saved):
+    for module, name, original in reversed(saved):
+        setattr(module, name, original)
+
+class TraceSession:
+    # tracing() in steps, for a build that runs across editor ticks and can sit cancelled in between:
+    # the targets are wrapped only between start() and pause(), the trace is written once by finish()
+    def __init__(self, path, targets, title="Build trace"):
+        self.path = path
+        self.targets = targets
+        self.title = title
+        self.tracer = Tracer()
+        self._saved = None
+
+    def start(self):
+        if self._saved is None:
+            self._saved = instrument(self.tracer, self.targets)
+        return self.tracer
+
+    def pause(self):
+        if self._saved is not None:
+            restore(self._saved)
+            self._saved = None
+
+    def finish(self):
+        self.pause()
+        self.tracer.write(self.path)
+        self.tracer.print_summary(self.title)
+        print(f"   trace -> {self.path}")
+
+@contextmanager
+def tracing(path, targets, title="Build trace"):
+    session = TraceSession(path, targets, title)
+    try:
+        yield session.start()
+    finally:
+        session.finish()
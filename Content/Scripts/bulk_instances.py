@@ -0,0 +1,125 @@
+# Run in Unreal Editor: Output Log -> `py Scripts/bulk_instances.py <rows.csv | rows.json | /Game/Path/DT_Rows> [chunk_size]`
+# Creates or updates one MaterialInstanceConstant of M_PBR_Master per FPBR_RVT_Row.
+import sys
+import time
+import unreal
+from pathlib import Path
+
+from Scripts import create_pbr_rvt_pipeline as pipeline
+from Scripts.build_session import BuildSession, STAGE_INSTANCE
+from Scripts.pbr_rows import ROW_FIELDS, iter_file_rows, normalize_row, uv_affine_rows
+
+DEFAULT_CHUNK = 64
+INSTANCE_PREFIX = "MI_"
+
+# FPBR_RVT_Row field -> M_PBR_Master parameter
+TEXTURE_PARAMS = {
+    "BaseColor": "BaseColor_Tex",
+    "Normal": "Normal_Tex",
+    "ORM": "ORM_Tex",
+    "Height": "Height_Tex",
+}
+SCALAR_PARAMS = {
+    "RoughnessOverride": "Roughness_Override",
+}
+SWITCH_PARAMS = {
+    "bUseRVTRead": "Use_RVT_Read",
+    "bUseRVTWrite": "Use_RVT_Write",
+}
+
+mat_lib = unreal.MaterialEditingLibrary
+ed_lib = unreal.EditorAssetLibrary
+
+# -------------- Row sources --------------
+def iter_datatable_rows(asset_path):
+    table = unreal.load_asset(asset_path)
+    dt_lib = unreal.DataTableFunctionLibrary
+    names = [str(n) for n in dt_lib.get_data_table_row_names(table)]
+    columns = {field: dt_lib.get_data_table_column_as_string(table, field) for field in ROW_FIELDS}
+    for i, name in enumerate(names):
+        yield name, normalize_row({field: values[i] for field, values in columns.items()})
+
+def iter_rows(source):
+    if Path(source).suffix.lower() in (".csv", ".json"):
+        return iter_file_rows(source)
+    return iter_datatable_rows(source)
+
+# -------------- Instances --------------
+class TextureCache:
+    def __init__(self):
+        self.loaded = {}
+
+    def get(self, path):
+        if path not in self.loaded:
+            self.loaded[path] = unreal.load_asset(path) if path else None
+        return self.loaded[path]
+
+def get_or_create_instance(folder, name, parent):
+    path = f"{folder}/{name}"
+    if ed_lib.does_asset_exist(path):
+        mi = ed_lib.load_asset(path)
+    else:
+        factory = unreal.MaterialInstanceConstantFactoryNew()
+        mi = pipeline.asset_tools.create_asset(name, folder, unreal.MaterialInstanceConstant, factory)
+    if mi.get_editor_property("parent") != parent:
+        mat_lib.set_material_instance_parent(mi, parent)
+    return path, mi
+
+def apply_row(mi, row, textures):
+    for field, param in TEXTURE_PARAMS.items():
+        if field == "Height" and pipeline.HEIGHT_PACKINGS[pipeline.HEIGHT_PACKING] is not None:
+            continue  # packed into ORM/BaseColor alpha, the master has no Height_Tex
+        tex = textures.get(row[field])
+        if tex is not None:
+            mat_lib.set_material_instance_texture_parameter_value(mi, param, tex)
+    for field, param in SCALAR_PARAMS.items():
+        mat_lib.set_material_instance_scalar_parameter_value(mi, param, row[field])
+    apply_uv(mi, row)
+    for field, param in SWITCH_PARAMS.items():
+        mat_lib.set_material_instance_static_switch_parameter_value(mi, param, row[field])
+
+def apply_uv(mi, row):
+    uv = (row["UV_Scale"], row["UV_RotateDeg"], row["UV_OffsetU"], row["UV_OffsetV"])
+    if pipeline.UV_AFFINE_FOLDING:
+        # Folded once here instead of per vertex / pixel: MF_UVBlock_PBR only applies the matrix
+        row_u, row_v = uv_affine_rows(*uv)
+        mat_lib.set_material_instance_vector_parameter_value(mi, "UV_AffineU", unreal.LinearColor(*row_u, 0.0))
+        mat_lib.set_material_instance_vector_parameter_value(mi, "UV_AffineV", unreal.LinearColor(*row_v, 0.0))
+        return
+    mat_lib.set_material_instance_scalar_parameter_value(mi, "UV_Scale", uv[0])
+    mat_lib.set_material_instance_scalar_parameter_value(mi, "UV_RotateDeg", uv[1])
+    mat_lib.set_material_instance_vector_parameter_value(mi, "UV_Offset", unreal.LinearColor(uv[2], uv[3], 0.0, 0.0))
+
+def build_instances(source, chunk_size=DEFAULT_CHUNK, folder=None):
+    data = pipeline.load_config()
+    folder = folder or f"{pipeline.ROOT}/{data.get('mi_folder', 'Instances')}"
+    pipeline.ensure_folder(folder)
+    parent = unreal.load_object(None, pipeline.MASTER_MAT)
+    textures = TextureCache()
+
+    session = BuildSession(f"MI bulk ({folder})")
+    count = 0
+    t0 = time.perf_counter()
+    for name, row in iter_rows(source):
+        if not name:
+            unreal.log_warning(f"bulk_instances: skipping unnamed row {count}")
+            continue
+        path, mi = get_or_create_instance(folder, f"{INSTANCE_PREFIX}{name}", parent)
+        apply_row(mi, row, textures)
+        session.register(mi, path, STAGE_INSTANCE)
+        count += 1
+        if len(session.dirty) >= chunk_size:
+            # One update per instance and one batched save per chunk
+            session.finish(report=False)
+            print(f"   {count} rows ({count / (time.perf_counter() - t0):.1f} rows/s)")
+    session.finish(report=False)
+
+    dt = time.perf_counter() - t0
+    print(f"MI bulk: {count} instances in {dt:.2f}s ({count / dt if dt > 0 else 0.0:.1f} rows/s) -> {folder}")
+    return count
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: bulk_instances.py <rows.csv | rows.json | /Game/Path/DT_Rows> [chunk_size]")
+    else:
+        build_instances(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK)
@@ -1,5 +1,7 @@
-# Run in Unreal Editor: Window -> Developer Tools -> Output Log -> `py Scripts/create_pbr_rvt_pipeline.py`
+# Run in Unreal Editor: Window -> Developer Tools -> Output Log -> `py Scripts/create_pbr_rvt_pipeline.py [--force] [--trace out.json]`
+import inspect
 import json
+import sys
 import unreal
 from pathlib import Path
 
@@ -10,11 +12,48 @@ MF_RVT = f"{ROOT}/MF_RVT_Read"
 MASTER_MAT = f"{ROOT}/M_PBR_Master"
 MI_BASE = f"{ROOT}/MI_PBR_Base"
 RVT_ASSET = f"{ROOT}/T_VT_PBR_Master"
+LAYERS_MAT = f"{ROOT}/M_PBR_Layers"
+# Texture2DArrays from texture_arrays.py: <LAYER_ARRAYS>_BaseColor / _Normal / _ORMH
+LAYER_ARRAYS = f"{ROOT}/Layers/TA_PBR_Layers"
+
+# M_PBR_Layers: layers blended from Texture2DArrays (LAYER_MAX in LAYER_WEIGHTS_HLSL)
+LAYER_COUNT = 4
+LAYER_MAX = 8
+
+# Where Height lives: its own Height_Tex ("none") or packed into the alpha of ORM/BaseColor
+HEIGHT_PACKINGS = {"none": None, "orm_alpha": "ORM_Tex", "basecolor_alpha": "BaseColor_Tex"}
+HEIGHT_PACKING = "none"
+
+# Per-vertex terms (UV transform, slope/vertex-color weight) go through VertexInterpolators: evaluated
+# in the vertex shader and interpolated instead of recomputed per pixel. Opt-in: the slope then comes
+# from the vertex normal instead of PixelNormalWS, which changes the look; off builds the per-pixel graph
+VERTEX_INTERPOLATORS = False
+
+# Scale / rotation / offset folded per instance into a 2x3 matrix (pbr_rows.uv_affine_rows, two vector
+# parameters): MF_UVBlock_PBR does one multiply-add instead of the scale + Rotate2D (sin, cos) + offset chain
+UV_AFFINE_FOLDING = False
+
+# One variant per project, built into the graph instead of chosen by static bools (TRIPLANAR_MODES and
+# NORMAL_BLENDS below): Use_Triplanar picks projection on/off, the projection itself is fixed
+TRIPLANAR_MODE = "full"
+NORMAL_BLEND = "ac"
+
+# Texture slots imported as streaming virtual textures (naming.json texture_import): their parameters
+# and samples take the VIRTUAL_ sampler types (texture_slots.py)
+VIRTUAL_TEXTURE_SLOTS = []
 
 CONFIG_PATH = Path(unreal.Paths.project_content_dir()) / "Config" / "naming.json"
 
+MANIFEST_PATH = CONFIG_PATH.parent / "pbr_rvt_build_manifest.json"
+
 # HLSL snippets
-from Scripts.hlsl_snippets import BLEND_AC_HLSL, HEIGHT_WEIGHT_HLSL, ROTATE2D_HLSL, TRIPLANAR_HLSL
+from Scripts.hlsl_snippets import BLEND_AC_HLSL, BLEND_RNM_HLSL, BLEND_UDN_HLSL, BLEND_WHITEOUT_HLSL, HEIGHT_WEIGHT_HLSL, ROTATE2D_HLSL, TRIPLANAR_HLSL, BIPLANAR_HLSL, DOMINANT_AXIS_HLSL
+from Scripts.hlsl_snippets import TRIPLANAR_NORMAL_HLSL
+from Scripts.hlsl_snippets import UV_AFFINE_HLSL
+from Scripts.hlsl_snippets import LAYER_WEIGHTS_HLSL, LAYER_BLEND_HLSL, DISTANCE_LOD_HLSL, LOD_SAMPLE_HLSL
+from Scripts.build_cache import BuildCache, source_of
+from Scripts.build_session import BuildSession, STAGE_FUNCTION, STAGE_MATERIAL, STAGE_INSTANCE, STAGE_ASSET
+from Scripts import build_trace, graph_check, material_graph, rvt_tuner, texture_slots
 
 # -------------- Helpers -----------------
 asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
@@ -25,7 +64,16 @@ def ensure_folder(path):
     if not ed_lib.does_directory_exist(path):
         ed_lib.make_directory(path)
 
+def staging_path(path):
+    # Existing graphs are rebuilt here and patched into the live asset (material_graph.py)
+    folder, name = path.rsplit("/", 1)
+    return f"{folder}/_Staging/{name}"
+
+def build_target(path):
+    return staging_path(path) if ed_lib.does_asset_exist(path) else path
+
 def create_material_function(path, desc=""):
+    path = build_target(path)
     factory = unreal.MaterialFunctionFactoryNew()
     func = asset_tools.create_asset(Path(path).name, str(Path(path).parent).replace("\\","/"), unreal.MaterialFunction, factory)
     func.get_editor_property("description")
@@ -34,12 +82,12 @@ def create_material_function(path, desc=""):
 
 def create_material(path, domain=unreal.MaterialDomain.MD_SURFACE, shading=unreal.MaterialShadingModel.MSM_SUBSTRATE):
     # MSM_DEFAULT_LIT is typical; offering Substrate default for 5.6 flexibility. Change if needed.
+    path = build_target(path)
     factory = unreal.MaterialFactoryNew()
     mat = asset_tools.create_asset(Path(path).name, str(Path(path).parent).replace("\\","/"), unreal.Material, factory)
     mat.set_editor_property("material_domain", domain)
     mat.set_editor_property("shading_model", unreal.MaterialShadingModel.MSM_DEFAULT_LIT)
     mat.set_editor_property("use_material_attributes", True)
-    mat_lib.recompile_material(mat)
     return mat
 
 def add_comment(material, text, pos, size=(400,160), color=(0.1,0.1,0.1)):
@@ -63,77 +111,95 @@ def add_param(material, klass, name, pos, default=None):
             node.set_editor_property("default_value", default)
     return node
 
+def sampler_type(slot):
+    return getattr(unreal.MaterialSamplerType, texture_slots.sampler_type(slot, VIRTUAL_TEXTURE_SLOTS))
+
+def add_texture_param(material, name, slot, pos):
+    # TextureObjectParameter for one texture slot; the Custom nodes sample it with this sampler type
+    node = mat_lib.create_material_expression(material, unreal.MaterialExpressionTextureObjectParameter, pos[0], pos[1])
+    node.set_editor_property("parameter_name", name)
+    node.set_editor_property("sampler_type", sampler_type(slot))
+    return node
+
+def add_switch(material, value, on_true, on_false, pos):
+    # StaticSwitch: A is taken when `value` is true, B when false; the unused side compiles out
+    sw = mat_lib.create_material_expression(material, unreal.MaterialExpressionStaticSwitch, pos[0], pos[1])
+    sw.value = value
+    sw.a = on_true
+    sw.b = on_false
+    return sw
+
 def connect(out_node, out_pin, in_node, in_prop):
     mat_lib.connect_material_expressions(out_node, out_pin, in_node, in_prop)
 
-def create_runtime_virtual_texture(path):
-    factory = unreal.RuntimeVirtualTextureFactory()
-    rvt = asset_tools.create_asset(Path(path).name, str(Path(path).parent).replace("\\","/"), unreal.RuntimeVirtualTexture, factory)
-    # Default config — tune as needed
-    rvt.set_editor_property("virtual_texture_build_resolution", 1024)
-    rvt.set_editor_property("tile_size", 128)
-    rvt.set_editor_property("remove_low_mips", False)
-    rvt.set_editor_property("material_type", unreal.RuntimeVirtualTextureMaterialType.BASE_COLOR_NORMAL_SPECULAR)
-    rvt.set_editor_property("enable_compress_height", False)
-    return rvt
+def function_pins():
+    # Declared pins of the material functions: {path: ({FunctionInput name: FunctionInputType}, FunctionOutput
+    # names)}. build_mf_uv / build_mf_rvt create their nodes from these; check_graphs checks the call sites.
+    uv_inputs = {"UV_Scale": "SCALAR", "UV_RotateDeg": "SCALAR", "UV_Offset": "VECTOR2"}
+    if UV_AFFINE_FOLDING:
+        uv_inputs = {"UV_AffineU": "VECTOR4", "UV_AffineV": "VECTOR4"}
+    return {
+        MF_UV: (uv_inputs, ("UV_Main", "WorldPos", "WorldNormal")),
+        MF_RVT: ({"RVT_Asset": "SAMPLER", "UV": "VECTOR2", "MipBias": "SCALAR"},
+                 ("BaseColor", "Alpha", "NormalWS", "Roughness", "Metallic", "Height")),
+    }
+
+def add_function_input(func, path, name, preview=None):
+    # A name missing from function_pins() fails here instead of leaving callers linked to nothing
+    node = unreal.MaterialExpressionFunctionInput()
+    node.input_name = name
+    node.input_type = getattr(unreal.FunctionInputType, function_pins()[path][0][name])
+    if preview is not None:
+        node.preview_value = preview
+    func.add_expression(node)
+    return node
 
-# -------------- Build MF_UVBlock_PBR --------------
-def build_mf_uv():
-    func = create_material_function(MF_UV, "Unified UV & Triplanar block")
-    graph = func.get_editor_property("expression_collection")
+def add_function_output(func, path, name, source):
+    if name not in function_pins()[path][1]:
+        raise KeyError(f"{path}: FunctionOutput {name!r} is not declared in function_pins()")
+    node = unreal.MaterialExpressionFunctionOutput()
+    node.output_name = name
+    node.a = source
+    func.add_expression(node)
+    return node
 
-    # Function inputs
-    in_scale = unreal.MaterialExpressionFunctionInput()
-    in_scale.input_name = "UV_Scale"
-    in_scale.input_type = unreal.FunctionInputType.SCALAR
-    in_scale.preview_value = unreal.LinearColor(1,0,0,0)
-
-    in_rot = unreal.MaterialExpressionFunctionInput()
-    in_rot.input_name = "UV_RotateDeg"
-    in_rot.input_type = unreal.FunctionInputType.SCALAR
-    in_rot.preview_value = unreal.LinearColor(0,0,0,0)
-
-    in_offset = unreal.MaterialExpressionFunctionInput()
-    in_offset.input_name = "UV_Offset"
-    in_offset.input_type = unreal.FunctionInputType.VECTOR2
-
-    in_use_triplanar = unreal.MaterialExpressionFunctionInput()
-    in_use_triplanar.input_name = "Use_Triplanar"
-    in_use_triplanar.input_type = unreal.FunctionInputType.SCALAR
-
-    in_triplanar_tiling = unreal.MaterialExpressionFunctionInput()
-    in_triplanar_tiling.input_name = "Triplanar_Tiling"
-    in_triplanar_tiling.input_type = unreal.FunctionInputType.SCALAR
-    in_triplanar_tiling.preview_value = unreal.LinearColor(1,0,0,0)
-
-    in_triplanar_sharp = unreal.MaterialExpressionFunctionInput()
-    in_triplanar_sharp.input_name = "Triplanar_Sharpness"
-    in_triplanar_sharp.input_type = unreal.FunctionInputType.SCALAR
-    in_triplanar_sharp.preview_value = unreal.LinearColor(4,0,0,0)
-
-    func.add_expression(in_scale)
-    func.add_expression(in_rot)
-    func.add_expression(in_offset)
-    func.add_expression(in_use_triplanar)
-    func.add_expression(in_triplanar_tiling)
-    func.add_expression(in_triplanar_sharp)
+def uv_parameters():
+    # MF_UVBlock_PBR inputs, each fed by the master parameter of the same name: (name, default)
+    if UV_AFFINE_FOLDING:
+        return (("UV_AffineU", unreal.LinearColor(1,0,0,0)), ("UV_AffineV", unreal.LinearColor(0,1,0,0)))
+    return (("UV_Scale", 1.0), ("UV_RotateDeg", 0.0), ("UV_Offset", unreal.LinearColor(0,0,0,0)))
 
-    # Coordinates
-    texcoord = unreal.MaterialExpressionTextureCoordinate()
-    func.add_expression(texcoord)
+def add_uv_params(material, mf_uv, pos):
+    for i, (name, default) in enumerate(uv_parameters()):
+        klass = unreal.MaterialExpressionScalarParameter if isinstance(default, float) else unreal.MaterialExpressionVectorParameter
+        connect(add_param(material, klass, name, (pos[0], pos[1] + i * 100), default), "", mf_uv, name)
+
+def load_or_create_asset(path, asset_class, factory):
+    # Non-graph assets (instance, RVT) are updated in place on a rebuild: create_asset on an existing
+    # path prompts to overwrite in the editor (or returns None when unattended)
+    if ed_lib.does_asset_exist(path):
+        return ed_lib.load_asset(path)
+    return asset_tools.create_asset(Path(path).name, str(Path(path).parent).replace("\\","/"), asset_class, factory)
+
+def create_runtime_virtual_texture(path):
+    rvt = load_or_create_asset(path, unreal.RuntimeVirtualTexture, unreal.RuntimeVirtualTextureFactory())
+    # Size, tile size, compression and low mips from rvt_sizing (bounds, texels/m, pool budget)
+    sizing = rvt_tuner.load_sizing(CONFIG_PATH)
+    pick, rows, warning = rvt_tuner.tune(sizing)
+    rvt_tuner.print_table(sizing, rows, pick, warning)
+    rvt_tuner.apply_settings(rvt, sizing, pick, unreal)
+    return rvt
 
-    add = unreal.MaterialExpressionAdd()
-    func.add_expression(add)
-    add_const = unreal.MaterialExpressionConstant2Vector()
-    add_const.constant_x = 0.0
-    add_const.constant_y = 0.0
-    func.add_expression(add_const)
-    add.a = texcoord
-    add.b = add_const
+# -------------- Build MF_UVBlock_PBR --------------
+def build_uv_transform(func, texcoord):
+    # (TexCoord * UV_Scale) -> Rotate2D(UV_RotateDeg) -> + UV_Offset
+    in_scale = add_function_input(func, MF_UV, "UV_Scale", unreal.LinearColor(1,0,0,0))
+    in_rot = add_function_input(func, MF_UV, "UV_RotateDeg", unreal.LinearColor(0,0,0,0))
+    in_offset = add_function_input(func, MF_UV, "UV_Offset")
 
     mult = unreal.MaterialExpressionMultiply()
     func.add_expression(mult)
-    mult.a = add
+    mult.a = texcoord
     mult.b = in_scale
 
     # Rotate Custom
@@ -151,54 +217,70 @@ def build_mf_uv():
     func.add_expression(add_off)
     add_off.a = rotate_node
     add_off.b = in_offset
+    return add_off
+
+def build_uv_affine(func, texcoord):
+    # UV_AFFINE_FOLDING: the same transform as one 2x3 matrix, rows precomputed per instance
+    rows = [add_function_input(func, MF_UV, name, default) for name, default in uv_parameters()]
+
+    affine = unreal.MaterialExpressionCustom()
+    affine.code = UV_AFFINE_HLSL + "\nreturn UVAffine(Input0, Input1, Input2);"
+    affine.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT2
+    affine.description = "UVAffine"
+    affine.set_editor_property("inputs", [
+        unreal.CustomInput(input_name="Input0", input=texcoord),
+        unreal.CustomInput(input_name="Input1", input=rows[0]),
+        unreal.CustomInput(input_name="Input2", input=rows[1]),
+    ])
+    func.add_expression(affine)
+    return affine
+
+def build_mf_uv():
+    func = create_material_function(MF_UV, "Unified UV & Triplanar block")
+    graph = func.get_editor_property("expression_collection")
+
+    # Coordinates
+    texcoord = unreal.MaterialExpressionTextureCoordinate()
+    func.add_expression(texcoord)
+
+    if UV_AFFINE_FOLDING:
+        uv_main = build_uv_affine(func, texcoord)
+    else:
+        uv_main = build_uv_transform(func, texcoord)
 
     # World data for triplanar
     wpos = unreal.MaterialExpressionWorldPosition()
     func.add_expression(wpos)
-    wnorm = unreal.MaterialExpressionPixelNormalWS()
+    # Vertex normal: PixelNormalWS cannot feed anything that ends up in the Normal input
+    wnorm = unreal.MaterialExpressionVertexNormalWS()
     func.add_expression(wnorm)
 
-    # Outputs
-    out_uv = unreal.MaterialExpressionFunctionOutput()
-    out_uv.output_name = "UV_Main"
-    out_uv.a = add_off
-    func.add_expression(out_uv)
-
-    out_wp = unreal.MaterialExpressionFunctionOutput()
-    out_wp.output_name = "WorldPos"
-    out_wp.a = wpos
-    func.add_expression(out_wp)
+    # The transform is affine in TexCoord, so interpolating the per-vertex result is exact. Triplanar
+    # projects from WorldPos and does not use UV_Main for its samples.
+    if VERTEX_INTERPOLATORS:
+        uv_vs = unreal.MaterialExpressionVertexInterpolator()
+        func.add_expression(uv_vs)
+        uv_vs.input = uv_main
+        uv_main = uv_vs
 
-    out_wn = unreal.MaterialExpressionFunctionOutput()
-    out_wn.output_name = "WorldNormal"
-    out_wn.a = wnorm
-    func.add_expression(out_wn)
+    # Outputs
+    add_function_output(func, MF_UV, "UV_Main", uv_main)
+    add_function_output(func, MF_UV, "WorldPos", wpos)
+    add_function_output(func, MF_UV, "WorldNormal", wnorm)
 
-    # Triplanar HLSL kept in MF_RVT_Read for sampling, we only provide coords/weights here
+    # Triplanar sampling happens in M_PBR_Master (per texture slot); we only provide world coords here
 
     func.post_edit_change()
     func.mark_package_dirty()
-    unreal.MaterialEditingLibrary.recompile_material_function(func)
     return func
 
 # -------------- Build MF_RVT_Read --------------
 def build_mf_rvt():
     func = create_material_function(MF_RVT, "RVT Sample & Blend helpers")
     # Inputs
-    fin_rvt = unreal.MaterialExpressionFunctionInput()
-    fin_rvt.input_name = "RVT_Asset"
-    fin_rvt.input_type = unreal.FunctionInputType.SAMPLER
-    func.add_expression(fin_rvt)
-
-    fin_uv = unreal.MaterialExpressionFunctionInput()
-    fin_uv.input_name = "UV"
-    fin_uv.input_type = unreal.FunctionInputType.VECTOR2
-    func.add_expression(fin_uv)
-
-    fin_mip = unreal.MaterialExpressionFunctionInput()
-    fin_mip.input_name = "MipBias"
-    fin_mip.input_type = unreal.FunctionInputType.SCALAR
-    func.add_expression(fin_mip)
+    add_function_input(func, MF_RVT, "RVT_Asset")
+    fin_uv = add_function_input(func, MF_RVT, "UV")
+    fin_mip = add_function_input(func, MF_RVT, "MipBias")
 
     # RuntimeVirtualTextureSample
     rvt_sample = unreal.MaterialExpressionRuntimeVirtualTextureSample()
@@ -209,43 +291,95 @@ def build_mf_rvt():
     rvt_sample.virtual_texture = None  # bound via parameter in material
 
     # Outputs
-    fout_bc = unreal.MaterialExpressionFunctionOutput()
-    fout_bc.output_name = "BaseColor"
-    fout_bc.a = rvt_sample.rgb
-    func.add_expression(fout_bc)
-
-    fout_a = unreal.MaterialExpressionFunctionOutput()
-    fout_a.output_name = "Alpha"
-    fout_a.a = rvt_sample.a
-    func.add_expression(fout_a)
-
-    fout_n = unreal.MaterialExpressionFunctionOutput()
-    fout_n.output_name = "NormalWS"
+    add_function_output(func, MF_RVT, "BaseColor", rvt_sample.rgb)
+    add_function_output(func, MF_RVT, "Alpha", rvt_sample.a)
     # RVT normal output pin is in tangent or world based on RVT type; we treat as world.
-    fout_n.a = rvt_sample.world_normal
-    func.add_expression(fout_n)
-
-    fout_r = unreal.MaterialExpressionFunctionOutput()
-    fout_r.output_name = "Roughness"
-    fout_r.a = rvt_sample.roughness
-    func.add_expression(fout_r)
-
-    fout_m = unreal.MaterialExpressionFunctionOutput()
-    fout_m.output_name = "Metallic"
-    fout_m.a = rvt_sample.metallic
-    func.add_expression(fout_m)
-
-    fout_h = unreal.MaterialExpressionFunctionOutput()
-    fout_h.output_name = "Height"
-    fout_h.a = rvt_sample.world_height
-    func.add_expression(fout_h)
+    add_function_output(func, MF_RVT, "NormalWS", rvt_sample.world_normal)
+    add_function_output(func, MF_RVT, "Roughness", rvt_sample.roughness)
+    add_function_output(func, MF_RVT, "Metallic", rvt_sample.metallic)
+    add_function_output(func, MF_RVT, "Height", rvt_sample.world_height)
 
     func.post_edit_change()
     func.mark_package_dirty()
-    unreal.MaterialEditingLibrary.recompile_material_function(func)
     return func
 
 # -------------- Build Master Material --------------
+# build_master() is a generator: it yields a label between node batches so the build can be
+# time-sliced (editor_scheduler.py); run_builder() drives any builder to completion.
+# naming.json "triplanar_mode" -> (snippet, HLSL function, normal-map function in TRIPLANAR_NORMAL_HLSL,
+# texture samples per call)
+TRIPLANAR_MODES = {
+    "full": (TRIPLANAR_HLSL, "TriplanarSample", "TriplanarNormal", 3),
+    "biplanar": (BIPLANAR_HLSL, "BiplanarSample", "BiplanarNormal", 2),
+    "dominant_axis": (DOMINANT_AXIS_HLSL, "DominantAxisSample", "DominantAxisNormal", 1),
+}
+
+def add_triplanar_sample(mat, tex, mf_uv, tiling, sharpness, far, y, normal=False):
+    # normal: unpack the normal map and return a world-space normal (float3) instead of the raw texel
+    code, fn, normal_fn, samples = TRIPLANAR_MODES[TRIPLANAR_MODE]
+    if normal:
+        code, fn = TRIPLANAR_NORMAL_HLSL, normal_fn
+    node = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, -2400, y)
+    # far is a constant 0 unless Use_DistanceLOD, so the branch folds away in the other permutations
+    node.code = code + f"\n[branch] if (Input5 > 0.5) return 0;\nreturn {fn}(Input0, Input0Sampler, Input1, Input2, Input3, Input4);"
+    node.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT3 if normal else unreal.CustomMaterialOutputType.CMOT_FLOAT4
+    node.description = f"{fn} ({samples} sample{'s' if samples > 1 else ''})"
+    node.inputs = [unreal.CustomInput(input_name=f"Input{n}") for n in range(6)]
+    connect(tex, "", node, "Input0")
+    connect(mf_uv, "WorldPos", node, "Input1")
+    connect(mf_uv, "WorldNormal", node, "Input2")
+    connect(tiling, "", node, "Input3")
+    connect(sharpness, "", node, "Input4")
+    connect(far, "", node, "Input5")
+    return node
+
+def add_triplanar_slot(mat, tex, uv_sample, mf_uv, tiling, sharpness, use_triplanar, far, y):
+    node = add_triplanar_sample(mat, tex, mf_uv, tiling, sharpness, far, y)
+    return add_switch(mat, use_triplanar, node, uv_sample, (-1550, y))
+
+# naming.json "normal_blend" -> (snippet, HLSL function, blends in tangent space). BlendAC works on
+# world-space normals, the others blend the local normal as detail over the RVT normal in tangent space.
+NORMAL_BLENDS = {
+    "ac": (BLEND_AC_HLSL, "BlendAC", False),
+    "rnm": (BLEND_RNM_HLSL, "BlendRNM", True),
+    "whiteout": (BLEND_WHITEOUT_HLSL, "BlendWhiteout", True),
+    "udn": (BLEND_UDN_HLSL, "BlendUDN", True),
+}
+
+def add_normal_blend(mat, normal_ts, normal_ws, mf_rvt, weight, far, pos):
+    # Local normal (tangent and world space) blended with the RVT normal; returns the world-space result
+    code, fn, tangent_space = NORMAL_BLENDS[NORMAL_BLEND]
+    node = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, pos[0], pos[1])
+    # RVT-only pixels have no local normal to blend: skip the blend and pass the RVT normal through
+    node.code = code + "\n[branch] if (Input3 > 0.5) return normalize(Input1);"
+    if tangent_space:
+        # Rows of TangentToWorld are the (orthonormal) tangent basis: mul(tbn, v) to tangent, mul(v, tbn) back
+        node.code += ("\nfloat3x3 tbn = (float3x3)Parameters.TangentToWorld;"
+                      f"\nreturn mul({fn}(Input0.xyz, mul(tbn, Input1), Input2), tbn);")
+    else:
+        node.code += f"\nreturn {fn}(Input0, Input1, Input2);"
+    node.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT3
+    node.description = fn
+    node.inputs = [unreal.CustomInput(input_name=f"Input{n}") for n in range(4)]
+    connect(normal_ts if tangent_space else normal_ws, "", node, "Input0")
+    connect(mf_rvt, "NormalWS", node, "Input1")
+    connect(weight, "", node, "Input2")
+    connect(far, "", node, "Input3")
+    return node
+
+def add_lod_sample(mat, tex, uv_sample, mf_uv, far, use_lod, pos, normal=False):
+    # Use_DistanceLOD: the plain-UV sample becomes a LodSample that is skipped on RVT-only pixels
+    node = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, pos[0], pos[1])
+    fn = "LodSampleNormal" if normal else "LodSample"
+    node.code = LOD_SAMPLE_HLSL + f"\nreturn {fn}(Input0, Input0Sampler, Input1, Input2);"
+    node.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT4
+    node.description = fn
+    node.inputs = [unreal.CustomInput(input_name=f"Input{n}") for n in range(3)]
+    connect(tex, "", node, "Input0")
+    connect(mf_uv, "UV_Main", node, "Input1")
+    connect(far, "", node, "Input2")
+    return add_switch(mat, use_lod, node, uv_sample, (pos[0] + 150, pos[1]))
+
 def build_master():
     mat = create_material(MASTER_MAT)
 
@@ -258,24 +392,16 @@ def build_master():
     add_comment(mat, "[Debug]", (700, -800), (600, 300))
 
     # Parameters
-    uv_scale = add_param(mat, unreal.MaterialExpressionScalarParameter, "UV_Scale", (-3500, -750), 1.0)
-    uv_rot = add_param(mat, unreal.MaterialExpressionScalarParameter, "UV_RotateDeg", (-3500, -650), 0.0)
-    uv_off = mat_lib.create_material_expression(mat, unreal.MaterialExpressionVectorParameter, -3500, -550)
-    uv_off.set_editor_property("parameter_name", "UV_Offset")
-    uv_off.default_value = unreal.LinearColor(0,0,0,0)
-
     use_triplanar = add_param(mat, unreal.MaterialExpressionStaticBoolParameter, "Use_Triplanar", (-3500, -450))
     tri_tiling = add_param(mat, unreal.MaterialExpressionScalarParameter, "Triplanar_Tiling", (-3500, -350), 1.0)
     tri_sharp = add_param(mat, unreal.MaterialExpressionScalarParameter, "Triplanar_Sharpness", (-3500, -250), 4.0)
 
-    base_tex = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureObjectParameter, -2700, -750)
-    base_tex.set_editor_property("parameter_name", "BaseColor_Tex")
-    norm_tex = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureObjectParameter, -2700, -650)
-    norm_tex.set_editor_property("parameter_name", "Normal_Tex")
-    orm_tex = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureObjectParameter, -2700, -550)
-    orm_tex.set_editor_property("parameter_name", "ORM_Tex")
-    height_tex = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureObjectParameter, -2700, -450)
-    height_tex.set_editor_property("parameter_name", "Height_Tex")
+    base_tex = add_texture_param(mat, "BaseColor_Tex", "BaseColor", (-2700, -750))
+    norm_tex = add_texture_param(mat, "Normal_Tex", "Normal", (-2700, -650))
+    orm_tex = add_texture_param(mat, "ORM_Tex", "ORM", (-2700, -550))
+    height_tex = None
+    if HEIGHT_PACKINGS[HEIGHT_PACKING] is None:
+        height_tex = add_texture_param(mat, "Height_Tex", "Height", (-2700, -450))
 
     rvt_param = mat_lib.create_material_expression(mat, unreal.MaterialExpressionRuntimeVirtualTextureParameter, -1700, -750)
     rvt_param.set_editor_property("parameter_name", "RVT_PBR_Target")
@@ -293,33 +419,89 @@ def build_master():
     dbg_mip = add_param(mat, unreal.MaterialExpressionScalarParameter, "Debug_RVT_MipBias", (700, -650), 0.0)
     dbg_weight_vis = add_param(mat, unreal.MaterialExpressionScalarParameter, "Debug_WeightVis", (700, -550), 0.0)
 
+    # Distance LOD: past LOD_FadeStart + LOD_FadeRange the pixel shades from the RVT only
+    add_comment(mat, "[Distance LOD] RVT-only beyond the fade band: no local samples, triplanar or BlendAC",
+                (-3600, -1450), (1100, 300))
+    use_lod = add_param(mat, unreal.MaterialExpressionStaticBoolParameter, "Use_DistanceLOD", (-3500, -1400))
+    lod_start = add_param(mat, unreal.MaterialExpressionScalarParameter, "LOD_FadeStart", (-3500, -1350), 5000.0)
+    lod_range = add_param(mat, unreal.MaterialExpressionScalarParameter, "LOD_FadeRange", (-3500, -1300), 2000.0)
+    lod_mip = add_param(mat, unreal.MaterialExpressionScalarParameter, "LOD_MipBiasPerOctave", (-3500, -1250), 0.5)
+
+    yield "parameters"
+
+    # One Custom node: dithered RVT-only mask (float) + distance-scaled RVT mip bias (LodMipBias)
+    depth = mat_lib.create_material_expression(mat, unreal.MaterialExpressionPixelDepth, -3300, -1400)
+    lod = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, -3100, -1350)
+    lod.code = DISTANCE_LOD_HLSL + ("\nLodMipBias = DistanceMipBias(Input0, Input3, Input1, Input4);"
+                                    "\nreturn DistanceLod(Input0, Input1, Input2, Parameters.SvPosition.xy);")
+    lod.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT1
+    lod.description = "DistanceLod"
+    lod.inputs = [unreal.CustomInput(input_name=f"Input{n}") for n in range(5)]
+    lod.additional_outputs = [
+        unreal.CustomOutput(output_name="LodMipBias", output_type=unreal.CustomMaterialOutputType.CMOT_FLOAT1),
+    ]
+    connect(depth, "", lod, "Input0")
+    connect(lod_start, "", lod, "Input1")
+    connect(lod_range, "", lod, "Input2")
+    connect(rvt_mip, "", lod, "Input3")
+    connect(lod_mip, "", lod, "Input4")
+    # RVT-only needs an RVT to read, and a pixel writing the RVT must not shade from it
+    near = mat_lib.create_material_expression(mat, unreal.MaterialExpressionConstant, -3100, -1250)
+    near.r = 0.0
+    far = add_switch(mat, use_rvt_write, near, lod, (-2950, -1400))
+    far = add_switch(mat, use_rvt_read, far, near, (-2850, -1400))
+    far = add_switch(mat, use_lod, far, near, (-2750, -1400))
+
     # MF_UVBlock_PBR call
     mf_uv = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMaterialFunctionCall, -3200, -750)
     mf_uv.set_editor_property("material_function", unreal.load_object(None, MF_UV))
-    mat_lib.connect_material_expressions(uv_scale, "", mf_uv, "UV_Scale")
-    mat_lib.connect_material_expressions(uv_rot, "", mf_uv, "UV_RotateDeg")
-    mat_lib.connect_material_expressions(uv_off, "", mf_uv, "UV_Offset")
-    mat_lib.connect_material_expressions(use_triplanar, "", mf_uv, "Use_Triplanar")
-    mat_lib.connect_material_expressions(tri_tiling, "", mf_uv, "Triplanar_Tiling")
-    mat_lib.connect_material_expressions(tri_sharp, "", mf_uv, "Triplanar_Sharpness")
-
-    # Local sampling (feature switch fallback)
+    add_uv_params(mat, mf_uv, (-3500, -750))
+
+    # Local sampling (feature switch fallback); Use_DistanceLOD swaps in LodSample, skipped when far
     samp_base = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSample, -2400, -750)
     samp_base.texture_object = base_tex
+    samp_base.sampler_type = sampler_type("BaseColor")
     connect(mf_uv, "UV_Main", samp_base, "UVs")
 
     samp_norm = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSample, -2400, -650)
     samp_norm.texture_object = norm_tex
-    samp_norm.sampler_type = unreal.MaterialSamplerType.SAMPLERTYPE_NORMAL
+    samp_norm.sampler_type = sampler_type("Normal")
     connect(mf_uv, "UV_Main", samp_norm, "UVs")
 
     samp_orm = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSample, -2400, -550)
     samp_orm.texture_object = orm_tex
+    samp_orm.sampler_type = sampler_type("ORM")
     connect(mf_uv, "UV_Main", samp_orm, "UVs")
 
-    samp_height = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSample, -2400, -450)
-    samp_height.texture_object = height_tex
-    connect(mf_uv, "UV_Main", samp_height, "UVs")
+    if height_tex is not None:
+        samp_height = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSample, -2400, -450)
+        samp_height.texture_object = height_tex
+        samp_height.sampler_type = sampler_type("Height")
+        connect(mf_uv, "UV_Main", samp_height, "UVs")
+
+    samp_base = add_lod_sample(mat, base_tex, samp_base, mf_uv, far, use_lod, (-2400, -1250))
+    samp_norm = add_lod_sample(mat, norm_tex, samp_norm, mf_uv, far, use_lod, (-2400, -1200), normal=True)
+    samp_orm = add_lod_sample(mat, orm_tex, samp_orm, mf_uv, far, use_lod, (-2400, -1150))
+    if height_tex is not None:
+        samp_height = add_lod_sample(mat, height_tex, samp_height, mf_uv, far, use_lod, (-2400, -1100))
+
+    # Triplanar (static): Use_Triplanar off keeps the plain UV samples above
+    add_comment(mat, f"[Triplanar: {TRIPLANAR_MODE}] samples per slot / 4 slots: full 3 / 12, biplanar 2 / 8, "
+                     "dominant_axis 1 / 4", (-2450, -1100), (900, 280))
+    samp_base = add_triplanar_slot(mat, base_tex, samp_base, mf_uv, tri_tiling, tri_sharp, use_triplanar, far, -1050)
+    # The normal keeps two paths: triplanar gives a world-space normal, the UV sample stays tangent space
+    tri_norm = add_triplanar_sample(mat, norm_tex, mf_uv, tri_tiling, tri_sharp, far, -1000, normal=True)
+    samp_orm = add_triplanar_slot(mat, orm_tex, samp_orm, mf_uv, tri_tiling, tri_sharp, use_triplanar, far, -950)
+    if height_tex is not None:
+        samp_height = add_triplanar_slot(mat, height_tex, samp_height, mf_uv, tri_tiling, tri_sharp,
+                                         use_triplanar, far, -900)
+    else:
+        # Packed height: read the alpha of the ORM/BaseColor sample, no extra texture or sample
+        samp_height = mat_lib.create_material_expression(mat, unreal.MaterialExpressionComponentMask, -2200, -450)
+        samp_height.r = False; samp_height.g = False; samp_height.b = False; samp_height.a = True
+        samp_height.input = samp_orm if HEIGHT_PACKING == "orm_alpha" else samp_base
+
+    yield "texture sampling"
 
     # Unpack ORM
     ao = mat_lib.create_material_expression(mat, unreal.MaterialExpressionComponentMask, -2200, -550)
@@ -343,12 +525,19 @@ def build_master():
     mf_rvt.set_editor_property("material_function", unreal.load_object(None, MF_RVT))
     mat_lib.connect_material_expressions(rvt_param, "", mf_rvt, "RVT_Asset")
     mat_lib.connect_material_expressions(mf_uv, "UV_Main", mf_rvt, "UV")
-    mat_lib.connect_material_expressions(rvt_mip, "", mf_rvt, "MipBias")
+    # Use_DistanceLOD: the mip bias grows with distance instead of staying at RVT_MipBias
+    mip_bias = add_switch(mat, use_lod, None, rvt_mip, (-1600, -250))
+    connect(lod, "LodMipBias", mip_bias, "True")
+    connect(mip_bias, "", mf_rvt, "MipBias")
+
+    yield "local PBR"
 
     # Weight sources
     vcol = mat_lib.create_material_expression(mat, unreal.MaterialExpressionVertexColor, -1200, -350)
     slope_dot = mat_lib.create_material_expression(mat, unreal.MaterialExpressionDotProduct, -1200, -250)
-    slope_dot.a = mat_lib.create_material_expression(mat, unreal.MaterialExpressionPixelNormalWS, -1300, -260)
+    # Per vertex: the slope comes from the vertex normal, the per-pixel normal isn't there in the vertex shader
+    normal_ws = unreal.MaterialExpressionVertexNormalWS if VERTEX_INTERPOLATORS else unreal.MaterialExpressionPixelNormalWS
+    slope_dot.a = mat_lib.create_material_expression(mat, normal_ws, -1300, -260)
     up = mat_lib.create_material_expression(mat, unreal.MaterialExpressionConstant3Vector, -1300, -210)
     up.constant = unreal.LinearColor(0,0,1,1)
     slope_dot.b = up
@@ -362,58 +551,66 @@ def build_master():
     height_custom.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT1
     height_custom.inputs = [
         unreal.CustomInput(input_name="Input0", input=samp_height),     # Local height
-        unreal.CustomInput(input_name="Input1", input=mf_rvt),          # RVT Height output wired later
+        unreal.CustomInput(input_name="Input1"),                        # RVT height
         unreal.CustomInput(input_name="Input2", input=add_param(mat, unreal.MaterialExpressionScalarParameter, "Height_Contrast", (-200, -680), 0.2)),
         unreal.CustomInput(input_name="Input3", input=add_param(mat, unreal.MaterialExpressionScalarParameter, "Height_Balance", (-200, -640), 0.5)),
     ]
-
-    # Extract RVT outputs for connections
-    rvt_bc = mat_lib.create_material_expression(mat, unreal.MaterialExpressionFunctionOutput, -1400, -730)  # dummy to hold pin names
-    # Not necessary to place; using function call output pins directly below.
+    # MF_RVT_Read has several outputs: always name the pin (graph_check.py)
+    connect(mf_rvt, "Height", height_custom, "Input1")
 
     # Weight combine: base on VertexColor.R, mod by slope
     w_mul = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMultiply, -900, -250)
     w_mul.a = vcol
     w_mul.b = slope_mask
+    if VERTEX_INTERPOLATORS:
+        # Vertex color x slope only needs vertex data: one interpolated value per pixel (HeightWeight stays per pixel)
+        w_vs = mat_lib.create_material_expression(mat, unreal.MaterialExpressionVertexInterpolator, -800, -250)
+        w_vs.input = w_mul
+        w_mul = w_vs
 
     # Final weight: choose height or mask via switch
-    w_lerp_selector = mat_lib.create_material_expression(mat, unreal.MaterialExpressionStaticSwitch, -200, -520)
-    w_lerp_selector.a = w_mul
-    w_lerp_selector.b = height_custom
-    w_lerp_selector.value = use_height_blend
-
-    # Normal blend (Custom)
-    blend_ac = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, -100, -300)
-    blend_ac.code = BLEND_AC_HLSL + "\nreturn BlendAC(Input0, Input1, Input2);"
-    blend_ac.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT3
-    blend_ac.inputs = [
-        unreal.CustomInput(input_name="Input0", input=mat_lib.create_material_expression(mat, unreal.MaterialExpressionTransform, -1500, -640))
-    ]
-    # Transform local tangent-space normal to world space
-    trans = blend_ac.inputs[0].input
+    w_lerp_selector = add_switch(mat, use_height_blend, height_custom, w_mul, (-200, -520))
+    # Use_DistanceLOD: RVT-only pixels take the RVT side of every blend
+    w_far = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMax, -100, -450)
+    w_far.a = w_lerp_selector
+    w_far.b = far
+    w_lerp_selector = add_switch(mat, use_lod, w_far, w_lerp_selector, (-50, -520))
+
+    # Local normal in world space (BlendAC, and the normal when RVT read is off): the UV sample goes
+    # tangent -> world, the triplanar normal already is world space
+    trans = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTransform, -1500, -640)
     trans.transform_source_type = unreal.MaterialVectorCoordTransformSource.TANGENT
     trans.transform_type = unreal.MaterialVectorCoordTransformType.WORLD
     trans.input = samp_norm
+    local_ws = add_switch(mat, use_triplanar, tri_norm, trans, (-1400, -640))
+    local_ts = samp_norm
+    if NORMAL_BLENDS[NORMAL_BLEND][2]:
+        # Tangent-space blends: the triplanar normal goes back to tangent space
+        tri_ts = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTransform, -1500, -600)
+        tri_ts.transform_source_type = unreal.MaterialVectorCoordTransformSource.WORLD
+        tri_ts.transform_type = unreal.MaterialVectorCoordTransformType.TANGENT
+        tri_ts.input = tri_norm
+        local_ts = add_switch(mat, use_triplanar, tri_ts, samp_norm, (-1400, -600))
 
-    # Connect RVT normal
-    blend_ac.inputs.append(unreal.CustomInput(input_name="Input1", input=mf_rvt))
-    # Weight
-    blend_ac.inputs.append(unreal.CustomInput(input_name="Input2", input=w_lerp_selector))
+    # Normal blend (Custom): the naming.json "normal_blend" mode
+    blend_ac = add_normal_blend(mat, local_ts, local_ws, mf_rvt, w_lerp_selector, far, (-100, -300))
+
+    yield "weights and normal blend"
 
     # Color/rough/met blend
     bc_lerp = mat_lib.create_material_expression(mat, unreal.MaterialExpressionLinearInterpolate, 50, -750)
     bc_lerp.a = samp_base
-    bc_lerp.b = mf_rvt
+    connect(mf_rvt, "BaseColor", bc_lerp, "B")
     bc_lerp.alpha = w_lerp_selector
 
     r_lerp = mat_lib.create_material_expression(mat, unreal.MaterialExpressionLinearInterpolate, 50, -700)
     r_lerp.a = r_cmp
-    r_lerp.b = mf_rvt
+    connect(mf_rvt, "Roughness", r_lerp, "B")
     r_lerp.alpha = w_lerp_selector
 
     m_lerp = mat_lib.create_material_expression(mat, unreal.MaterialExpressionLinearInterpolate, 50, -650)
     m_lerp.a = m_cmp
-    m_lerp.b = mf_rvt
+    connect(mf_rvt, "Metallic", m_lerp, "B")
     m_lerp.alpha = w_lerp_selector
 
     ao_min = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMin, 50, -600)
@@ -421,22 +618,28 @@ def build_master():
     ao_min.b = mat_lib.create_material_expression(mat, unreal.MaterialExpressionConstant, 40, -590)  # default if RVT lacks AO
     ao_min.b.r = 1.0
 
+    # RVT read off: local layer only, so MF_RVT_Read, HeightWeight and BlendAC compile out
+    read_bc = add_switch(mat, use_rvt_read, bc_lerp, samp_base, (200, -750))
+    read_n = add_switch(mat, use_rvt_read, blend_ac, local_ws, (200, -700))
+    read_r = add_switch(mat, use_rvt_read, r_lerp, r_cmp, (200, -650))
+    read_m = add_switch(mat, use_rvt_read, m_lerp, m_cmp, (200, -600))
+
     # Make Material Attributes
     make = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMakeMaterialAttributes, 350, -750)
-    make.base_color = bc_lerp
-    make.normal = blend_ac
-    make.roughness = r_lerp
-    make.metallic = m_lerp
-    make.ambient_occlusion = ao_min
+    make.base_color = read_bc
+    make.normal = read_n
+    make.roughness = read_r
+    make.metallic = read_m
+    # Local AO reads 0 on RVT-only pixels and the RVT has none: use 1 there
+    ao_far = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMax, 50, -550)
+    ao_far.a = ao_min
+    ao_far.b = far
+    make.ambient_occlusion = add_switch(mat, use_lod, ao_far, ao_min, (200, -550))
 
     # Debug: Show RVT
-    debug_switch = mat_lib.create_material_expression(mat, unreal.MaterialExpressionStaticSwitch, 900, -740)
-    debug_switch.value = dbg_show
-    debug_switch.a = make
-    debug_switch.b = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMakeMaterialAttributes, 900, -680)
-    debug_bc = mat_lib.create_material_expression(mat, unreal.MaterialExpressionAppendVector, 900, -640)
-    debug_bc.a = mf_rvt
-    debug_bc.b = mf_rvt  # duplicate to make 3 channels if needed
+    debug_make = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMakeMaterialAttributes, 900, -680)
+    connect(mf_rvt, "BaseColor", debug_make, "BaseColor")
+    debug_switch = add_switch(mat, dbg_show, debug_make, make, (900, -740))
 
     # Output to material
     mat.set_editor_property("use_material_attributes", True)
@@ -444,56 +647,342 @@ def build_master():
 
     # RVT Write
     rvt_out = mat_lib.create_material_expression(mat, unreal.MaterialExpressionRuntimeVirtualTextureOutput, -600, -750)
-    # BaseColor -> from make.base_color
-    rvt_out.base_color = bc_lerp
-    rvt_out.specular = None  # unused
-    rvt_out.roughness = r_lerp
-    rvt_out.metallic = m_lerp
-    rvt_out.world_height = samp_height
+    # Every input goes through Use_RVT_Write; off, the write path compiles to these constants (a StaticSwitch
+    # needs both pins connected)
+    rvt_black = mat_lib.create_material_expression(mat, unreal.MaterialExpressionConstant3Vector, -900, -750)
+    rvt_black.constant = unreal.LinearColor(0,0,0,1)
+    # 1, 0 and +Z are the AO default, `near` and the slope's up vector above
+    rvt_out.base_color = add_switch(mat, use_rvt_write, read_bc, rvt_black, (-750, -750))
+    rvt_out.roughness = add_switch(mat, use_rvt_write, read_r, ao_min.b, (-750, -700))
+    rvt_out.metallic = add_switch(mat, use_rvt_write, read_m, near, (-750, -650))
+    rvt_out.world_height = add_switch(mat, use_rvt_write, samp_height, near, (-750, -600))
     # Normal requires WS; transform already in blend_ac result
-    rvt_out.world_normal = blend_ac
+    rvt_out.world_normal = add_switch(mat, use_rvt_write, read_n, up, (-750, -550))
+
+    return mat
 
-    mat_lib.recompile_material(mat)
+# -------------- Build Layered Material --------------
+# Slots sampled from Texture2DArrays by layer index: (parameter, array suffix)
+# (parameter, texture_arrays suffix, texture slot its sampler type comes from); arrays never stream as VT
+LAYER_SLOTS = (("Layer_BaseColor_Array", "BaseColor", "BaseColor"), ("Layer_Normal_Array", "Normal", "Normal"),
+               ("Layer_ORMH_Array", "ORMH", "ORM"))
+
+def build_layers_master():
+    mat = create_material(LAYERS_MAT)
+    add_comment(mat, f"[Layers] {LAYER_COUNT} layers from Texture2DArrays; zero-weight layers are not sampled",
+                (-2800, -900), (1800, 700))
+
+    contrast = add_param(mat, unreal.MaterialExpressionScalarParameter, "Layer_Contrast", (-2700, -450), 0.2)
+    use_vcol = add_param(mat, unreal.MaterialExpressionStaticBoolParameter, "Use_VertexColorMask", (-2700, -350))
+
+    # One array parameter per slot instead of one texture per layer and slot: 3 samplers for any N.
+    # The parameter takes its type from its default texture, so build the arrays first (texture_arrays.py).
+    arrays = []
+    for i, (param, suffix, slot) in enumerate(LAYER_SLOTS):
+        node = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureObjectParameter, -2400, -750 + i * 100)
+        node.set_editor_property("parameter_name", param)
+        node.set_editor_property("sampler_type", getattr(unreal.MaterialSamplerType, texture_slots.sampler_type(slot)))
+        default = unreal.load_object(None, f"{LAYER_ARRAYS}_{suffix}")
+        if default is not None:
+            node.set_editor_property("texture", default)
+        arrays.append(node)
+
+    mf_uv = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMaterialFunctionCall, -2400, -400)
+    mf_uv.set_editor_property("material_function", unreal.load_object(None, MF_UV))
+    add_uv_params(mat, mf_uv, (-2700, -750))
+
+    yield "parameters"
+
+    # Layer masks: splat textures on the untiled UV (4 layers each), or vertex color RGBA for layers 0-3
+    texcoord = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureCoordinate, -2400, -250)
+    masks = []
+    for i in range((LAYER_COUNT + 3) // 4):
+        splat = mat_lib.create_material_expression(mat, unreal.MaterialExpressionTextureSampleParameter2D, -2100, -250 + i * 150)
+        splat.set_editor_property("parameter_name", f"Layer_Splat{i}")
+        splat.set_editor_property("sampler_type", unreal.MaterialSamplerType.SAMPLERTYPE_LINEAR_COLOR)
+        connect(texcoord, "", splat, "UVs")
+        masks.append(splat)
+    vcol = mat_lib.create_material_expression(mat, unreal.MaterialExpressionVertexColor, -2100, -450)
+    vcol_rgba = mat_lib.create_material_expression(mat, unreal.MaterialExpressionAppendVector, -1950, -450)
+    connect(vcol, "", vcol_rgba, "A")
+    connect(vcol, "A", vcol_rgba, "B")
+    masks[0] = add_switch(mat, use_vcol, vcol_rgba, masks[0], (-1800, -350))
+    if len(masks) == 1:
+        no_layers = mat_lib.create_material_expression(mat, unreal.MaterialExpressionConstant4Vector, -1800, -150)
+        no_layers.constant = unreal.LinearColor(0,0,0,0)
+        masks.append(no_layers)
+
+    # Weights + sampling in one Custom node; the constant layer count lets the compiler drop unused iterations
+    blend = mat_lib.create_material_expression(mat, unreal.MaterialExpressionCustom, -1500, -600)
+    blend.code = LAYER_WEIGHTS_HLSL + LAYER_BLEND_HLSL + (
+        f"\nreturn LayerBlend(Input0, Input0Sampler, Input1, Input1Sampler, Input2, Input2Sampler, "
+        f"Input3, Input4, Input5, Input6, {LAYER_COUNT}, LayerNormal, LayerORMH);")
+    blend.output_type = unreal.CustomMaterialOutputType.CMOT_FLOAT4
+    blend.description = f"LayerBlend ({LAYER_COUNT} layers)"
+    blend.inputs = [unreal.CustomInput(input_name=f"Input{n}") for n in range(7)]
+    blend.additional_outputs = [
+        unreal.CustomOutput(output_name="LayerNormal", output_type=unreal.CustomMaterialOutputType.CMOT_FLOAT3),
+        unreal.CustomOutput(output_name="LayerORMH", output_type=unreal.CustomMaterialOutputType.CMOT_FLOAT4),
+    ]
+    for n, node in enumerate(arrays):
+        connect(node, "", blend, f"Input{n}")
+    connect(mf_uv, "UV_Main", blend, "Input3")
+    connect(masks[0], "", blend, "Input4")
+    connect(masks[1], "", blend, "Input5")
+    connect(contrast, "", blend, "Input6")
+
+    yield "layer blend"
+
+    base = mat_lib.create_material_expression(mat, unreal.MaterialExpressionComponentMask, -1200, -650)
+    base.r = True; base.g = True; base.b = True; base.a = False
+    base.input = blend
+    masks_ormh = []
+    for i, channel in enumerate("rgb"):
+        mask = mat_lib.create_material_expression(mat, unreal.MaterialExpressionComponentMask, -1200, -550 + i * 50)
+        mask.set_editor_property(channel, True)
+        connect(blend, "LayerORMH", mask, "Input")
+        masks_ormh.append(mask)
+
+    make = mat_lib.create_material_expression(mat, unreal.MaterialExpressionMakeMaterialAttributes, -900, -600)
+    make.base_color = base
+    connect(blend, "LayerNormal", make, "Normal")
+    make.ambient_occlusion = masks_ormh[0]
+    make.roughness = masks_ormh[1]
+    make.metallic = masks_ormh[2]
+    mat.set_editor_property("use_material_attributes", True)
+    mat.material_attributes = make
     return mat
 
 # -------------- Build MI --------------
 def build_mi_base():
-    factory = unreal.MaterialInstanceConstantFactoryNew()
-    mi = asset_tools.create_asset(Path(MI_BASE).name, str(Path(MI_BASE).parent).replace("\\","/"), unreal.MaterialInstanceConstant, factory)
+    mi = load_or_create_asset(MI_BASE, unreal.MaterialInstanceConstant, unreal.MaterialInstanceConstantFactoryNew())
     mi.set_editor_property("parent", unreal.load_object(None, MASTER_MAT))
-    unreal.EditorAssetLibrary.save_asset(MI_BASE)
     return mi
 
 # -------------- Create RVT asset --------------
 def build_rvt_asset():
     rvt = create_runtime_virtual_texture(RVT_ASSET)
-    unreal.EditorAssetLibrary.save_asset(RVT_ASSET)
     return rvt
 
-def main():
+# -------------- Pipeline --------------
+# (asset path, builder, upstream asset paths, HLSL / extra sources the builder depends on, compile stage)
+def pipeline_steps():
+    return [
+        (MF_UV, build_mf_uv, (), (ROTATE2D_HLSL, UV_AFFINE_HLSL), STAGE_FUNCTION),
+        (MF_RVT, build_mf_rvt, (), (), STAGE_FUNCTION),
+        (MASTER_MAT, build_master, (MF_UV, MF_RVT),
+         (HEIGHT_WEIGHT_HLSL, BLEND_AC_HLSL, BLEND_RNM_HLSL, BLEND_UDN_HLSL, BLEND_WHITEOUT_HLSL, TRIPLANAR_HLSL, BIPLANAR_HLSL, DOMINANT_AXIS_HLSL,
+          TRIPLANAR_NORMAL_HLSL, DISTANCE_LOD_HLSL, LOD_SAMPLE_HLSL, inspect.getsource(texture_slots)), STAGE_MATERIAL),
+        (LAYERS_MAT, build_layers_master, (MF_UV,), (LAYER_WEIGHTS_HLSL, LAYER_BLEND_HLSL, inspect.getsource(texture_slots)),
+         STAGE_MATERIAL),
+        (MI_BASE, build_mi_base, (MASTER_MAT,), (), STAGE_INSTANCE),
+        (RVT_ASSET, build_rvt_asset, (), (inspect.getsource(rvt_tuner),), STAGE_ASSET),
+    ]
+
+# Shared helpers are part of every builder's inputs
+HELPERS = (staging_path, build_target, create_material_function, create_material, add_comment, add_param,
+           add_switch, connect, function_pins, add_function_input, add_function_output, uv_parameters, add_uv_params,
+           load_or_create_asset, create_runtime_virtual_texture, build_uv_transform, build_uv_affine, add_triplanar_sample, add_triplanar_slot, add_lod_sample, add_normal_blend, sampler_type,
+           add_texture_param)
+
+# Stages whose assets are node graphs: an existing asset is patched in place instead of replaced
+GRAPH_STAGES = (STAGE_FUNCTION, STAGE_MATERIAL)
+
+def load_config():
     # Load naming config if exists
+    data = {}
     if CONFIG_PATH.exists():
         data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
-        global ROOT, MF_UV, MF_RVT, MASTER_MAT, MI_BASE, RVT_ASSET
+        global ROOT, MF_UV, MF_RVT, MASTER_MAT, MI_BASE, RVT_ASSET, HEIGHT_PACKING, LAYERS_MAT, LAYER_ARRAYS, LAYER_COUNT
+        global VERTEX_INTERPOLATORS, UV_AFFINE_FOLDING, TRIPLANAR_MODE, NORMAL_BLEND, VIRTUAL_TEXTURE_SLOTS
         ROOT = data.get("root", ROOT)
         MF_UV = f"{ROOT}/{data.get('mf_uv', 'MF_UVBlock_PBR')}"
         MF_RVT = f"{ROOT}/{data.get('mf_rvt', 'MF_RVT_Read')}"
         MASTER_MAT = f"{ROOT}/{data.get('master', 'M_PBR_Master')}"
         MI_BASE = f"{ROOT}/{data.get('mi_base', 'MI_PBR_Base')}"
         RVT_ASSET = f"{ROOT}/{data.get('rvt', 'T_VT_PBR_Master')}"
+        LAYERS_MAT = f"{ROOT}/{data.get('layers_master', 'M_PBR_Layers')}"
+        LAYER_ARRAYS = f"{ROOT}/{data.get('layer_arrays', 'Layers/TA_PBR_Layers')}"
+        LAYER_COUNT = int(data.get("layer_count", LAYER_COUNT))
+        if not 2 <= LAYER_COUNT <= LAYER_MAX:
+            raise ValueError(f"naming.json: layer_count must be 2..{LAYER_MAX}, got {LAYER_COUNT}")
+        HEIGHT_PACKING = data.get("height_packing", HEIGHT_PACKING)
+        if HEIGHT_PACKING not in HEIGHT_PACKINGS:
+            raise ValueError(f"naming.json: height_packing must be one of {sorted(HEIGHT_PACKINGS)}, got {HEIGHT_PACKING!r}")
+        VERTEX_INTERPOLATORS = bool(data.get("vertex_interpolators", VERTEX_INTERPOLATORS))
+        UV_AFFINE_FOLDING = bool(data.get("uv_affine_folding", UV_AFFINE_FOLDING))
+        TRIPLANAR_MODE = data.get("triplanar_mode", TRIPLANAR_MODE)
+        if TRIPLANAR_MODE not in TRIPLANAR_MODES:
+            raise ValueError(f"naming.json: triplanar_mode must be one of {sorted(TRIPLANAR_MODES)}, got {TRIPLANAR_MODE!r}")
+        NORMAL_BLEND = data.get("normal_blend", NORMAL_BLEND)
+        if NORMAL_BLEND not in NORMAL_BLENDS:
+            raise ValueError(f"naming.json: normal_blend must be one of {sorted(NORMAL_BLENDS)}, got {NORMAL_BLEND!r}")
+        VIRTUAL_TEXTURE_SLOTS = texture_slots.virtual_texture_slots(data)
+    return data
+
+def run_builder(builder):
+    result = builder()
+    if not inspect.isgenerator(result):
+        return result
+    while True:
+        try:
+            next(result)
+        except StopIteration as stop:
+            return stop.value
+
+def _builder_steps(builder, path, done, total):
+    result = builder()
+    if not inspect.isgenerator(result):
+        return result
+    while True:
+        try:
+            label = next(result)
+        except StopIteration as stop:
+            return stop.value
+        yield (f"{path}: {label}", done, total)
+
+def patch_graph(path, staged, target=None):
+    # Apply the staged graph to the live asset node by node; returns the live asset, or None if unchanged.
+    # `target` is a snapshot of `staged` when the caller already has one (optimize keeps it current).
+    live = ed_lib.load_asset(path)
+    before = material_graph.GraphSnapshot(live)
+    target = target or material_graph.GraphSnapshot(staged)
+    diff = material_graph.diff_graphs(before, target)
+    unsafe = material_graph.unsafe_nodes(diff, target)
+    if diff.empty:
+        ed_lib.delete_asset(staging_path(path))
+        return None
+    if unsafe or type(live) is not type(staged):
+        # Output pins of these nodes can't be read back: replace the asset, keeping references to it
+        print(f" ! {path}: replaced ({', '.join(unsafe) or 'asset class changed'})")
+        ed_lib.consolidate_assets(staged, [live])
+        ed_lib.rename_asset(staging_path(path), path)
+        return ed_lib.load_asset(path)
+    material_graph.apply_diff(live, diff, before, target)
+    live.post_edit_change()
+    live.mark_package_dirty()
+    ed_lib.delete_asset(staging_path(path))
+    print(f" ~ {path}: {diff.summary()}")
+    return live
+
+def pin_problems():
+    # Pins named in the graph builders and the helpers they call vs function_pins() / Custom node declarations
+    module = sys.modules[__name__]
+    functions = [builder for _, builder, _, _, stage in pipeline_steps() if stage in GRAPH_STAGES]
+    functions += [getattr(module, helper.__name__) for helper in HELPERS]
+    return graph_check.check_pins(functions, function_pins(), vars(module))
+
+def check_graphs():
+    # Fail fast, before any asset is created: a wrong function / Custom node pin would only show up as a
+    # broken link after the editor compiled the material. Parses the sources, needs nothing from unreal.
+    problems = pin_problems()
+    for problem in problems:
+        unreal.log_error(f"graph_check: {problem}")
+    if problems:
+        raise RuntimeError(f"graph_check: {len(problems)} problem(s) in the material graphs, nothing was built")
+
+TRACE_TITLE = "PBR RVT build trace"
+
+def trace_targets():
+    # (module, attributes, span category) wrapped while a build is traced
+    from Scripts import build_session
+    module = sys.modules[__name__]
+    return [
+        (module, ("check_graphs", "build_mf_uv", "build_mf_rvt", "build_master", "build_layers_master", "build_mi_base",
+                  "build_rvt_asset", "patch_graph"), "phase"),
+        (material_graph, ("optimize",), "phase"),
+        (module, ("create_material_function", "create_material", "add_param", "add_comment", "add_switch", "connect",
+                  "add_uv_params", "create_runtime_virtual_texture", "add_triplanar_slot", "add_lod_sample",
+                  "add_normal_blend"), "helper"),
+        (module, ("mat_lib", "ed_lib"), "api"),
+        (build_session, ("_compile", "_save"), "compile"),
+    ]
 
+def build(force=False, trace=None):
+    # Generator over the whole build, yielding (label, units done, total units) between steps:
+    # main() drains it in one go, editor_scheduler.py runs it from the Slate tick.
+    # trace: write a Chrome trace JSON there (build_trace.py); None leaves every helper unwrapped.
+    # editor_scheduler.run_sliced traces the job instead, so a cancelled build doesn't stay wrapped.
+    if not trace:
+        return (yield from _build(force))
+    with build_trace.tracing(trace, trace_targets(), TRACE_TITLE):
+        return (yield from _build(force))
+
+def _build(force):
+    data = load_config()
+    check_graphs()
     ensure_folder(ROOT)
-    mf1 = build_mf_uv()
-    mf2 = build_mf_rvt()
-    mat = build_master()
-    mi = build_mi_base()
-    rvt = build_rvt_asset()
-    print("PBR RVT pipeline created:")
+    cache = BuildCache(MANIFEST_PATH, unreal.Paths.project_content_dir(), force=force)
+    helper_src = [source_of(h) for h in HELPERS]
+    session = BuildSession()
+    digests = {}
+    unchanged = []
+    steps = pipeline_steps()
+    total = 2 * len(steps) + 1  # create + compile per asset, one batched save
+    done = 0
+    for path, builder, deps, hlsl, stage in steps:
+        digest = cache.input_hash(path, data, [source_of(builder), *helper_src, *hlsl], deps)
+        if not any(d in digests and d not in unchanged for d in deps) and cache.is_fresh(path, digest):
+            print(f" = {path} (up to date)")
+            done += 2
+            yield (f"{path} (up to date)", done, total)
+            continue
+        patching = stage in GRAPH_STAGES and ed_lib.does_asset_exist(path)
+        target = staging_path(path) if patching else path
+        if patching and ed_lib.does_asset_exist(target):
+            ed_lib.delete_asset(target)  # left over from an aborted run
+        try:
+            asset = yield from _builder_steps(builder, path, done, total)
+        except GeneratorExit:
+            # Aborted mid-asset: drop the partial asset so the next run starts clean
+            if ed_lib.does_asset_exist(target):
+                ed_lib.delete_asset(target)
+            raise
+        staged = None
+        if stage in GRAPH_STAGES:
+            # Identity ops, duplicate and dead expressions go before anything is diffed, compiled or saved. The
+            # builders emit straight through the editor API, so this works on the just-created asset.
+            stats = material_graph.optimize(asset)
+            staged = stats.snapshot
+            if stats.removed:
+                print(f" - {path}: {stats.summary()}")
+        digests[path] = digest
+        if patching:
+            asset = patch_graph(path, asset, staged)
+            if asset is None:
+                # Same graph: nothing to recompile or save, only the manifest entry moves on
+                print(f" = {path} (graph unchanged)")
+                cache.keep_output(path)
+                unchanged.append(path)
+                done += 2
+                yield (f"{path} (graph unchanged)", done, total)
+                continue
+        session.register(asset, path, stage)
+        done += 1
+        yield (f"{path} {'patched' if patching else 'created'}", done, total)
+
+    # One compile per dirty asset (functions -> master -> instances), then one batched save
+    done = total - len(session.dirty) - 1
+    for path in session.steps():
+        done += 1
+        yield (f"{path} compiled" if path else "saved", done, total)
+    session.report()
+    rebuilt = session.finished
+    for path in rebuilt + unchanged:
+        cache.record(path, digests[path])
+    cache.save()
+
+    print(f"PBR RVT pipeline created ({len(rebuilt)} rebuilt):")
     print(f" - {MF_UV}")
     print(f" - {MF_RVT}")
     print(f" - {MASTER_MAT}")
+    print(f" - {LAYERS_MAT} ({LAYER_COUNT} layers)")
     print(f" - {MI_BASE}")
     print(f" - {RVT_ASSET}")
+    return rebuilt
+
+def main(force=False, trace=None):
+    return run_builder(lambda: build(force, trace))
 
 if __name__ == "__main__":
-    main()
+    main(force="--force" in sys.argv, trace=sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv else None)
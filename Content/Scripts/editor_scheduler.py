@@ -0,0 +1,130 @@
+# Run in Unreal Editor: Output Log -> `py Scripts/editor_scheduler.py [--force] [--trace out.json]`
+# Time-sliced pipeline build: runs create_pbr_rvt_pipeline.build() a few milliseconds per Slate tick
+# with a cancellable ScopedSlowTask, so the editor stays responsive.
+#   job = editor_scheduler.run_sliced(); job.cancel(); job.resume(); job.abort()
+import sys
+import time
+import unreal
+
+DEFAULT_BUDGET_MS = 25.0
+
+IDLE, RUNNING, CANCELLED, DONE, FAILED = "idle", "running", "cancelled", "done", "failed"
+
+# Running jobs are kept referenced here; the tick callback alone does not keep them alive
+_active = []
+
+
+class SlicedBuild:
+    def __init__(self, work, title="Building PBR RVT pipeline", budget_ms=DEFAULT_BUDGET_MS, show_progress=True,
+                 trace=None):
+        # work: generator yielding (label, units done, total units); trace: a build_trace.TraceSession,
+        # instrumented only while the job runs so a cancelled job leaves the libraries unwrapped
+        self.work = work
+        self.trace = trace
+        self.title = title
+        self.budget = budget_ms / 1000.0
+        self.show_progress = show_progress
+        self.state = IDLE
+        self.label = ""
+        self.done = 0
+        self.total = 0
+        self.ticks = 0
+        self.result = None
+        self.error = None
+        self._handle = None
+        self._task = None
+
+    # -------------- Control --------------
+    def start(self):
+        if self.state in (DONE, FAILED) or self._handle is not None:
+            return self
+        self.state = RUNNING
+        if self.trace is not None:
+            self.trace.start()
+        self._handle = unreal.register_slate_post_tick_callback(self._tick)
+        if self not in _active:
+            _active.append(self)
+        return self
+
+    def resume(self):
+        # Picks the generator up exactly where cancel() left it
+        if self.state == CANCELLED:
+            self.start()
+        return self
+
+    def cancel(self):
+        if self.state == RUNNING:
+            self._stop(CANCELLED)
+            unreal.log_warning(f"{self.title}: cancelled at {self.done}/{self.total} ({self.label}); resume() to continue")
+        return self
+
+    def abort(self):
+        # Cancel for good: closing the generator lets build() drop the half-built asset
+        self._stop(FAILED)
+        self.work.close()
+        return self
+
+    # -------------- Tick --------------
+    def _tick(self, delta_seconds):
+        if self._task is not None and self._task.should_cancel():
+            self.cancel()
+            return
+        self.ticks += 1
+        # At least one step per tick, however small the budget
+        deadline = time.perf_counter() + self.budget
+        while True:
+            try:
+                label, done, total = next(self.work)
+            except StopIteration as stop:
+                self.result = stop.value
+                self._stop(DONE)
+                return
+            except Exception as exc:
+                self.error = exc
+                self._stop(FAILED)
+                unreal.log_error(f"{self.title}: failed at {self.label}: {exc}")
+                raise
+            self._progress(label, done, total)
+            if time.perf_counter() >= deadline:
+                return
+
+    def _progress(self, label, done, total):
+        if self.show_progress and self._task is None:
+            self._task = unreal.ScopedSlowTask(total, self.title)
+            self._task.__enter__()
+            self._task.make_dialog(True)
+            if self.done:
+                self._task.enter_progress_frame(self.done, self.label)
+        if self._task is not None:
+            self._task.enter_progress_frame(max(0, done - self.done), label)
+        self.label = label
+        self.done = done
+        self.total = total
+
+    def _stop(self, state):
+        if self._handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._handle)
+            self._handle = None
+        if self._task is not None:
+            self._task.__exit__(None, None, None)
+            self._task = None
+        self.state = state
+        if self.trace is not None:
+            if state == CANCELLED:
+                self.trace.pause()
+            else:
+                self.trace.finish()
+                self.trace = None
+        if state != CANCELLED and self in _active:
+            _active.remove(self)
+
+
+def run_sliced(force=False, budget_ms=DEFAULT_BUDGET_MS, trace=None):
+    # Traced by the job rather than inside build(): cancel() has to unwrap the helpers, resume() rewrap them
+    from Scripts import build_trace, create_pbr_rvt_pipeline as pipeline
+    session = build_trace.TraceSession(trace, pipeline.trace_targets(), pipeline.TRACE_TITLE) if trace else None
+    return SlicedBuild(pipeline.build(force), budget_ms=budget_ms, trace=session).start()
+
+
+if __name__ == "__main__":
+    run_sliced(force="--force" in sys.argv, trace=sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv else None)
@@ -0,0 +1,565 @@
+# Stand-in for the parts of the `unreal` module the PBR/RVT scripts use, so builders can run
+# outside the editor (plain CPython) and the graph they emit can be inspected.
+#   from Scripts import fake_unreal; fake_unreal.install()   # before importing the pipeline
+import contextlib
+import sys
+import time
+from pathlib import Path
+
+_CONTENT_DIR = Path(__file__).resolve().parent.parent
+_assets = {}
+_directories = set()
+_tick_callbacks = {}
+# "Library.call" -> [calls, seconds], for every library call and expression construction since reset()
+stats = {}
+
+
+def install(content_dir=None):
+    global _CONTENT_DIR
+    current = sys.modules.get("unreal")
+    if current is not None and current is not sys.modules[__name__]:
+        raise RuntimeError("fake_unreal: the real unreal module is loaded; run offline tools outside the editor")
+    if content_dir is not None:
+        _CONTENT_DIR = Path(content_dir)
+    sys.modules["unreal"] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+def reset():
+    _assets.clear()
+    _directories.clear()
+    _tick_callbacks.clear()
+    ScopedSlowTask.cancel_requested = False
+    stats.clear()
+
+
+@contextlib.contextmanager
+def isolated():
+    # Scratch assets, directories and call stats: whatever runs inside (graph_check's capture next to a
+    # fake build) neither sees nor changes the outer state, and is not counted in its stats
+    saved = dict(_assets), set(_directories), dict(stats)
+    _assets.clear()
+    _directories.clear()
+    stats.clear()
+    try:
+        yield
+    finally:
+        _assets.clear()
+        _assets.update(saved[0])
+        _directories.clear()
+        _directories.update(saved[1])
+        stats.clear()
+        stats.update(saved[2])
+
+
+# -------------- Objects --------------
+class _Object:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def set_editor_property(self, name, value):
+        setattr(self, name, value)
+
+    def get_editor_property(self, name):
+        return self.__dict__.get(name)
+
+    def set_editor_properties(self, properties):
+        for name, value in properties.items():
+            setattr(self, name, value)
+
+    def post_edit_change(self):
+        pass
+
+    def mark_package_dirty(self):
+        pass
+
+
+class OutputPin:
+    # `node.rgb`, `node.world_normal`, ...: a named output of an expression
+    def __init__(self, node, name):
+        self.node = node
+        self.name = name
+
+    def __repr__(self):
+        return f"{self.node!r}.{self.name}"
+
+
+class MaterialExpression(_Object):
+    def __init__(self, **kwargs):
+        _count("MaterialExpression.new")
+        self.material_expression_editor_x = 0
+        self.material_expression_editor_y = 0
+        super().__init__(**kwargs)
+
+    def __getattr__(self, name):
+        # Only reached for unset attributes: reading one is taking an output pin
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return OutputPin(self, name)
+
+    def get_editor_property(self, name):
+        return self.__dict__.get(name)
+
+    @property
+    def kind(self):
+        return type(self).__name__[len("MaterialExpression"):]
+
+    def __repr__(self):
+        label = self.__dict__.get("parameter_name") or self.__dict__.get("input_name") or self.__dict__.get("output_name")
+        return f"<{self.kind}{' ' + label if label else ''}>"
+
+
+class _Asset(_Object):
+    def __init__(self, name="", path="", **kwargs):
+        self.name = name
+        self.path = path
+        self.expressions = []
+        self.connections = []
+        super().__init__(**kwargs)
+
+    def add_expression(self, expr):
+        self.expressions.append(expr)
+        expr.owner = self
+
+    def get_name(self):
+        return self.name
+
+    def get_path_name(self):
+        return f"{self.path}.{self.name}"
+
+
+class Material(_Asset):
+    pass
+
+
+class MaterialFunction(_Asset):
+    pass
+
+
+class MaterialInstanceConstant(_Asset):
+    pass
+
+
+class RuntimeVirtualTexture(_Asset):
+    pass
+
+
+class Texture2D(_Asset):
+    pass
+
+
+class LinearColor(_Object):
+    def __init__(self, r=0.0, g=0.0, b=0.0, a=1.0):
+        super().__init__(r=r, g=g, b=b, a=a)
+
+    def __eq__(self, other):
+        return isinstance(other, LinearColor) and (self.r, self.g, self.b, self.a) == (other.r, other.g, other.b, other.a)
+
+    def __repr__(self):
+        return f"LinearColor({self.r}, {self.g}, {self.b}, {self.a})"
+
+
+class CustomInput(_Object):
+    def __init__(self, input_name="", input=None):
+        super().__init__(input_name=input_name, input=input)
+
+
+class CustomOutput(_Object):
+    def __init__(self, output_name="", output_type=None):
+        super().__init__(output_name=output_name, output_type=output_type)
+
+
+class _EnumValue(str):
+    pass
+
+
+class _Enum:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, member):
+        if member.startswith("__"):
+            raise AttributeError(member)
+        return _EnumValue(f"{self._name}.{member}")
+
+
+_classes = {}
+
+
+def __getattr__(name):
+    # Expression classes, factories and enums are generated on first use
+    if name.startswith("__"):
+        raise AttributeError(name)
+    if name not in _classes:
+        if name.startswith("MaterialExpression"):
+            _classes[name] = type(name, (MaterialExpression,), {})
+        elif name.endswith("Factory") or name.endswith("FactoryNew") or name.endswith("Options"):
+            _classes[name] = type(name, (_Object,), {})
+        else:
+            _classes[name] = _Enum(name)
+    return _classes[name]
+
+
+# -------------- Libraries --------------
+class Paths:
+    @staticmethod
+    def project_content_dir():
+        return f"{_CONTENT_DIR.as_posix()}/"
+
+
+def _key(path):
+    # "/Game/A//B.B" -> "/Game/A/B"
+    return "/" + "/".join(p for p in path.split(".")[0].split("/") if p)
+
+
+def load_object(outer, path):
+    return _assets.get(_key(path))
+
+
+def load_asset(path):
+    return _assets.get(_key(path))
+
+
+def log(msg):
+    print(msg)
+
+
+def log_warning(msg):
+    print(f"Warning: {msg}")
+
+
+def log_error(msg):
+    print(f"Error: {msg}")
+
+
+class AssetImportTask(_Object):
+    def __init__(self, **kwargs):
+        self.filename = ""
+        self.destination_path = ""
+        self.destination_name = ""
+        self.replace_existing = False
+        self.automated = False
+        self.save = False
+        self.factory = None
+        self.imported_object_paths = []
+        super().__init__(**kwargs)
+
+
+class _AssetTools:
+    def create_asset(self, asset_name, package_path, asset_class, factory):
+        # The editor asks before overwriting and returns None when it can't (unattended / commandlet)
+        path = _key(f"{package_path}/{asset_name}")
+        if path in _assets:
+            log_error(f"create_asset: {path} already exists")
+            return None
+        asset = asset_class(name=asset_name, path=path)
+        _assets[path] = asset
+        return asset
+
+    def import_asset_tasks(self, import_tasks):
+        # Every task imports one Texture2D (source files are not read); an existing asset is kept
+        # unless replace_existing
+        for task in import_tasks:
+            name = task.destination_name or Path(task.filename).stem
+            path = _key(f"{task.destination_path}/{name}")
+            if path not in _assets or task.replace_existing:
+                _assets[path] = Texture2D(name=name, path=path, source_file=task.filename)
+            task.imported_object_paths = [f"{path}.{name}"]
+
+
+class AssetToolsHelpers:
+    _tools = _AssetTools()
+
+    @staticmethod
+    def get_asset_tools():
+        return AssetToolsHelpers._tools
+
+
+def _link_source(value):
+    if isinstance(value, OutputPin):
+        return value.node, value.name
+    if isinstance(value, MaterialExpression):
+        return value, ""
+    return None
+
+
+def _expression_links(expr):
+    # {input name: (source, pin)}: assigned inputs, Custom inputs, then connect_material_expressions calls
+    links = {}
+    for prop, value in vars(expr).items():
+        if prop == "owner":
+            continue
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, CustomInput) and _link_source(item.input):
+                    links[item.input_name] = _link_source(item.input)
+        elif _link_source(value):
+            links[prop] = _link_source(value)
+    owner = vars(expr).get("owner")
+    for src, pin, dst, dst_pin in owner.connections if owner is not None else ():
+        if dst is expr:
+            links[dst_pin] = (src, pin)
+    return links
+
+
+class MaterialEditingLibrary:
+    @staticmethod
+    def create_material_expression(material, expression_class, node_pos_x=0, node_pos_y=0):
+        expr = expression_class()
+        expr.material_expression_editor_x = node_pos_x
+        expr.material_expression_editor_y = node_pos_y
+        material.expressions.append(expr)
+        expr.owner = material
+        return expr
+
+    @staticmethod
+    def create_material_expression_in_function(function, expression_class, node_pos_x=0, node_pos_y=0):
+        return _unrecorded(MaterialEditingLibrary.create_material_expression)(function, expression_class, node_pos_x, node_pos_y)
+
+    @staticmethod
+    def connect_material_expressions(from_expression, from_output_name, to_expression, to_input_name):
+        owner = to_expression.__dict__.get("owner") or from_expression.__dict__.get("owner")
+        if owner is not None:
+            owner.connections = [c for c in owner.connections if not (c[2] is to_expression and c[3] == to_input_name)]
+            owner.connections.append((from_expression, from_output_name, to_expression, to_input_name))
+        return True
+
+    @staticmethod
+    def connect_material_property(from_expression, from_output_name, property_):
+        owner = from_expression.__dict__.get("owner")
+        if owner is not None and str(property_).endswith("MATERIAL_ATTRIBUTES"):
+            owner.material_attributes = OutputPin(from_expression, from_output_name) if from_output_name else from_expression
+        return True
+
+    @staticmethod
+    def delete_material_expression(material, expression):
+        # Like the editor: the expression goes and every link to it is broken
+        material.expressions = [e for e in material.expressions if e is not expression]
+        material.connections = [c for c in material.connections if c[0] is not expression and c[2] is not expression]
+        for expr in material.expressions:
+            for prop, value in list(vars(expr).items()):
+                if value is expression or (isinstance(value, OutputPin) and value.node is expression):
+                    setattr(expr, prop, None)
+                elif isinstance(value, list):
+                    for item in value:
+                        src = getattr(item, "input", None) if isinstance(item, CustomInput) else None
+                        if src is expression or (isinstance(src, OutputPin) and src.node is expression):
+                            item.input = None
+        attrs = material.__dict__.get("material_attributes")
+        if attrs is expression or (isinstance(attrs, OutputPin) and attrs.node is expression):
+            material.material_attributes = None
+
+    @staticmethod
+    def delete_material_expression_in_function(function, expression):
+        _unrecorded(MaterialEditingLibrary.delete_material_expression)(function, expression)
+
+    @staticmethod
+    def get_material_expression_input_names(expression):
+        return list(_expression_links(expression))
+
+    @staticmethod
+    def get_inputs_for_material_expression(material, expression):
+        return [src for src, _ in _expression_links(expression).values()]
+
+    @staticmethod
+    def get_input_node_output_name_for_material_expression(expression, input_node):
+        # First input fed by `input_node` wins, as in the editor
+        for src, pin in _expression_links(expression).values():
+            if src is input_node:
+                return pin
+        return ""
+
+    @staticmethod
+    def get_material_property_input_node(material, property_):
+        attrs = material.__dict__.get("material_attributes") if str(property_).endswith("MATERIAL_ATTRIBUTES") else None
+        return attrs.node if isinstance(attrs, OutputPin) else attrs
+
+    @staticmethod
+    def get_material_property_input_node_output_name(material, property_):
+        attrs = material.__dict__.get("material_attributes") if str(property_).endswith("MATERIAL_ATTRIBUTES") else None
+        return attrs.name if isinstance(attrs, OutputPin) else ""
+
+    @staticmethod
+    def recompile_material(material):
+        pass
+
+    @staticmethod
+    def recompile_material_function(function):
+        pass
+
+    @staticmethod
+    def update_material_function(function, preview_material=None):
+        pass
+
+    @staticmethod
+    def update_material_instance(instance):
+        pass
+
+    @staticmethod
+    def set_material_instance_parent(instance, parent):
+        instance.parent = parent
+
+    @staticmethod
+    def set_material_instance_scalar_parameter_value(instance, name, value):
+        instance.__dict__.setdefault("scalar_parameters", {})[name] = value
+        return True
+
+    @staticmethod
+    def set_material_instance_vector_parameter_value(instance, name, value):
+        instance.__dict__.setdefault("vector_parameters", {})[name] = value
+        return True
+
+    @staticmethod
+    def set_material_instance_texture_parameter_value(instance, name, value):
+        instance.__dict__.setdefault("texture_parameters", {})[name] = value
+        return True
+
+    @staticmethod
+    def set_material_instance_static_switch_parameter_value(instance, name, value):
+        instance.__dict__.setdefault("static_switches", {})[name] = value
+        return True
+
+
+class EditorAssetLibrary:
+    @staticmethod
+    def does_directory_exist(path):
+        return path in _directories
+
+    @staticmethod
+    def make_directory(path):
+        _directories.add(path)
+        return True
+
+    @staticmethod
+    def does_asset_exist(path):
+        return _key(path) in _assets
+
+    @staticmethod
+    def load_asset(path):
+        return _assets.get(_key(path))
+
+    @staticmethod
+    def save_asset(path, only_if_is_dirty=True):
+        return _key(path) in _assets
+
+    @staticmethod
+    def save_loaded_assets(assets, only_if_is_dirty=True):
+        return True
+
+    @staticmethod
+    def delete_asset(path):
+        return _assets.pop(_key(path), None) is not None
+
+    @staticmethod
+    def rename_asset(source_asset_path, destination_asset_path):
+        asset = _assets.pop(_key(source_asset_path), None)
+        if asset is None:
+            return False
+        asset.path = _key(destination_asset_path)
+        asset.name = asset.path.rsplit("/", 1)[-1]
+        _assets[asset.path] = asset
+        return True
+
+    @staticmethod
+    def consolidate_assets(asset_to_consolidate_to, assets_to_consolidate):
+        # References are not tracked here; the consolidated assets are simply removed
+        for asset in assets_to_consolidate:
+            _assets.pop(_key(asset.path), None)
+        return True
+
+
+# -------------- Slate tick / progress --------------
+def register_slate_post_tick_callback(callback):
+    handle = object()
+    _tick_callbacks[handle] = callback
+    return handle
+
+
+def unregister_slate_post_tick_callback(handle):
+    _tick_callbacks.pop(handle, None)
+
+
+def pump_ticks(count=1, delta_seconds=1.0 / 60.0):
+    # Drives the registered post-tick callbacks like the editor loop would; returns ticks pumped
+    for i in range(count):
+        if not _tick_callbacks:
+            return i
+        for callback in list(_tick_callbacks.values()):
+            callback(delta_seconds)
+    return count
+
+
+class ScopedSlowTask:
+    # Set cancel_requested to simulate the dialog's Cancel button
+    cancel_requested = False
+
+    def __init__(self, amount_of_work, default_message=""):
+        self.amount_of_work = amount_of_work
+        self.completed = 0.0
+        self.message = default_message
+        self.frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def make_dialog(self, can_cancel=False, allow_in_pie=False):
+        self.can_cancel = can_cancel
+
+    def should_cancel(self):
+        return ScopedSlowTask.cancel_requested
+
+    def enter_progress_frame(self, work=1.0, desc=""):
+        self.completed += work
+        self.frames.append((work, desc))
+
+
+# -------------- Recording --------------
+def _count(label, seconds=0.0):
+    entry = stats.setdefault(label, [0, 0.0])
+    entry[0] += 1
+    entry[1] += seconds
+
+
+def _recorded(label, fn):
+    def call(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _count(label, time.perf_counter() - t0)
+    call.__name__ = fn.__name__
+    call.__wrapped__ = fn
+    return call
+
+
+def _unrecorded(fn):
+    # Library calls made from inside another call are not counted twice
+    return getattr(fn, "__wrapped__", fn)
+
+
+def _record_class(cls, label):
+    for name, value in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if isinstance(value, staticmethod):
+            setattr(cls, name, staticmethod(_recorded(f"{label}.{name}", value.__func__)))
+        elif callable(value):
+            setattr(cls, name, _recorded(f"{label}.{name}", value))
+
+
+_record_class(_AssetTools, "AssetTools")
+_record_class(MaterialEditingLibrary, "MaterialEditingLibrary")
+_record_class(EditorAssetLibrary, "EditorAssetLibrary")
+_Asset.add_expression = _recorded("Asset.add_expression", _Asset.add_expression)
+# Each one is a texture recompress in the editor
+Texture2D.set_editor_properties = _recorded("Texture2D.set_editor_properties", _Object.set_editor_properties)
+load_object = _recorded("load_object", load_object)
+load_asset = _recorded("load_asset", load_asset)
+
+
+def call_counts():
+    return {label: n for label, (n, _) in sorted(stats.items())}
@@ -0,0 +1,287 @@
+# Fail-fast validation of the generated material graphs.
+#   cd Content && python -m Scripts.graph_check
+# check_pins (every build, in-process, before any asset is created): parses the builder sources and checks
+# each literal pin named at a MaterialFunctionCall against the declared FunctionInput / FunctionOutput
+# tables (create_pbr_rvt_pipeline.function_pins) and at a Custom node against its declared inputs /
+# additional outputs. Needs no `unreal` at all, so it runs the same in the editor and offline.
+# The command line also runs the graph builders against fake_unreal (no editor needed, milliseconds) and
+# checks the emitted links, including the ones built from computed names. Reported:
+#   - pins the function or Custom node doesn't declare, and function inputs fed the wrong kind of value
+#   - dangling pins: function inputs without a link (and no preview default), Custom inputs without a
+#     link, FunctionOutputs without a source
+#   - ambiguous pins: a call with several outputs read without naming one (the editor takes the first)
+import ast
+import inspect
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+# FunctionInputType -> kind of value it takes; float inputs cast between widths like the editor does
+INPUT_KINDS = {
+    "SCALAR": "float", "VECTOR2": "float", "VECTOR3": "float", "VECTOR4": "float",
+    "TEXTURE2D": "texture", "TEXTURECUBE": "texture", "TEXTURE2DARRAY": "texture", "VOLUMETEXTURE": "texture",
+    "TEXTUREEXTERNAL": "texture", "SAMPLER": "texture",
+    "STATICBOOL": "static bool", "BOOL": "bool", "MATERIALATTRIBUTES": "attributes",
+}
+# Expression kind -> kind of value on its output; anything not listed is a float value
+SOURCE_KINDS = {
+    "TextureObject": "texture", "TextureObjectParameter": "texture", "RuntimeVirtualTextureParameter": "texture",
+    "StaticBool": "static bool", "StaticBoolParameter": "static bool",
+    "MakeMaterialAttributes": "attributes", "SetMaterialAttributes": "attributes",
+}
+
+def _links(node, asset):
+    # -> [(source, source pin, input name)]; same reading of assigned / Custom / connected inputs as shader_cost
+    from Scripts.shader_cost import expression_inputs
+    return expression_inputs(node, asset)
+
+def _label(node):
+    func = node.__dict__.get("material_function")
+    name = f" {func.name}" if func is not None else ""
+    return f"{repr(node)[:-1]}{name} @{node.material_expression_editor_x},{node.material_expression_editor_y}>"
+
+def _input_type(node):
+    return str(node.__dict__.get("input_type", "")).rsplit(".", 1)[-1]
+
+# -------------- Signatures --------------
+class Signature:
+    # FunctionInput / FunctionOutput nodes of one material function, in creation order
+    def __init__(self, func):
+        self.func = func
+        self.inputs = {e.input_name: e for e in func.expressions if e.kind == "FunctionInput"}
+        self.outputs = {e.output_name: e for e in func.expressions if e.kind == "FunctionOutput"}
+
+    def output_kind(self, pin):
+        source = next((src for src, _, prop in _links(self.outputs[pin], self.func) if prop == "a"), None)
+        return value_kind(source) if source is not None else None
+
+def value_kind(node):
+    if node.kind == "FunctionInput":
+        return INPUT_KINDS.get(_input_type(node), "float")
+    return SOURCE_KINDS.get(node.kind, "float")
+
+def check_function(func):
+    problems = []
+    for kind, attr in (("FunctionInput", "input_name"), ("FunctionOutput", "output_name")):
+        names = [e.__dict__.get(attr) for e in func.expressions if e.kind == kind]
+        problems += [f"{func.name}: {kind} name {n!r} used {names.count(n)} times" for n in sorted(set(names))
+                     if names.count(n) > 1]
+    for e in func.expressions:
+        if e.kind == "FunctionInput" and _input_type(e) not in INPUT_KINDS:
+            problems.append(f"{func.name}: {_label(e)} has unknown input type {_input_type(e) or 'None'}")
+        if e.kind == "FunctionOutput" and not any(prop == "a" for _, _, prop in _links(e, func)):
+            problems.append(f"{func.name}: {_label(e)} is dangling (no source)")
+    return problems
+
+# -------------- Materials --------------
+def check_calls(asset, signatures):
+    # Links into and out of every MaterialFunctionCall, and Custom node pins
+    from Scripts import fake_unreal
+    problems = []
+    calls = {}
+    for e in asset.expressions:
+        if e.kind in ("FunctionInput", "FunctionOutput") and not isinstance(asset, fake_unreal.MaterialFunction):
+            problems.append(f"{asset.name}: {_label(e)} only works inside a material function")
+        if e.kind == "MaterialFunctionCall":
+            func = e.__dict__.get("material_function")
+            calls[id(e)] = signatures.get(getattr(func, "path", None))
+            if calls[id(e)] is None:
+                problems.append(f"{asset.name}: {_label(e)} calls a function that is not built before it")
+
+    for e in asset.expressions:
+        sig = calls.get(id(e))
+        if sig is None:
+            continue
+        linked = set()
+        for src, pin, name in _links(e, asset):
+            if name not in sig.inputs:
+                problems.append(f"{asset.name}: {_label(e)} has no input {name!r} (inputs: {', '.join(sig.inputs)})")
+                continue
+            linked.add(name)
+            want = INPUT_KINDS.get(_input_type(sig.inputs[name]))
+            got = _source_kind(src, pin, calls)
+            if want and got and want != got:
+                problems.append(f"{asset.name}: {_label(e)}.{name} takes a {want} value, {_label(src)} gives a {got}")
+        for name, node in sig.inputs.items():
+            if name not in linked and not node.__dict__.get("use_preview_value_as_default"):
+                problems.append(f"{asset.name}: {_label(e)}.{name} is dangling (no link, no preview default)")
+
+    for e in asset.expressions:
+        if e.kind == "Custom":
+            problems += _check_custom_inputs(e, asset)
+        for src, pin, name in _links(e, asset):
+            sig = calls.get(id(src))
+            if sig is not None:
+                if not pin and len(sig.outputs) != 1:
+                    problems.append(f"{asset.name}: {_label(e)}.{name} reads {_label(src)} without an output pin; "
+                                    f"it has {len(sig.outputs)} ({', '.join(sig.outputs)}) and the first one is taken")
+                elif pin and pin not in sig.outputs:
+                    problems.append(f"{asset.name}: {_label(e)}.{name} reads {_label(src)}.{pin}, "
+                                    f"which has no such output (outputs: {', '.join(sig.outputs)})")
+            elif src.kind == "Custom" and pin:
+                outputs = [o.output_name for o in src.__dict__.get("additional_outputs") or ()]
+                if pin not in outputs:
+                    problems.append(f"{asset.name}: {_label(e)}.{name} reads {_label(src)}.{pin}, "
+                                    f"which has no such output (additional outputs: {', '.join(outputs) or 'none'})")
+    return problems
+
+def _source_kind(src, pin, calls):
+    if id(src) in calls:
+        sig = calls[id(src)]
+        return sig.output_kind(pin) if sig is not None and pin in sig.outputs else None
+    return value_kind(src)
+
+def _check_custom_inputs(node, asset):
+    declared = [i.input_name for i in node.__dict__.get("inputs") or ()]
+    linked = {name for _, _, name in _links(node, asset)}
+    problems = [f"{asset.name}: {_label(node)} has no input {name!r} (inputs: {', '.join(declared) or 'none'})"
+                for name in sorted(linked - set(declared))]
+    problems += [f"{asset.name}: {_label(node)}.{name} is dangling (no link)" for name in declared if name not in linked]
+    return problems
+
+# -------------- Builder sources --------------
+# connect(out_node, out_pin, in_node, in_prop) and the library call it wraps
+CONNECT_CALLS = ("connect", "connect_material_expressions")
+
+def _call_name(call):
+    func = call.func
+    return func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+
+def _const(node):
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+def _declared_names(node, key):
+    # [unreal.CustomInput(input_name="Input0"), ...] or [... (input_name=f"Input{n}") for n in range(K)]
+    # -> names; None when they are computed some other way (nothing is checked against them then)
+    if isinstance(node, ast.List):
+        names = [next((_const(k.value) for k in e.keywords if k.arg == key), None) for e in node.elts
+                 if isinstance(e, ast.Call)]
+        return names if None not in names and len(names) == len(node.elts) else None
+    if (isinstance(node, ast.ListComp) and len(node.generators) == 1 and isinstance(node.elt, ast.Call)
+            and isinstance(node.generators[0].target, ast.Name)):
+        gen, var = node.generators[0], node.generators[0].target.id
+        value = next((k.value for k in node.elt.keywords if k.arg == key), None)
+        if (isinstance(gen.iter, ast.Call) and _call_name(gen.iter) == "range" and len(gen.iter.args) == 1
+                and isinstance(gen.iter.args[0], ast.Constant) and isinstance(value, ast.JoinedStr)):
+            parts = [(p.value, None) if isinstance(p, ast.Constant) else (None, p.value) for p in value.values]
+            if all(text is not None or isinstance(expr, ast.Name) and expr.id == var for text, expr in parts):
+                return ["".join(text if text is not None else str(n) for text, _ in parts)
+                        for n in range(gen.iter.args[0].value)]
+    return None
+
+def _function_calls(tree, names):
+    # Variables bound to a MaterialFunctionCall: X.set_editor_property("material_function",
+    # unreal.load_object(None, MF_X)) -> {"X": path of MF_X}
+    bound = {}
+    for call in ast.walk(tree):
+        if (isinstance(call, ast.Call) and _call_name(call) == "set_editor_property" and len(call.args) == 2
+                and _const(call.args[0]) == "material_function" and isinstance(call.func.value, ast.Name)):
+            loaded = call.args[1]
+            if (isinstance(loaded, ast.Call) and _call_name(loaded) == "load_object" and len(loaded.args) == 2
+                    and isinstance(loaded.args[1], ast.Name) and loaded.args[1].id in names):
+                bound[call.func.value.id] = names[loaded.args[1].id]
+    return bound
+
+def _custom_nodes(tree):
+    # Custom nodes created in one function: {"X": {"inputs": [...] | None, "outputs": [...]}}
+    nodes = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+            if (isinstance(target, ast.Name) and isinstance(value, ast.Call)
+                    and any(isinstance(a, ast.Attribute) and a.attr == "MaterialExpressionCustom"
+                            for a in [value.func, *value.args])):
+                nodes[target.id] = {"inputs": None, "outputs": []}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id in nodes:
+                if target.attr == "inputs":
+                    nodes[target.value.id]["inputs"] = _declared_names(node.value, "input_name")
+                elif target.attr == "additional_outputs":
+                    nodes[target.value.id]["outputs"] = _declared_names(node.value, "output_name")
+        elif (isinstance(node, ast.Call) and _call_name(node) == "set_editor_property" and len(node.args) == 2
+              and _const(node.args[0]) == "inputs" and isinstance(node.func.value, ast.Name)
+              and node.func.value.id in nodes):
+            nodes[node.func.value.id]["inputs"] = _declared_names(node.args[1], "input_name")
+    return nodes
+
+def check_pins(functions, pins, names):
+    # functions: builders and the helpers they call; pins: {function path: (inputs {name: FunctionInputType},
+    # outputs)}; names: the builders' globals (MF_UV -> path). Pins held in variables are left to the
+    # offline check, so is everything about types and dangling pins.
+    problems = [f"{path}: FunctionInput {name!r} has unknown input type {kind}"
+                for path, (inputs, _) in pins.items() for name, kind in inputs.items() if kind not in INPUT_KINDS]
+    trees = []
+    for fn in functions:
+        lines, first = inspect.getsourcelines(fn)
+        where = f"{Path(inspect.getsourcefile(fn)).name}:{{}} {fn.__name__}"
+        trees.append((where, first - 1, ast.parse(textwrap.dedent("".join(lines)))))
+    # Helpers take the call node as a parameter of the same name as the builders' variable
+    shared = {}
+    for _, _, tree in trees:
+        shared.update(_function_calls(tree, names))
+    for fn, offset, tree in trees:
+        calls = {**shared, **_function_calls(tree, names)}
+        customs = _custom_nodes(tree)
+        for call in ast.walk(tree):
+            if not (isinstance(call, ast.Call) and _call_name(call) in CONNECT_CALLS and len(call.args) == 4):
+                continue
+            src, pin, dst, prop = call.args
+            where = fn.format(call.lineno + offset)
+            src, dst, pin, prop = getattr(src, "id", None), getattr(dst, "id", None), _const(pin), _const(prop)
+            if src in calls and pin is not None:
+                path, (_, outputs) = calls[src], pins[calls[src]]
+                if not pin and len(outputs) != 1:
+                    problems.append(f"{where} reads {src} ({path}) without an output pin; it has {len(outputs)} "
+                                    f"({', '.join(outputs)}) and the first one is taken")
+                elif pin and pin not in outputs:
+                    problems.append(f"{where} reads {src}.{pin}: {path} has no such output (outputs: {', '.join(outputs)})")
+            elif src in customs and pin and customs[src]["outputs"] is not None and pin not in customs[src]["outputs"]:
+                problems.append(f"{where} reads {src}.{pin}: the Custom node has no such output "
+                                f"(additional outputs: {', '.join(customs[src]['outputs']) or 'none'})")
+            if dst in calls and prop is not None:
+                path, (inputs, _) = calls[dst], pins[calls[dst]]
+                if prop not in inputs:
+                    problems.append(f"{where} links {dst}.{prop}: {path} has no such input (inputs: {', '.join(inputs)})")
+            elif dst in customs and prop is not None and customs[dst]["inputs"] is not None and prop not in customs[dst]["inputs"]:
+                problems.append(f"{where} links {dst}.{prop}: the Custom node has no such input "
+                                f"(inputs: {', '.join(customs[dst]['inputs']) or 'none'})")
+    return problems
+
+# -------------- Pipeline --------------
+def capture_graphs():
+    # Graph assets as the builders emit them (before material_graph.optimize), functions first. Built in a
+    # scratch fake_unreal state, so a build already running against the fake keeps its assets and counts.
+    from Scripts import fake_unreal
+    fake_unreal.install()
+    with fake_unreal.isolated():
+        from Scripts import create_pbr_rvt_pipeline as pipeline
+        pipeline.load_config()
+        return [pipeline.run_builder(builder) for _, builder, _, _, stage in pipeline.pipeline_steps()
+                if stage in pipeline.GRAPH_STAGES]
+
+def check_assets(assets):
+    from Scripts import fake_unreal
+    problems = []
+    signatures = {}
+    for asset in assets:
+        if isinstance(asset, fake_unreal.MaterialFunction):
+            problems += check_function(asset)
+            signatures[asset.path] = Signature(asset)
+        problems += check_calls(asset, signatures)
+    return problems
+
+def main(argv):
+    t0 = time.perf_counter()
+    assets = capture_graphs()
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    problems = pipeline.pin_problems() + check_assets(assets)
+    for p in problems:
+        print(f"FAIL {p}")
+    print(f"graph_check: {len(assets)} graphs, {len(problems)} problems in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,424 @@
+# NumPy reference implementations of the functions in hlsl_snippets.py.
+# Every function works on whole images at once (leading axes are pixels, last axis is the vector).
+#
+# Golden check (from the Content dir, no editor needed):
+#   python -m Scripts.hlsl_reference --check   # compare references + HLSL fingerprints with the goldens
+#   python -m Scripts.hlsl_reference --bless   # rewrite goldens after an intentional HLSL/reference change
+import hashlib
+import inspect
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from Scripts import hlsl_snippets
+from Scripts.pbr_rows import uv_affine_rows
+
+GOLDEN_PATH = Path(__file__).resolve().parent.parent / "Config" / "hlsl_golden.npz"
+GOLDEN_SIZE = 32
+GOLDEN_SEED = 1234
+GOLDEN_ATOL = 1e-5
+# Folded vs unfolded UV transform (float32, UVs up to ~|16|)
+FOLD_ATOL = 1e-4
+
+# -------------- HLSL intrinsics --------------
+def saturate(x):
+    return np.clip(x, 0.0, 1.0)
+
+def lerp(a, b, w):
+    return a + (b - a) * w
+
+def smoothstep(e0, e1, x):
+    # HLSL: t = saturate((x - e0) / (e1 - e0)); t*t*(3 - 2t). A zero-width edge divides by zero on
+    # the GPU too; +-inf saturates to 1/0 and NaN (x == e0) resolves to 0.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (x - e0) / (e1 - e0)
+    t = saturate(np.nan_to_num(t, nan=0.0, posinf=1.0, neginf=0.0))
+    return t * t * (3.0 - 2.0 * t)
+
+def dot(a, b):
+    return np.sum(a * b, axis=-1)
+
+def normalize(v):
+    # No epsilon, same as HLSL: a zero vector gives NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return v / np.sqrt(dot(v, v))[..., None]
+
+def sample_bilinear_wrap(tex, uv):
+    # Texture2D.Sample with a bilinear / wrap SamplerState; tex is (H, W, C), uv is (..., 2)
+    h, w = tex.shape[:2]
+    x = uv[..., 0] * w - 0.5
+    y = uv[..., 1] * h - 0.5
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    fx = (x - x0)[..., None]
+    fy = (y - y0)[..., None]
+    x0 = x0.astype(np.int64) % w
+    y0 = y0.astype(np.int64) % h
+    x1 = (x0 + 1) % w
+    y1 = (y0 + 1) % h
+    top = lerp(tex[y0, x0], tex[y0, x1], fx)
+    bottom = lerp(tex[y1, x0], tex[y1, x1], fx)
+    return lerp(top, bottom, fy)
+
+# -------------- Snippet references --------------
+def blend_ac(n_a_ws, n_b_ws, w):
+    n_a_ws = normalize(n_a_ws)
+    n_b_ws = normalize(n_b_ws)
+    return normalize(lerp(n_a_ws, n_b_ws, np.asarray(w)[..., None]))
+
+def detail_strength(n, s):
+    # float3(n.xy * s, lerp(1, n.z, s)): the normal's detail scaled from flat (0) to full (1)
+    s = np.asarray(s)[..., None]
+    return np.concatenate([n[..., :2] * s, lerp(1.0, n[..., 2:], s)], axis=-1)
+
+def blend_rnm(n_a_ts, n_b_ts, w):
+    t = normalize(detail_strength(n_b_ts, w)) + np.array([0.0, 0.0, 1.0], np.float32)
+    u = detail_strength(n_a_ts, 1.0 - np.asarray(w)) * np.array([-1.0, -1.0, 1.0], np.float32)
+    return normalize(t * dot(t, u)[..., None] - u * t[..., 2:])
+
+def blend_udn(n_a_ts, n_b_ts, w):
+    b = detail_strength(n_b_ts, w)
+    xy = b[..., :2] + n_a_ts[..., :2] * (1.0 - np.asarray(w))[..., None]
+    return normalize(np.concatenate([xy, b[..., 2:]], axis=-1))
+
+def blend_whiteout(n_a_ts, n_b_ts, w):
+    b = detail_strength(n_b_ts, w)
+    d = detail_strength(n_a_ts, 1.0 - np.asarray(w))
+    return normalize(np.concatenate([b[..., :2] + d[..., :2], b[..., 2:] * d[..., 2:]], axis=-1))
+
+def height_weight(h_a, h_b, contrast, balance):
+    b = saturate(balance)
+    off = b * 2.0 - 1.0
+    d = (h_b - h_a) + off
+    w = smoothstep(-contrast, contrast, d)
+    return saturate(w)
+
+def rotate2d(uv, deg):
+    rad = np.radians(deg)
+    s = np.sin(rad)
+    co = np.cos(rad)
+    p = uv - 0.5
+    r = np.stack([p[..., 0] * co - p[..., 1] * s, p[..., 0] * s + p[..., 1] * co], axis=-1)
+    return r + 0.5
+
+def uv_affine(uv, row_u, row_v):
+    return np.stack([dot(row_u[..., :2], uv), dot(row_v[..., :2], uv)], axis=-1) + np.stack([row_u[..., 2], row_v[..., 2]], axis=-1)
+
+def uv_unfolded(uv, scale, rotate_deg, offset):
+    # MF_UVBlock_PBR without UV_AFFINE_FOLDING: (uv * UV_Scale) -> Rotate2D -> + UV_Offset
+    return rotate2d(uv * scale[..., None], rotate_deg) + offset
+
+def uv_folded(uv, scale, rotate_deg, offset):
+    # Rows folded on the CPU per instance (pbr_rows.uv_affine_rows), then UVAffine per pixel
+    rows = np.array([uv_affine_rows(float(s), float(d), float(o[0]), float(o[1]))
+                     for s, d, o in zip(scale.ravel(), rotate_deg.ravel(), offset.reshape(-1, 2))], dtype=np.float32)
+    rows = rows.reshape(*scale.shape, 2, 3)
+    return uv_affine(uv, rows[..., 0, :], rows[..., 1, :])
+
+def triplanar_sample(base, ss, wp, nw, tiling, sharpness):
+    # ss is the sampler: a callable (tex, uv) -> (..., C), e.g. sample_bilinear_wrap
+    n = np.abs(normalize(nw))
+    w = np.power(n, sharpness)
+    w = w / np.maximum(1e-5, np.sum(w, axis=-1))[..., None]
+    uv_x = wp[..., [2, 1]] * tiling
+    uv_y = wp[..., [0, 2]] * tiling
+    uv_z = wp[..., [0, 1]] * tiling
+    sx = ss(base, uv_x)
+    sy = ss(base, uv_y)
+    sz = ss(base, uv_z)
+    return sx * w[..., 0:1] + sy * w[..., 1:2] + sz * w[..., 2:3]
+
+def _major_axis(n):
+    return np.where((n[..., 0] > n[..., 1]) & (n[..., 0] > n[..., 2]), 0, np.where(n[..., 1] > n[..., 2], 1, 2))
+
+def _minor_axis(n):
+    return np.where((n[..., 0] < n[..., 1]) & (n[..., 0] <= n[..., 2]), 0, np.where(n[..., 1] <= n[..., 2], 1, 2))
+
+def _planar_uv(wp, axis):
+    # Per-pixel choice between the triplanar projections: 0 -> zy, 1 -> xz, 2 -> xy
+    uvs = np.stack([wp[..., [2, 1]], wp[..., [0, 2]], wp[..., [0, 1]]], axis=-2)
+    return np.take_along_axis(uvs, axis[..., None, None], axis=-2)[..., 0, :]
+
+def biplanar_sample(base, ss, wp, nw, tiling, sharpness):
+    n = np.abs(normalize(nw))
+    w = np.power(n, sharpness)
+    ma = _major_axis(n)
+    me = 3 - ma - _minor_axis(n)
+    sa = ss(base, _planar_uv(wp, ma) * tiling)
+    sb = ss(base, _planar_uv(wp, me) * tiling)
+    wa = np.take_along_axis(w, ma[..., None], axis=-1)
+    wb = np.take_along_axis(w, me[..., None], axis=-1)
+    return (sa * wa + sb * wb) / np.maximum(1e-5, wa + wb)
+
+def dominant_axis_sample(base, ss, wp, nw, tiling, sharpness):
+    ma = _major_axis(np.abs(nw))
+    return ss(base, _planar_uv(wp, ma) * tiling)
+
+def planar_normal_ws(s, n, axis):
+    # axis: per-pixel projection index (0: zy, 1: xz, 2: xy)
+    xy = s[..., :2] * 2.0 - 1.0
+    t = np.concatenate([xy, np.sqrt(saturate(1.0 - dot(xy, xy)))[..., None]], axis=-1)
+    tz = np.abs(t[..., 2])
+    by_axis = np.stack([
+        np.stack([tz * n[..., 0], t[..., 1] + n[..., 1], t[..., 0] + n[..., 2]], axis=-1),
+        np.stack([t[..., 0] + n[..., 0], tz * n[..., 1], t[..., 1] + n[..., 2]], axis=-1),
+        np.stack([t[..., 0] + n[..., 0], t[..., 1] + n[..., 1], tz * n[..., 2]], axis=-1),
+    ], axis=-2)
+    axis = np.broadcast_to(axis, by_axis.shape[:-2])
+    return np.take_along_axis(by_axis, axis[..., None, None], axis=-2)[..., 0, :]
+
+def triplanar_normal(base, ss, wp, nw, tiling, sharpness):
+    w = np.power(np.abs(nw), sharpness)
+    out = 0.0
+    for axis in range(3):
+        uv = _planar_uv(wp, np.full(wp.shape[:-1], axis)) * tiling
+        out = out + planar_normal_ws(ss(base, uv), nw, np.int64(axis)) * w[..., axis:axis + 1]
+    return normalize(out)
+
+def biplanar_normal(base, ss, wp, nw, tiling, sharpness):
+    n = np.abs(nw)
+    w = np.power(n, sharpness)
+    ma = _major_axis(n)
+    me = 3 - ma - _minor_axis(n)
+    na = planar_normal_ws(ss(base, _planar_uv(wp, ma) * tiling), nw, ma)
+    nb = planar_normal_ws(ss(base, _planar_uv(wp, me) * tiling), nw, me)
+    wa = np.take_along_axis(w, ma[..., None], axis=-1)
+    wb = np.take_along_axis(w, me[..., None], axis=-1)
+    return normalize(na * wa + nb * wb)
+
+def dominant_axis_normal(base, ss, wp, nw, tiling, sharpness):
+    ma = _major_axis(np.abs(nw))
+    return normalize(planar_normal_ws(ss(base, _planar_uv(wp, ma) * tiling), nw, ma))
+
+def layer_weights(m, h, n, contrast):
+    # m, h: (..., LAYER_MAX) masks and heights; layers >= n are ignored
+    live = (np.arange(m.shape[-1]) < n) & (m > 0.0)
+    c = max(contrast, 1e-4)
+    s = m + h
+    top = np.max(np.where(live, s, -1e10), axis=-1, keepdims=True)
+    w = np.where(live, np.maximum(s - top + c, 0.0), 0.0)
+    return w / np.maximum(np.sum(w, axis=-1, keepdims=True), 1e-5)
+
+def layer_blend(bc, bcs, nm, nms, ormh, ormhs, uv, m0, m1, contrast, n):
+    # Arrays are (layers, H, W, C); samplers are (tex, uv) callables as for triplanar_sample.
+    # Returns BaseColor (4), normalTS (3) and ORMH (4) concatenated on the last axis.
+    m = np.concatenate([m0, m1], axis=-1)
+    layers = m.shape[-1]
+    live = (np.arange(layers) < n) & (m > 0.0)
+    layer = np.zeros(m.shape + (4,), dtype=np.float32)
+    for i in range(min(n, layers)):
+        layer[..., i, :] = np.where(live[..., i, None], ormhs(ormh[i], uv), 0.0)
+    w = layer_weights(m, layer[..., 3], n, contrast)
+    out_bc = np.zeros(uv.shape[:-1] + (4,), dtype=np.float32)
+    nrm = np.zeros(uv.shape[:-1] + (3,), dtype=np.float32)
+    nrm[..., 2] = 1e-5
+    for j in range(min(n, layers)):
+        wj = w[..., j, None]
+        xy = nms(nm[j], uv)[..., :2] * 2.0 - 1.0
+        z = np.sqrt(saturate(1.0 - dot(xy, xy)))[..., None]
+        out_bc += np.where(wj > 0.0, bcs(bc[j], uv) * wj, 0.0)
+        nrm += np.where(wj > 0.0, np.concatenate([xy, z], axis=-1) * wj, 0.0)
+    out_ormh = np.sum(layer * w[..., None], axis=-2)
+    return np.concatenate([out_bc, normalize(nrm), out_ormh], axis=-1)
+
+def distance_fade(depth, start, range_):
+    return saturate((depth - start) / max(range_, 1e-3))
+
+def dither_threshold(svpos):
+    # 4x4 Bayer matrix over 2x2 pixel quads
+    q = (svpos * 0.5).astype(np.uint32)
+    lo = q & 1
+    hi = (q >> 1) & 1
+    b = 4 * (2 * (lo[..., 0] ^ lo[..., 1]) + lo[..., 1]) + 2 * (hi[..., 0] ^ hi[..., 1]) + hi[..., 1]
+    return (b + 0.5) / 16.0
+
+def distance_lod(depth, start, range_, svpos):
+    return np.where(distance_fade(depth, start, range_) > dither_threshold(svpos), 1.0, 0.0)
+
+def distance_mip_bias(depth, bias, start, per_octave):
+    return bias + per_octave * np.maximum(0.0, np.log2(np.maximum(depth, 1e-3) / max(start, 1e-3)))
+
+def lod_sample(tex, tex_sampler, uv, far):
+    # SampleGrad with the pixel's own gradients is a plain sample here (no mips in the reference)
+    return np.where((far < 0.5)[..., None], tex_sampler(tex, uv), 0.0)
+
+def lod_sample_normal(tex, tex_sampler, uv, far):
+    s = lod_sample(tex, tex_sampler, uv, far)
+    xy = s[..., :2] * 2.0 - 1.0
+    z = np.sqrt(saturate(1.0 - dot(xy, xy)))[..., None]
+    n = np.concatenate([xy, z, np.ones_like(z)], axis=-1)
+    return np.where((far < 0.5)[..., None], n, 0.0)
+
+# HLSL function name -> (snippet, reference, golden input generator)
+def _unit_normals(rng, n):
+    return rng.normal(size=(n, n, 3)).astype(np.float32)
+
+def tangent_normals(rng, shape, max_deg=60.0):
+    # Normal-map-like: unit normals within max_deg of +Z
+    theta = np.radians(rng.uniform(0.0, max_deg, shape))
+    phi = rng.uniform(0.0, 2.0 * np.pi, shape)
+    return np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1).astype(np.float32)
+
+def _normal_blend_inputs(rng, n):
+    return tangent_normals(rng, (n, n)), tangent_normals(rng, (n, n)), rng.random((n, n), dtype=np.float32)
+
+def _planar_inputs(rng, n):
+    return (rng.random((16, 16, 4), dtype=np.float32), sample_bilinear_wrap,
+            rng.uniform(-8.0, 8.0, (n, n, 3)).astype(np.float32), _unit_normals(rng, n),
+            np.float32(0.25), np.float32(4.0))
+
+def _layer_masks(rng, n, layers=8):
+    # Sparse masks: about half the layers are exactly 0 per pixel, like a splat map
+    m = rng.random((n, n, layers), dtype=np.float32)
+    return np.where(rng.random((n, n, layers)) < 0.5, 0.0, m).astype(np.float32)
+
+def _layer_weight_inputs(rng, n):
+    return _layer_masks(rng, n), rng.random((n, n, 8), dtype=np.float32), 6, np.float32(0.2)
+
+def _layer_blend_inputs(rng, n):
+    arrays = [rng.random((6, 16, 16, 4), dtype=np.float32) for _ in range(3)]
+    m = _layer_masks(rng, n)
+    return (arrays[0], sample_bilinear_wrap, arrays[1], sample_bilinear_wrap, arrays[2], sample_bilinear_wrap,
+            rng.uniform(-2.0, 2.0, (n, n, 2)).astype(np.float32), m[..., :4], m[..., 4:], np.float32(0.2), 6)
+
+def _depths(rng, n):
+    # Camera depths in cm straddling the default fade band (50 m + 20 m)
+    return rng.uniform(0.0, 12000.0, (n, n)).astype(np.float32)
+
+def _pixel_centers(rng, n):
+    return (rng.integers(0, 1920, (n, n, 2)) + 0.5).astype(np.float32)
+
+def _uv_transform_inputs(rng, n):
+    # One instance per pixel: UVs past 0..1 (tiling), scale 0.25..4, any rotation, offsets within +-2
+    return (rng.uniform(-2.0, 2.0, (n, n, 2)).astype(np.float32), rng.uniform(0.25, 4.0, (n, n)).astype(np.float32),
+            rng.uniform(-180.0, 180.0, (n, n)).astype(np.float32), rng.uniform(-2.0, 2.0, (n, n, 2)).astype(np.float32))
+
+def _lod_sample_inputs(rng, n):
+    return (rng.random((16, 16, 4), dtype=np.float32), sample_bilinear_wrap,
+            rng.uniform(-2.0, 2.0, (n, n, 2)).astype(np.float32), (rng.random((n, n)) < 0.5).astype(np.float32))
+
+REFERENCES = {
+    "BlendAC": (
+        hlsl_snippets.BLEND_AC_HLSL, blend_ac,
+        lambda rng, n: (_unit_normals(rng, n), _unit_normals(rng, n), rng.random((n, n), dtype=np.float32)),
+    ),
+    "BlendRNM": (hlsl_snippets.BLEND_RNM_HLSL, blend_rnm, _normal_blend_inputs),
+    "BlendUDN": (hlsl_snippets.BLEND_UDN_HLSL, blend_udn, _normal_blend_inputs),
+    "BlendWhiteout": (hlsl_snippets.BLEND_WHITEOUT_HLSL, blend_whiteout, _normal_blend_inputs),
+    "HeightWeight": (
+        hlsl_snippets.HEIGHT_WEIGHT_HLSL, height_weight,
+        lambda rng, n: (rng.random((n, n), dtype=np.float32), rng.random((n, n), dtype=np.float32), np.float32(0.2), np.float32(0.5)),
+    ),
+    "Rotate2D": (
+        hlsl_snippets.ROTATE2D_HLSL, rotate2d,
+        lambda rng, n: (rng.random((n, n, 2), dtype=np.float32), rng.uniform(-180.0, 180.0, (n, n)).astype(np.float32)),
+    ),
+    "UVAffine": (
+        hlsl_snippets.UV_AFFINE_HLSL, uv_affine,
+        lambda rng, n: (rng.uniform(-2.0, 2.0, (n, n, 2)).astype(np.float32), rng.uniform(-4.0, 4.0, (n, n, 4)).astype(np.float32),
+                        rng.uniform(-4.0, 4.0, (n, n, 4)).astype(np.float32)),
+    ),
+    "TriplanarSample": (hlsl_snippets.TRIPLANAR_HLSL, triplanar_sample, _planar_inputs),
+    "BiplanarSample": (hlsl_snippets.BIPLANAR_HLSL, biplanar_sample, _planar_inputs),
+    "DominantAxisSample": (hlsl_snippets.DOMINANT_AXIS_HLSL, dominant_axis_sample, _planar_inputs),
+    "TriplanarNormal": (hlsl_snippets.TRIPLANAR_NORMAL_HLSL, triplanar_normal, _planar_inputs),
+    "BiplanarNormal": (hlsl_snippets.TRIPLANAR_NORMAL_HLSL, biplanar_normal, _planar_inputs),
+    "DominantAxisNormal": (hlsl_snippets.TRIPLANAR_NORMAL_HLSL, dominant_axis_normal, _planar_inputs),
+    "LayerWeights": (hlsl_snippets.LAYER_WEIGHTS_HLSL, layer_weights, _layer_weight_inputs),
+    "LayerBlend": (hlsl_snippets.LAYER_BLEND_HLSL, layer_blend, _layer_blend_inputs),
+    "DistanceFade": (
+        hlsl_snippets.DISTANCE_LOD_HLSL, distance_fade,
+        lambda rng, n: (_depths(rng, n), np.float32(5000.0), np.float32(2000.0)),
+    ),
+    "DitherThreshold": (hlsl_snippets.DISTANCE_LOD_HLSL, dither_threshold, lambda rng, n: (_pixel_centers(rng, n),)),
+    "DistanceLod": (
+        hlsl_snippets.DISTANCE_LOD_HLSL, distance_lod,
+        lambda rng, n: (_depths(rng, n), np.float32(5000.0), np.float32(2000.0), _pixel_centers(rng, n)),
+    ),
+    "DistanceMipBias": (
+        hlsl_snippets.DISTANCE_LOD_HLSL, distance_mip_bias,
+        lambda rng, n: (_depths(rng, n), np.float32(0.25), np.float32(5000.0), np.float32(0.5)),
+    ),
+    "LodSample": (hlsl_snippets.LOD_SAMPLE_HLSL, lod_sample, _lod_sample_inputs),
+    "LodSampleNormal": (hlsl_snippets.LOD_SAMPLE_HLSL, lod_sample_normal, _lod_sample_inputs),
+}
+
+# Rewrites that must match the graph they replace: name -> (optimized, original, inputs)
+EQUIVALENCES = {
+    "UV affine folding": (uv_folded, uv_unfolded, _uv_transform_inputs),
+}
+
+# -------------- Golden harness --------------
+_SIGNATURE = re.compile(r"^\s*[A-Za-z0-9_]+\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(([^)]*)\)\s*\{", re.MULTILINE)
+
+def hlsl_signature(code, name):
+    for match in _SIGNATURE.finditer(code):
+        if match.group(1) == name:
+            return [p.strip() for p in match.group(2).split(",") if p.strip()]
+    return None
+
+def hlsl_fingerprint(code):
+    # Comments and whitespace do not change semantics, so they do not invalidate goldens
+    code = re.sub(r"//[^\n]*", "", code)
+    return hashlib.sha1(" ".join(code.split()).encode("utf-8")).hexdigest()
+
+def evaluate_all(size=GOLDEN_SIZE, seed=GOLDEN_SEED):
+    out = {}
+    for name, (_, ref, make_inputs) in REFERENCES.items():
+        rng = np.random.default_rng([seed, sum(map(ord, name))])
+        out[name] = np.asarray(ref(*make_inputs(rng, size)), dtype=np.float32)
+    return out
+
+def check(golden_path=GOLDEN_PATH):
+    errors = []
+    for name, (code, ref, _) in REFERENCES.items():
+        params = hlsl_signature(code, name)
+        if params is not None:
+            # out parameters are results, not reference arguments
+            params = [p for p in params if not p.startswith(("out ", "inout "))]
+        if params is None:
+            errors.append(f"{name}: function not found in its HLSL snippet")
+        elif len(params) != len(inspect.signature(ref).parameters):
+            errors.append(f"{name}: HLSL takes {len(params)} args, reference {ref.__name__} takes {len(inspect.signature(ref).parameters)}")
+
+    for name, (optimized, original, make_inputs) in EQUIVALENCES.items():
+        inputs = make_inputs(np.random.default_rng([GOLDEN_SEED, sum(map(ord, name))]), GOLDEN_SIZE)
+        diff = np.max(np.abs(optimized(*inputs) - original(*inputs)))
+        if not diff <= FOLD_ATOL:
+            errors.append(f"{name}: {optimized.__name__} differs from {original.__name__} by {diff:.3g} > {FOLD_ATOL}")
+
+    if not Path(golden_path).exists():
+        return errors + [f"missing golden file {golden_path} (run with --bless)"]
+    golden = np.load(golden_path)
+    results = evaluate_all()
+    for name, (code, _, _) in REFERENCES.items():
+        if f"{name}.hlsl" not in golden or str(golden[f"{name}.hlsl"]) != hlsl_fingerprint(code):
+            errors.append(f"{name}: HLSL changed since the golden was blessed; update the reference and --bless")
+            continue
+        expected = golden[name]
+        if expected.shape != results[name].shape:
+            errors.append(f"{name}: shape {results[name].shape} != golden {expected.shape}")
+            continue
+        diff = np.nanmax(np.abs(results[name] - expected))
+        if not np.array_equal(np.isnan(results[name]), np.isnan(expected)) or diff > GOLDEN_ATOL:
+            errors.append(f"{name}: max abs error {diff:.3g} > {GOLDEN_ATOL}")
+    return errors
+
+def bless(golden_path=GOLDEN_PATH):
+    arrays = evaluate_all()
+    for name, (code, _, _) in REFERENCES.items():
+        arrays[f"{name}.hlsl"] = np.array(hlsl_fingerprint(code))
+    np.savez_compressed(golden_path, **arrays)
+    return sorted(REFERENCES)
+
+if __name__ == "__main__":
+    if "--bless" in sys.argv:
+        print(f"blessed {', '.join(bless())} -> {GOLDEN_PATH}")
+    else:
+        problems = check()
+        for p in problems:
+            print(f"FAIL {p}")
+        print("hlsl_reference: OK" if not problems else f"hlsl_reference: {len(problems)} failure(s)")
+        sys.exit(1 if problems else 0)
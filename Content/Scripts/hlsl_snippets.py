@@ -31,6 +31,14 @@ float2 Rotate2D(float2 uv, float deg){
 }
 """
 
+UV_AFFINE_HLSL = r"""
+// Folded UV transform: rows of a 2x3 matrix precomputed per instance (pbr_rows.uv_affine_rows) from
+// scale, rotation and offset; uv' = float2(dot(rowU.xy, uv), dot(rowV.xy, uv)) + (rowU.z, rowV.z)
+float2 UVAffine(float2 uv, float4 rowU, float4 rowV){
+    return float2(dot(rowU.xy, uv), dot(rowV.xy, uv)) + float2(rowU.z, rowV.z);
+}
+"""
+
 TRIPLANAR_HLSL = r"""
 // Simple triplanar sampler. expects:
 // TexObject2D Base, float3 WorldPos, float3 WorldNormal, float Tiling, float sharpness
@@ -50,3 +58,225 @@ float4 TriplanarSample(Texture2D Base, SamplerState SS, float3 WP, float3 NW, fl
     return sx * w.x + sy * w.y + sz * w.z;
 }
 """
+
+BIPLANAR_HLSL = r"""
+// Biplanar sampler: the two most significant of the triplanar projections only (2 samples).
+// Same projections/weights as TriplanarSample, renormalized over the two kept axes.
+float4 BiplanarSample(Texture2D Base, SamplerState SS, float3 WP, float3 NW, float tiling, float sharpness){
+    float3 n = abs(normalize(NW));
+    float3 w = pow(n, sharpness.xxx);
+    int ma = (n.x > n.y && n.x > n.z) ? 0 : ((n.y > n.z) ? 1 : 2);
+    int mi = (n.x < n.y && n.x <= n.z) ? 0 : ((n.y <= n.z) ? 1 : 2);
+    int me = 3 - ma - mi;
+    float2 uvA = ((ma == 0) ? WP.zy : ((ma == 1) ? WP.xz : WP.xy)) * tiling;
+    float2 uvB = ((me == 0) ? WP.zy : ((me == 1) ? WP.xz : WP.xy)) * tiling;
+
+    float4 sa = Base.Sample(SS, uvA);
+    float4 sb = Base.Sample(SS, uvB);
+
+    return (sa * w[ma] + sb * w[me]) / max(1e-5, w[ma] + w[me]);
+}
+"""
+
+DOMINANT_AXIS_HLSL = r"""
+// Dominant-axis sampler: only the projection facing the normal most (1 sample).
+// sharpness is unused; kept so all triplanar variants share a signature.
+float4 DominantAxisSample(Texture2D Base, SamplerState SS, float3 WP, float3 NW, float tiling, float sharpness){
+    float3 n = abs(NW);
+    int ma = (n.x > n.y && n.x > n.z) ? 0 : ((n.y > n.z) ? 1 : 2);
+    float2 uv = ((ma == 0) ? WP.zy : ((ma == 1) ? WP.xz : WP.xy)) * tiling;
+    return Base.Sample(SS, uv);
+}
+"""
+
+TRIPLANAR_NORMAL_HLSL = r"""
+// Triplanar normal maps: same signatures, projections and weights as TriplanarSample, BiplanarSample
+// and DominantAxisSample, but each sample is unpacked like LodSampleNormal (BC5 xy * 2 - 1, z rebuilt)
+// and whiteout-blended with the world normal NW in that projection's frame: X projects zy, Y xz, Z xy,
+// and the projection axis takes |t.z| * NW.axis, so faces looking down -axis keep their sign.
+// Returns a normalized world-space normal: no tangent-to-world transform afterwards. NW is used as is
+// (VertexNormalWS, unit up to interpolation): scale cancels in the weights and the final normalize.
+float3 UnpackNormalXY(float4 s){
+    float2 xy = s.xy * 2.0 - 1.0;
+    return float3(xy, sqrt(saturate(1.0 - dot(xy, xy))));
+}
+
+// Projection `axis` chosen per pixel (biplanar / dominant axis): the three swizzles as selects
+float3 PlanarNormalWS(float4 s, float3 N, int axis){
+    float3 t = UnpackNormalXY(s);
+    float3 v = (axis == 0) ? t.zyx : ((axis == 1) ? t.xzy : t);
+    float3 m = float3(axis == 0, axis == 1, axis == 2);
+    return lerp(v + N, abs(v) * N, m);
+}
+
+float3 TriplanarNormal(Texture2D Base, SamplerState SS, float3 WP, float3 NW, float tiling, float sharpness){
+    float3 w = pow(abs(NW), sharpness.xxx);
+    float3 tx = UnpackNormalXY(Base.Sample(SS, WP.zy * tiling));
+    float3 ty = UnpackNormalXY(Base.Sample(SS, WP.xz * tiling));
+    float3 tz = UnpackNormalXY(Base.Sample(SS, WP.xy * tiling));
+    float3 nx = float3(abs(tx.z) * NW.x, tx.y + NW.y, tx.x + NW.z);
+    float3 ny = float3(ty.x + NW.x, abs(ty.z) * NW.y, ty.y + NW.z);
+    float3 nz = float3(tz.xy + NW.xy, abs(tz.z) * NW.z);
+    return normalize(nx * w.x + ny * w.y + nz * w.z);
+}
+
+float3 BiplanarNormal(Texture2D Base, SamplerState SS, float3 WP, float3 NW, float tiling, float sharpness){
+    float3 n = abs(NW);
+    float3 w = pow(n, sharpness.xxx);
+    int ma = (n.x > n.y && n.x > n.z) ? 0 : ((n.y > n.z) ? 1 : 2);
+    int mi = (n.x < n.y && n.x <= n.z) ? 0 : ((n.y <= n.z) ? 1 : 2);
+    int me = 3 - ma - mi;
+    float2 uvA = ((ma == 0) ? WP.zy : ((ma == 1) ? WP.xz : WP.xy)) * tiling;
+    float2 uvB = ((me == 0) ? WP.zy : ((me == 1) ? WP.xz : WP.xy)) * tiling;
+
+    float3 na = PlanarNormalWS(Base.Sample(SS, uvA), NW, ma);
+    float3 nb = PlanarNormalWS(Base.Sample(SS, uvB), NW, me);
+    return normalize(na * w[ma] + nb * w[me]);
+}
+
+float3 DominantAxisNormal(Texture2D Base, SamplerState SS, float3 WP, float3 NW, float tiling, float sharpness){
+    float3 n = abs(NW);
+    int ma = (n.x > n.y && n.x > n.z) ? 0 : ((n.y > n.z) ? 1 : 2);
+    float2 uv = ((ma == 0) ? WP.zy : ((ma == 1) ? WP.xz : WP.xy)) * tiling;
+    return normalize(PlanarNormalWS(Base.Sample(SS, uv), NW, ma));
+}
+"""
+
+LAYER_WEIGHTS_HLSL = r"""
+// N-layer HeightWeight, all weights in one pass: each layer scores mask + height (the bias balance
+// puts on hB - hA), layers within `contrast` of the best score keep weight, renormalized to sum 1.
+// A zero mask gives exactly 0, so callers can skip that layer entirely.
+#define LAYER_MAX 8
+void LayerWeights(float m[LAYER_MAX], float h[LAYER_MAX], int n, float contrast, out float w[LAYER_MAX]){
+    float c = max(contrast, 1e-4);
+    float top = -1e10;
+    [unroll] for (int i = 0; i < LAYER_MAX; i++) {
+        if (i < n && m[i] > 0.0) top = max(top, m[i] + h[i]);
+    }
+    float sum = 0.0;
+    [unroll] for (int j = 0; j < LAYER_MAX; j++) {
+        w[j] = (j < n && m[j] > 0.0) ? max(m[j] + h[j] - top + c, 0.0) : 0.0;
+        sum += w[j];
+    }
+    [unroll] for (int k = 0; k < LAYER_MAX; k++) {
+        w[k] /= max(sum, 1e-5);
+    }
+}
+"""
+
+LAYER_BLEND_HLSL = r"""
+// N-layer blend from Texture2DArrays (slice = layer). Needs LAYER_WEIGHTS_HLSL. Height is ORMH.a
+// (ORM + packed height, see texture_arrays.py) and only read where the mask is > 0; BaseColor and
+// Normal are only read for layers with weight > 0. Gradients are taken outside the branches.
+// Returns BaseColor; normalTS is the blended tangent-space normal, ormh the blended ORM + height.
+float4 LayerBlend(Texture2DArray BC, SamplerState BCS, Texture2DArray NM, SamplerState NMS, Texture2DArray ORMH, SamplerState ORMHS,
+                  float2 uv, float4 m0, float4 m1, float contrast, int n, out float3 normalTS, out float4 ormh){
+    float2 dx = ddx(uv);
+    float2 dy = ddy(uv);
+    float m[LAYER_MAX] = {m0.x, m0.y, m0.z, m0.w, m1.x, m1.y, m1.z, m1.w};
+    float h[LAYER_MAX];
+    float4 layer[LAYER_MAX];
+    [unroll] for (int i = 0; i < LAYER_MAX; i++) {
+        layer[i] = 0.0;
+        [branch] if (i < n && m[i] > 0.0) {
+            layer[i] = ORMH.SampleGrad(ORMHS, float3(uv, i), dx, dy);
+        }
+        h[i] = layer[i].a;
+    }
+    float w[LAYER_MAX];
+    LayerWeights(m, h, n, contrast, w);
+
+    float4 bc = 0.0;
+    float3 nrm = float3(0.0, 0.0, 1e-5);
+    ormh = 0.0;
+    [unroll] for (int j = 0; j < LAYER_MAX; j++) {
+        [branch] if (w[j] > 0.0) {
+            bc += BC.SampleGrad(BCS, float3(uv, j), dx, dy) * w[j];
+            float2 xy = NM.SampleGrad(NMS, float3(uv, j), dx, dy).xy * 2.0 - 1.0;
+            nrm += float3(xy, sqrt(saturate(1.0 - dot(xy, xy)))) * w[j];
+            ormh += layer[j] * w[j];
+        }
+    }
+    normalTS = normalize(nrm);
+    return bc;
+}
+"""
+
+DISTANCE_LOD_HLSL = r"""
+// Camera-distance LOD for M_PBR_Master. Fade is 0 up to `start` and 1 from start + range; in between
+// pixels switch to RVT-only shading through a 4x4 ordered dither (TAA resolves it into a crossfade).
+// The dither cell is a 2x2 pixel quad, so a quad only splits where the fade itself crosses a threshold.
+float DistanceFade(float depth, float start, float range){
+    return saturate((depth - start) / max(range, 1e-3));
+}
+
+float DitherThreshold(float2 svpos){
+    uint2 q = uint2(svpos * 0.5);
+    uint2 lo = q & 1;
+    uint2 hi = (q >> 1) & 1;
+    uint b = 4 * (2 * (lo.x ^ lo.y) + lo.y) + 2 * (hi.x ^ hi.y) + hi.y;
+    return (b + 0.5) / 16.0;
+}
+
+// 1 = shade from the RVT only, 0 = full local + RVT blend
+float DistanceLod(float depth, float start, float range, float2 svpos){
+    return DistanceFade(depth, start, range) > DitherThreshold(svpos) ? 1.0 : 0.0;
+}
+
+// RVT mip bias: `bias` up to `start`, then + perOctave every time the distance doubles
+float DistanceMipBias(float depth, float bias, float start, float perOctave){
+    return bias + perOctave * max(0.0, log2(max(depth, 1e-3) / max(start, 1e-3)));
+}
+"""
+
+LOD_SAMPLE_HLSL = r"""
+// Local texture read skipped on RVT-only pixels (far = DistanceLod). Gradients are taken before the
+// branch, so pixels that do sample get the right mip even when their quad is split.
+float4 LodSample(Texture2D Tex, SamplerState TexSampler, float2 uv, float far){
+    float2 dx = ddx(uv);
+    float2 dy = ddy(uv);
+    float4 s = 0.0;
+    [branch] if (far < 0.5) {
+        s = Tex.SampleGrad(TexSampler, uv, dx, dy);
+    }
+    return s;
+}
+
+// Same for a BC5/two-channel normal map: unpacked to a tangent-space normal (0 when skipped)
+float4 LodSampleNormal(Texture2D Tex, SamplerState TexSampler, float2 uv, float far){
+    float4 s = LodSample(Tex, TexSampler, uv, far);
+    float2 xy = s.xy * 2.0 - 1.0;
+    return far < 0.5 ? float4(xy, sqrt(saturate(1.0 - dot(xy, xy))), 1.0) : 0.0;
+}
+"""
+
+# Normal-blend alternatives to BlendAC for M_PBR_Master, all in tangent space. nB (RVT) is the base and
+# nA (local) the detail; w fades nB's detail in and nA's out, so w = 0 gives nA and w = 1 gives nB.
+BLEND_RNM_HLSL = r"""
+// Reoriented normal mapping: nA is rotated onto nB (exact detail reorientation). Most ALU of the three.
+// The base must be unit length; the result scales with the detail, so the detail need not be (and
+// t * dot(t, u) - u * t.z is the usual form times t.z > 0, without the divide).
+float3 BlendRNM(float3 nA_ts, float3 nB_ts, float w){
+    float3 t = normalize(float3(nB_ts.xy * w, lerp(1.0, nB_ts.z, w))) + float3(0.0, 0.0, 1.0);
+    float3 u = float3(-nA_ts.xy * (1.0 - w), lerp(1.0, nA_ts.z, 1.0 - w));
+    return normalize(t * dot(t, u) - u * t.z);
+}
+"""
+
+BLEND_UDN_HLSL = r"""
+// UDN: detail slopes added to the base, base Z kept. Cheapest; flattens the detail on steep bases
+// and where w = 0 (nA.z is dropped).
+float3 BlendUDN(float3 nA_ts, float3 nB_ts, float w){
+    float3 b = float3(nB_ts.xy * w, lerp(1.0, nB_ts.z, w));
+    return normalize(float3(b.xy + nA_ts.xy * (1.0 - w), b.z));
+}
+"""
+
+BLEND_WHITEOUT_HLSL = r"""
+// Whiteout: slopes added, Z multiplied. Close to RNM for moderate angles at about UDN cost.
+float3 BlendWhiteout(float3 nA_ts, float3 nB_ts, float w){
+    float3 b = float3(nB_ts.xy * w, lerp(1.0, nB_ts.z, w));
+    float3 d = float3(nA_ts.xy * (1.0 - w), lerp(1.0, nA_ts.z, 1.0 - w));
+    return normalize(float3(b.xy + d.xy, b.z * d.z));
+}
+"""
@@ -0,0 +1,412 @@
+# Node-level diff of a Material / MaterialFunction graph and in-place patching of the live asset.
+# The builders write into a staging copy next to the live asset (create_pbr_rvt_pipeline.build_target);
+# only the nodes, properties and links that differ are applied, so untouched expressions keep their
+# GUIDs and an empty diff means nothing to recompile or save.
+import unreal
+
+mat_lib = unreal.MaterialEditingLibrary
+
+# Plain (non-link) properties compared per expression
+NODE_PROPERTIES = (
+    "parameter_name", "default_value", "group", "sort_priority",
+    "input_name", "input_type", "preview_value", "use_preview_value_as_default", "output_name",
+    "code", "output_type", "description", "inputs", "additional_outputs",
+    "constant", "constant_x", "constant_y", "r", "g", "b", "a",
+    "material_function", "sampler_type", "sampler_source", "mip_value_mode", "virtual_texture",
+    "transform_source_type", "transform_type",
+    "text", "size_x", "size_y", "comment_color", "editable",
+    "material_expression_editor_x", "material_expression_editor_y",
+)
+ASSET_PROPERTIES = ("material_domain", "shading_model", "blend_mode", "use_material_attributes", "description")
+
+# Properties that name an expression, so it is matched across builds even after a move or relink.
+# Anything else is matched by class + editor position (+ creation order among exact duplicates).
+ANCHOR_PROPERTIES = ("parameter_name", "input_name", "output_name", "material_function", "text")
+
+# Material output pins compared as graph roots
+ROOT_PROPERTIES = {"MaterialAttributes": "MP_MATERIAL_ATTRIBUTES"}
+
+# -------------- Reading --------------
+def _get(obj, prop):
+    try:
+        return obj.get_editor_property(prop)
+    except Exception:
+        return None
+
+def _is_link(value):
+    return isinstance(value, unreal.MaterialExpression) or hasattr(value, "node")
+
+def freeze(value):
+    # Comparable, hashable form of a property value
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, unreal.LinearColor):
+        return (value.r, value.g, value.b, value.a)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_item(v) for v in value)
+    if hasattr(value, "get_path_name"):
+        return value.get_path_name()
+    return str(value)
+
+def _freeze_item(value):
+    # Custom node inputs compare by name (their links are read separately), outputs by name + type
+    if hasattr(value, "input_name"):
+        return str(_get(value, "input_name"))
+    if hasattr(value, "output_name"):
+        return (str(_get(value, "output_name")), str(_get(value, "output_type")))
+    return freeze(value)
+
+def read_properties(obj, names):
+    props = {}
+    for prop in names:
+        value = _get(obj, prop)
+        if value is not None and not _is_link(value):
+            props[prop] = freeze(value)
+    return props
+
+def expressions_of(asset):
+    collection = _get(asset, "expression_collection")
+    if collection is not None:
+        return list(_get(collection, "expressions") or [])
+    return list(_get(asset, "expressions") or [])
+
+def expression_kind(expr):
+    return type(expr).__name__[len("MaterialExpression"):]
+
+def read_links(asset, expr):
+    # {input name: (source expression, source output pin)}
+    material = asset if isinstance(asset, unreal.Material) else None
+    names = mat_lib.get_material_expression_input_names(expr)
+    sources = mat_lib.get_inputs_for_material_expression(material, expr)
+    links = {}
+    for name, src in zip(names, sources):
+        if src is not None:
+            links[str(name)] = (src, str(mat_lib.get_input_node_output_name_for_material_expression(expr, src)))
+    return links
+
+def read_roots(asset):
+    roots = {}
+    if not isinstance(asset, unreal.Material):
+        return roots
+    for name, prop in ROOT_PROPERTIES.items():
+        prop = getattr(unreal.MaterialProperty, prop)
+        src = mat_lib.get_material_property_input_node(asset, prop)
+        if src is not None:
+            roots[name] = (src, str(mat_lib.get_material_property_input_node_output_name(asset, prop)))
+    return roots
+
+# -------------- Snapshot --------------
+class Node:
+    __slots__ = ("key", "expr", "kind", "props", "links", "ambiguous")
+
+    def __init__(self, key, expr, kind, props):
+        self.key = key
+        self.expr = expr
+        self.kind = kind
+        self.props = props
+        self.links = {}
+        # The API reports one output pin per source node, so pins are unreliable when a source
+        # feeds several inputs of this node (e.g. WorldPos + WorldNormal of one function call)
+        self.ambiguous = False
+
+def node_anchor(expr, kind, props):
+    for prop in ANCHOR_PROPERTIES:
+        if props.get(prop) not in (None, ""):
+            return f"{kind}:{props[prop]}"
+    return f"{kind}@{props.get('material_expression_editor_x', 0)},{props.get('material_expression_editor_y', 0)}"
+
+class GraphSnapshot:
+    def __init__(self, asset):
+        self.asset = asset
+        self.props = read_properties(asset, ASSET_PROPERTIES)
+        self.nodes = {}
+        keys = {}
+        seen = {}
+        for expr in expressions_of(asset):
+            kind = expression_kind(expr)
+            props = read_properties(expr, NODE_PROPERTIES)
+            anchor = node_anchor(expr, kind, props)
+            n = seen[anchor] = seen.get(anchor, -1) + 1
+            key = anchor if n == 0 else f"{anchor}#{n}"
+            self.nodes[key] = Node(key, expr, kind, props)
+            keys[id(expr)] = key
+        for node in self.nodes.values():
+            raw = read_links(asset, node.expr)
+            sources = [id(src) for src, _ in raw.values()]
+            node.ambiguous = len(sources) != len(set(sources))
+            node.links = {name: (keys.get(id(src)), pin) for name, (src, pin) in raw.items()}
+        self.roots = {name: (keys.get(id(src)), pin) for name, (src, pin) in read_roots(asset).items()}
+
+# -------------- Diff --------------
+class GraphDiff:
+    def __init__(self):
+        self.asset_props = []      # asset-level properties that differ
+        self.added = []            # keys only in the target graph
+        self.removed = []          # keys only in the live graph
+        self.recreated = []        # keys that lose a link: no disconnect API, so delete + add
+        self.changed = {}          # key -> [property]
+        self.relinked = {}         # key -> [input]
+        self.roots = []            # material outputs to reconnect
+
+    @property
+    def empty(self):
+        return not (self.asset_props or self.added or self.removed or self.recreated
+                    or self.changed or self.relinked or self.roots)
+
+    def summary(self):
+        links = sum(len(v) for v in self.relinked.values())
+        return (f"+{len(self.added)} -{len(self.removed)} nodes, {len(self.recreated)} recreated, "
+                f"{len(self.changed)} changed, {links} links, {len(self.roots) + len(self.asset_props)} asset props")
+
+def diff_graphs(live, target):
+    d = GraphDiff()
+    d.asset_props = [p for p in target.props if live.props.get(p) != target.props[p]]
+    d.added = [k for k in target.nodes if k not in live.nodes]
+    d.removed = [k for k in live.nodes if k not in target.nodes]
+    for key, want in target.nodes.items():
+        have = live.nodes.get(key)
+        if have is None:
+            continue
+        props = [p for p in want.props if have.props.get(p) != want.props[p]]
+        props += [p for p in have.props if p not in want.props and p not in props]
+        if props:
+            d.changed[key] = props
+        if any(name not in want.links for name in have.links):
+            d.recreated.append(key)
+            continue
+        inputs = [name for name, link in want.links.items() if have.links.get(name) != link]
+        if inputs:
+            d.relinked[key] = inputs
+    # Consumers of a recreated node have to be pointed at the new expression
+    for key, want in target.nodes.items():
+        if key in live.nodes and key not in d.recreated:
+            stale = [name for name, (src, _) in want.links.items()
+                     if src in d.recreated and name not in d.relinked.get(key, ())]
+            if stale:
+                d.relinked.setdefault(key, []).extend(stale)
+    d.roots = [name for name, link in target.roots.items()
+               if live.roots.get(name) != link or link[0] in d.recreated]
+    return d
+
+def unsafe_nodes(diff, target):
+    # Nodes whose links would have to be written but whose output pins cannot be read back reliably
+    written = set(diff.added) | set(diff.recreated) | set(diff.relinked)
+    return sorted(k for k in written if target.nodes[k].ambiguous)
+
+# -------------- Patch --------------
+def _create(asset, node):
+    x = node.props.get("material_expression_editor_x", 0)
+    y = node.props.get("material_expression_editor_y", 0)
+    if isinstance(asset, unreal.MaterialFunction):
+        return mat_lib.create_material_expression_in_function(asset, type(node.expr), x, y)
+    return mat_lib.create_material_expression(asset, type(node.expr), x, y)
+
+def _delete(asset, expr):
+    if isinstance(asset, unreal.MaterialFunction):
+        mat_lib.delete_material_expression_in_function(asset, expr)
+    else:
+        mat_lib.delete_material_expression(asset, expr)
+
+def _copy_property(src, dst, prop):
+    value = _get(src, prop)
+    if prop == "inputs":
+        # Custom node input list: names only, the links are connected afterwards
+        value = [unreal.CustomInput(input_name=str(_get(i, "input_name"))) for i in value]
+    dst.set_editor_property(prop, value)
+
+def apply_diff(asset, diff, live, target):
+    # Mutates the live asset; returns {key: expression} of the patched graph
+    for prop in diff.asset_props:
+        asset.set_editor_property(prop, _get(target.asset, prop))
+
+    exprs = {key: node.expr for key, node in live.nodes.items()}
+    for key in diff.removed + diff.recreated:
+        _delete(asset, exprs.pop(key))
+    for key in diff.added + diff.recreated:
+        want = target.nodes[key]
+        exprs[key] = _create(asset, want)
+        for prop in want.props:
+            _copy_property(want.expr, exprs[key], prop)
+    for key, props in diff.changed.items():
+        if key in diff.recreated:
+            continue
+        for prop in props:
+            _copy_property(target.nodes[key].expr, exprs[key], prop)
+
+    writes = [(key, list(target.nodes[key].links)) for key in diff.added + diff.recreated]
+    writes += list(diff.relinked.items())
+    for key, inputs in writes:
+        for name in inputs:
+            src, pin = target.nodes[key].links[name]
+            mat_lib.connect_material_expressions(exprs[src], pin, exprs[key], name)
+    for name in diff.roots:
+        src, pin = target.roots[name]
+        mat_lib.connect_material_property(exprs[src], pin, getattr(unreal.MaterialProperty, ROOT_PROPERTIES[name]))
+    return exprs
+
+# -------------- Optimize --------------
+# Runs on a freshly built graph before it is diffed, compiled or saved: identity ops are bypassed,
+# duplicate expressions merged and whatever no longer reaches an output deleted. Parameters,
+# function inputs and comments are never removed (instances and callers address them by name).
+# There is no graph description between the builders and the editor API, so it edits the created
+# (staging) asset; it is a safety net, wasted nodes are dropped in the builders themselves.
+KEEP_PROPERTIES = ("parameter_name", "input_name")
+KEEP_KINDS = ("Comment", "FunctionInput")
+
+# kind -> (input that may be the identity, identity value, the other input)
+IDENTITIES = {
+    "Add": (("a", 0.0, "b"), ("b", 0.0, "a")),
+    "Subtract": (("b", 0.0, "a"),),
+    "Multiply": (("a", 1.0, "b"), ("b", 1.0, "a")),
+    "Divide": (("b", 1.0, "a"),),
+}
+
+# Output width of leaf kinds, so folding Add(x, float2(0,0)) cannot change the type of x
+WIDTHS = {"TextureCoordinate": 2, "Constant": 1, "ScalarParameter": 1, "Constant2Vector": 2,
+          "Constant3Vector": 3, "Constant4Vector": 4, "PixelDepth": 1}
+
+class OptimizeStats:
+    def __init__(self):
+        self.folded = 0
+        self.merged = 0
+        self.dead = 0
+        self.snapshot = None
+
+    @property
+    def removed(self):
+        return self.folded + self.merged + self.dead
+
+    def summary(self):
+        return f"{self.removed} nodes removed ({self.folded} folded, {self.merged} merged, {self.dead} dead)"
+
+def constant_value(node):
+    p = node.props
+    if node.kind == "Constant":
+        return (p.get("r") or 0.0,)
+    if node.kind == "Constant2Vector":
+        return (p.get("constant_x") or 0.0, p.get("constant_y") or 0.0)
+    if node.kind in ("Constant3Vector", "Constant4Vector"):
+        value = p.get("constant") or (0.0, 0.0, 0.0, 0.0)
+        return tuple(value[:3 if node.kind == "Constant3Vector" else 4])
+    return None
+
+def _links(node):
+    # Input names differ in case between assigned properties and connected pins ("a" vs "A")
+    return {name.lower(): link for name, link in node.links.items()}
+
+def _rewire(snap, key, new_key, pin=None):
+    # Point every consumer of `key` at `new_key` (same output pin unless `pin` is given) on the asset
+    # and in `snap`; False if a consumer's pins can't be read back reliably, then nothing is touched
+    uses = [(node, name) for node in snap.nodes.values() for name, (src, _) in node.links.items() if src == key]
+    if any(node.ambiguous for node, _ in uses):
+        return False
+    expr = snap.nodes[new_key].expr
+    for node, name in uses:
+        link = (new_key, node.links[name][1] if pin is None else pin)
+        mat_lib.connect_material_expressions(expr, link[1], node.expr, name)
+        node.links[name] = link
+    for node, _ in uses:
+        sources = [src for src, _ in node.links.values()]
+        node.ambiguous = len(sources) != len(set(sources))
+    for name, (src, root_pin) in list(snap.roots.items()):
+        if src == key:
+            snap.roots[name] = (new_key, root_pin if pin is None else pin)
+            mat_lib.connect_material_property(expr, snap.roots[name][1], getattr(unreal.MaterialProperty, ROOT_PROPERTIES[name]))
+    return True
+
+def _remove(snap, key):
+    _delete(snap.asset, snap.nodes.pop(key).expr)
+
+def _rekey(snap):
+    # Renumber duplicate anchors ("kind@x,y#1") the way a fresh GraphSnapshot of the asset would
+    keys, seen = {}, {}
+    for key, node in snap.nodes.items():
+        anchor = key.split("#")[0]
+        n = seen[anchor] = seen.get(anchor, -1) + 1
+        keys[key] = node.key = anchor if n == 0 else f"{anchor}#{n}"
+    snap.nodes = {keys[key]: node for key, node in snap.nodes.items()}
+    for node in snap.nodes.values():
+        node.links = {name: (keys.get(src), pin) for name, (src, pin) in node.links.items()}
+    snap.roots = {name: (keys.get(src), pin) for name, (src, pin) in snap.roots.items()}
+
+def _fold_identities(snap):
+    folded = 0
+    for key, node in list(snap.nodes.items()):
+        links = _links(node)
+        if node.kind not in IDENTITIES or node.ambiguous or len(links) != 2:
+            continue
+        for ident, value, other in IDENTITIES[node.kind]:
+            const = snap.nodes.get(links.get(ident, (None,))[0])
+            src, pin = links.get(other, (None, ""))
+            if const is None or src is None or constant_value(const) is None:
+                continue
+            values = constant_value(const)
+            width = WIDTHS.get(snap.nodes[src].kind) if not pin else None
+            if any(v != value for v in values) or (len(values) > 1 and (width or 0) < len(values)):
+                continue
+            if _rewire(snap, key, src, pin):
+                _remove(snap, key)
+                folded += 1
+            break
+    return folded
+
+def _cse_key(node):
+    props = tuple(sorted((k, v) for k, v in node.props.items()
+                         if k not in ("material_expression_editor_x", "material_expression_editor_y")))
+    return node.kind, props, tuple(sorted(_links(node).items()))
+
+def _merge_duplicates(snap):
+    # One sweep; consumers of a merged node only become duplicates themselves on the next sweep
+    merged = 0
+    seen = {}
+    for key, node in list(snap.nodes.items()):
+        # Named nodes (parameters, inputs/outputs, function calls) and outputs stay as they are
+        anchored = not node_anchor(node.expr, node.kind, node.props).startswith(f"{node.kind}@")
+        if node.ambiguous or anchored or node.kind in KEEP_KINDS or node.kind.endswith("Output"):
+            continue
+        first = seen.setdefault(_cse_key(node), key)
+        if first != key and _rewire(snap, key, first):
+            _remove(snap, key)
+            merged += 1
+    return merged
+
+def _is_root(asset, node):
+    if isinstance(asset, unreal.MaterialFunction):
+        return node.kind == "FunctionOutput"
+    # Material output nodes (RuntimeVirtualTextureOutput, ...); a FunctionOutput in a material is dead
+    return node.kind.endswith("Output") and node.kind != "FunctionOutput"
+
+def _remove_dead(snap):
+    stack = [src for src, _ in snap.roots.values() if src]
+    for key, node in snap.nodes.items():
+        if _is_root(snap.asset, node) or node.kind in KEEP_KINDS or any(node.props.get(p) for p in KEEP_PROPERTIES):
+            stack.append(key)
+    live = set()
+    while stack:
+        key = stack.pop()
+        if key in live or key not in snap.nodes:
+            continue
+        live.add(key)
+        stack.extend(src for src, _ in snap.nodes[key].links.values() if src)
+    dead = [key for key in snap.nodes if key not in live]
+    for key in dead:
+        _remove(snap, key)
+    return len(dead)
+
+def optimize(asset):
+    # Mutates `asset`; returns OptimizeStats. The graph is read once and kept in step in
+    # stats.snapshot, which matches a fresh GraphSnapshot of the optimized asset.
+    stats = OptimizeStats()
+    snap = stats.snapshot = GraphSnapshot(asset)
+    stats.folded = _fold_identities(snap)
+    while True:
+        merged = _merge_duplicates(snap)
+        stats.merged += merged
+        if not merged:
+            break
+    # Only graphs whose outputs are all known roots; a material wired to plain pins keeps everything
+    if isinstance(asset, unreal.MaterialFunction) or _get(asset, "use_material_attributes"):
+        stats.dead = _remove_dead(snap)
+    if stats.removed:
+        _rekey(snap)
+    return stats
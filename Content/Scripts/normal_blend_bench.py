@@ -0,0 +1,152 @@
+# CPU accuracy / throughput benchmark for the M_PBR_Master normal-blend modes (no editor needed).
+#   cd Content && python -m Scripts.normal_blend_bench [--pixels 4194304] [--maps local.npy rvt.npy]
+#                                                      [--classes terrain=1,props=4] [--report out.json]
+# Every mode runs its hlsl_reference version over the same normals and weights, chunk by chunk, and is
+# compared with an exact reoriented-detail blend (quaternion rotation in float64). Op counts are the
+# shader_cost estimate of the snippet; `cost` weighs a transcendental as 4 ALU.
+# --maps takes two tangent-space normal maps (.npy, unsigned 0..1 / uint8 / uint16, memory-mapped);
+# without it a seeded synthetic set is used. --classes picks the cheapest mode under each mean-error limit.
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from Scripts import hlsl_reference, hlsl_snippets, shader_cost
+from Scripts.texture_packer import open_image, to_unit
+
+CHUNK_PIXELS = 1 << 20
+DEFAULT_PIXELS = 1 << 22
+SEED = 1234
+TRANSCENDENTAL_COST = 4
+
+# Mode -> (snippet, reference, "normal_blend" value in Config/naming.json)
+MODES = {
+    "AC": (hlsl_snippets.BLEND_AC_HLSL, hlsl_reference.blend_ac, "ac"),
+    "RNM": (hlsl_snippets.BLEND_RNM_HLSL, hlsl_reference.blend_rnm, "rnm"),
+    "Whiteout": (hlsl_snippets.BLEND_WHITEOUT_HLSL, hlsl_reference.blend_whiteout, "whiteout"),
+    "UDN": (hlsl_snippets.BLEND_UDN_HLSL, hlsl_reference.blend_udn, "udn"),
+}
+
+# -------------- Reference --------------
+def reoriented_exact(n_a, n_b, w):
+    # nB's detail scaled by w, then nA's detail scaled by 1 - w rotated by the rotation taking +Z to it
+    n_a = np.asarray(n_a, np.float64)
+    n_b = np.asarray(n_b, np.float64)
+    w = np.asarray(w, np.float64)
+    b = hlsl_reference.normalize(hlsl_reference.detail_strength(n_b, w))
+    d = hlsl_reference.normalize(hlsl_reference.detail_strength(n_a, 1.0 - w))
+    # q = normalize(cross(Z, b), 1 + b.z); v' = v + 2 q.w (q x v) + 2 q x (q x v)
+    q = np.stack([-b[..., 1], b[..., 0], np.zeros_like(b[..., 0])], axis=-1)
+    qw = 1.0 + b[..., 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = 1.0 / np.sqrt(hlsl_reference.dot(q, q) + qw * qw)
+    q *= scale[..., None]
+    qw = (qw * scale)[..., None]
+    c = np.cross(q, d)
+    return d + 2.0 * qw * c + 2.0 * np.cross(q, c)
+
+def angle_deg(a, b):
+    a = hlsl_reference.normalize(np.asarray(a, np.float64))
+    return np.degrees(np.arccos(np.clip(hlsl_reference.dot(a, b), -1.0, 1.0)))
+
+# -------------- Data --------------
+def synthetic_chunks(pixels, chunk=CHUNK_PIXELS, seed=SEED):
+    # Normal-map-like tangent normals (within 60 degrees of +Z) and uniform weights
+    rng = np.random.default_rng(seed)
+    for start in range(0, pixels, chunk):
+        n = min(chunk, pixels - start)
+        yield (hlsl_reference.tangent_normals(rng, n), hlsl_reference.tangent_normals(rng, n),
+               rng.random(n, dtype=np.float32))
+
+def map_chunks(local_path, rvt_path, chunk=CHUNK_PIXELS, seed=SEED):
+    # Two normal maps of one size, decoded from 0..1 to -1..1 (Z rebuilt from XY, like a BC5 read)
+    local, rvt = open_image(local_path), open_image(rvt_path)
+    if local.shape[:2] != rvt.shape[:2]:
+        raise ValueError(f"normal_blend_bench: {local_path} is {local.shape[1]}x{local.shape[0]}, "
+                         f"{rvt_path} is {rvt.shape[1]}x{rvt.shape[0]}")
+    rng = np.random.default_rng(seed)
+    h, w = local.shape[:2]
+    rows = max(1, chunk // w)
+    for y in range(0, h, rows):
+        pair = [_decode_normals(img[y:y + rows]) for img in (local, rvt)]
+        yield pair[0], pair[1], rng.random(len(pair[0]), dtype=np.float32)
+
+def _decode_normals(rows):
+    xy = to_unit(np.asarray(rows))[..., :2].reshape(-1, 2) * 2.0 - 1.0
+    z = np.sqrt(np.clip(1.0 - np.sum(xy * xy, axis=-1, keepdims=True), 0.0, 1.0))
+    return np.concatenate([xy, z], axis=-1).astype(np.float32)
+
+# -------------- Benchmark --------------
+def op_counts():
+    out = {}
+    for name, (code, _, _) in MODES.items():
+        cost = shader_cost.snippet_cost(code)
+        alu, trans = int(cost.get("alu", 0)), int(cost.get("transcendental", 0))
+        out[name] = {"alu": alu, "transcendental": trans, "cost": alu + TRANSCENDENTAL_COST * trans}
+    return out
+
+def run(chunks):
+    stats = {name: {"pixels": 0, "seconds": 0.0, "error_sum": 0.0, "error_max": 0.0} for name in MODES}
+    for n_a, n_b, w in chunks:
+        ref = reoriented_exact(n_a, n_b, w)
+        for name, (_, fn, _) in MODES.items():
+            t0 = time.perf_counter()
+            out = fn(n_a, n_b, w)
+            s = stats[name]
+            s["seconds"] += time.perf_counter() - t0
+            err = angle_deg(out, ref)
+            s["pixels"] += len(err)
+            s["error_sum"] += float(np.sum(err))
+            s["error_max"] = max(s["error_max"], float(np.max(err)))
+    report = {}
+    for name, ops in op_counts().items():
+        s = stats[name]
+        report[name] = {
+            **ops,
+            "mean_error_deg": s["error_sum"] / max(s["pixels"], 1),
+            "max_error_deg": s["error_max"],
+            "mpix_per_s": s["pixels"] / max(s["seconds"], 1e-9) / 1e6,
+            "pixels": s["pixels"],
+        }
+    return report
+
+def pick(report, max_mean_deg):
+    # Cheapest mode whose mean error is within the limit, else the most accurate one
+    ok = [n for n, r in report.items() if r["mean_error_deg"] <= max_mean_deg]
+    if ok:
+        return min(ok, key=lambda n: (report[n]["cost"], report[n]["mean_error_deg"]))
+    return min(report, key=lambda n: report[n]["mean_error_deg"])
+
+def parse_classes(text):
+    # "terrain=1,props=4" -> {"terrain": 1.0, "props": 4.0}
+    return {k.strip(): float(v) for k, v in (item.split("=") for item in text.split(",") if item.strip())}
+
+def print_report(report, classes=None):
+    print(f"{'mode':<10}{'alu':>5}{'trans':>6}{'cost':>6}{'mean deg':>10}{'max deg':>9}{'Mpix/s':>9}  normal_blend")
+    for name, r in sorted(report.items(), key=lambda item: item[1]["cost"]):
+        print(f"{name:<10}{r['alu']:>5}{r['transcendental']:>6}{r['cost']:>6}{r['mean_error_deg']:>10.3f}"
+              f"{r['max_error_deg']:>9.2f}{r['mpix_per_s']:>9.1f}  {MODES[name][2]}")
+    for cls, limit in (classes or {}).items():
+        name = pick(report, limit)
+        note = "" if report[name]["mean_error_deg"] <= limit else " (none within the limit: most accurate)"
+        print(f"   {cls}: mean <= {limit:g} deg -> {name} [normal_blend: {MODES[name][2]}]{note}")
+
+def _arg(argv, flag, n=1):
+    if flag not in argv:
+        return None
+    i = argv.index(flag)
+    return argv[i + 1] if n == 1 else argv[i + 1:i + 1 + n]
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    maps = _arg(argv, "--maps", 2)
+    pixels = int(_arg(argv, "--pixels") or DEFAULT_PIXELS)
+    t0 = time.perf_counter()
+    report = run(map_chunks(*maps) if maps else synthetic_chunks(pixels))
+    classes = parse_classes(_arg(argv, "--classes") or "")
+    print_report(report, classes)
+    print(f"normal_blend_bench: {next(iter(report.values()))['pixels']} pixels in {time.perf_counter() - t0:.2f}s")
+    if _arg(argv, "--report"):
+        Path(_arg(argv, "--report")).write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -0,0 +1,69 @@
+# FPBR_RVT_Row readers (FPBR_RVT_Row.cpp): CSV / JSON exports as plain dicts. Pure Python, so offline
+# tools can read the same rows as bulk_instances.py without the editor.
+import csv
+import json
+import math
+from pathlib import Path
+
+TEXTURE_FIELDS = ("BaseColor", "Normal", "ORM", "Height")
+SCALAR_FIELDS = ("UV_Scale", "UV_RotateDeg", "UV_OffsetU", "UV_OffsetV", "RoughnessOverride")
+SWITCH_FIELDS = ("bUseRVTRead", "bUseRVTWrite")
+# Defaults mirror FPBR_RVT_Row.cpp
+ROW_DEFAULTS = {"UV_Scale": 1.0, "UV_RotateDeg": 0.0, "UV_OffsetU": 0.0, "UV_OffsetV": 0.0, "RoughnessOverride": -1.0,
+                "bUseRVTRead": False, "bUseRVTWrite": False}
+ROW_FIELDS = (*TEXTURE_FIELDS, *SCALAR_FIELDS, *SWITCH_FIELDS)
+
+def parse_object_path(value):
+    # Accepts "/Game/T/Foo", "/Game/T/Foo.Foo" and exported "Texture2D'/Game/T/Foo.Foo'" forms
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value == "None":
+        return None
+    if "'" in value:
+        value = value.split("'")[1]
+    return value
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+def normalize_row(row):
+    out = dict(ROW_DEFAULTS)
+    for field in TEXTURE_FIELDS:
+        out[field] = parse_object_path(row.get(field))
+    for field in SCALAR_FIELDS:
+        if row.get(field) not in (None, ""):
+            out[field] = float(row[field])
+    for field in SWITCH_FIELDS:
+        if row.get(field) not in (None, ""):
+            out[field] = parse_bool(row[field])
+    return out
+
+def uv_affine_rows(scale, rotate_deg, offset_u, offset_v):
+    # MF_UVBlock_PBR's (uv * scale) -> Rotate2D around 0.5 -> + offset as the rows of one 2x3 matrix:
+    # uv' = S R uv + (c - R c + offset), c = (0.5, 0.5); fed to UVAffine as UV_AffineU / UV_AffineV
+    rad = math.radians(rotate_deg)
+    s, c = math.sin(rad), math.cos(rad)
+    return ((scale * c, -scale * s, 0.5 - 0.5 * (c - s) + offset_u),
+            (scale * s, scale * c, 0.5 - 0.5 * (s + c) + offset_v))
+
+def iter_csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # UE DataTable CSV exports name the row-name column "---"
+            name = row.pop("Name", None) or row.pop("---", None)
+            yield name, normalize_row(row)
+
+def iter_json_rows(path):
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = [dict(row, Name=name) for name, row in data.items()]
+    for row in data:
+        yield row.get("Name"), normalize_row(row)
+
+def iter_file_rows(path):
+    if Path(path).suffix.lower() == ".csv":
+        return iter_csv_rows(path)
+    return iter_json_rows(path)
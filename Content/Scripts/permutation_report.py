@@ -0,0 +1,97 @@
+# Run in Unreal Editor: Output Log -> `py Scripts/permutation_report.py [report.json]`
+# Lists which static-switch permutations of M_PBR_Master the existing material instances use.
+import json
+import sys
+import unreal
+from collections import Counter
+from pathlib import Path
+
+from Scripts import create_pbr_rvt_pipeline as pipeline
+
+mat_lib = unreal.MaterialEditingLibrary
+
+
+def child_instances(master_path):
+    # Instances whose parent chain reaches the master; the registry "Parent" tag avoids loading everything
+    registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    class_path = unreal.TopLevelAssetPath("/Script/Engine", "MaterialInstanceConstant")
+    by_path = {}
+    parents = {}
+    for data in registry.get_assets_by_class(class_path, True):
+        path = str(data.package_name)
+        by_path[path] = data
+        parent = str(data.get_tag_value("Parent") or "")
+        parents[path] = parent.split("'")[1].split(".")[0] if "'" in parent else parent.split(".")[0]
+
+    def reaches_master(path, depth=0):
+        parent = parents.get(path)
+        if not parent or depth > 16:
+            return False
+        return parent == master_path or reaches_master(parent, depth + 1)
+
+    return sorted(p for p in by_path if reaches_master(p))
+
+
+def instance_switches(mi, names):
+    # The lookup resolves through the parent chain, so names the instance doesn't override give the master's default
+    return {name: bool(mat_lib.get_material_instance_static_switch_parameter_value(mi, name)) for name in names}
+
+
+def build_report():
+    pipeline.load_config()
+    master_path = pipeline.MASTER_MAT.replace("//", "/")
+    master = unreal.load_asset(master_path)
+    names = sorted(str(n) for n in mat_lib.get_static_switch_parameter_names(master))
+    defaults = {n: bool(mat_lib.get_material_default_static_switch_parameter_value(master, n)) for n in names}
+
+    used = Counter()
+    members = {}
+    unloaded = []
+    for path in child_instances(master_path):
+        mi = unreal.load_asset(path)
+        if not isinstance(mi, unreal.MaterialInstanceConstant):
+            # Registry entry whose package no longer loads (moved / broken redirector)
+            unreal.log_warning(f"permutation_report: could not load {path}")
+            unloaded.append(path)
+            continue
+        values = instance_switches(mi, names)
+        key = tuple(values[n] for n in names)
+        used[key] += 1
+        members.setdefault(key, []).append(path)
+
+    return {
+        "master": master_path,
+        "switches": names,
+        "possible": 2 ** len(names),
+        "used": len(used),
+        "unloaded": unloaded,
+        # Only the permutations some instance compiles; the other possible ones are never built
+        "permutations": [
+            {
+                "switches": dict(zip(names, key)),
+                "default": key == tuple(defaults[n] for n in names),
+                "instances": count,
+                "examples": members[key][:5],
+            }
+            for key, count in used.most_common()
+        ],
+    }
+
+
+def print_report(report):
+    print(f"{report['master']}: {report['used']} of {report['possible']} static permutations in use")
+    names = report["switches"]
+    print("   " + "  ".join(names) + "  instances")
+    for perm in report["permutations"]:
+        flags = "  ".join(f"{int(perm['switches'][n]):^{len(n)}}" for n in names)
+        default = "  (master defaults)" if perm["default"] else ""
+        print(f"   {flags}  {perm['instances']}{default}")
+    if report["unloaded"]:
+        print(f"   {len(report['unloaded'])} instance(s) could not be loaded")
+
+
+if __name__ == "__main__":
+    result = build_report()
+    print_report(result)
+    if len(sys.argv) > 1:
+        Path(sys.argv[1]).write_text(json.dumps(result, indent=2), encoding="utf-8")
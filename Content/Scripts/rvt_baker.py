@@ -0,0 +1,228 @@
+# Offline RVT baker: evaluates the M_PBR_Master layer mix on CPU, tile by tile.
+#   cd Content && python -m Scripts.rvt_baker bake.json <out_dir>
+# bake.json: {"inputs": {"<input name>": "path.npy", ...}, "params": {...}, "tile_size": 128, "workers": 8}
+# Relative input paths are relative to bake.json, <out_dir> to the current directory.
+# Inputs/outputs are .npy files opened memory-mapped, so maps larger than RAM stream through tiles.
+# The mix follows the master as built from Config/naming.json (height_packing, normal_blend,
+# vertex_interpolators) with the Use_RVT_Read side of every switch, using the hlsl_reference versions
+# of its Custom nodes.
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from Scripts import hlsl_reference
+from Scripts.hlsl_reference import dot, height_weight, lerp, normalize
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "Config" / "naming.json"
+
+# Same tile size create_runtime_virtual_texture() gives T_VT_PBR_Master
+TILE_SIZE = 128
+
+# (H, W, C) float fields, sampled at the bake texels. normal is the local normal in world space;
+# height is only read with height_packing "none" (otherwise ORM / BaseColor alpha)
+INPUTS = (
+    "base_color", "normal", "orm", "height",
+    "rvt_base_color", "rvt_normal", "rvt_roughness", "rvt_metallic", "rvt_height",
+    "surface_normal", "vertex_color", "tangent_basis", "depth",
+)
+# surface_normal: vertex normal for the slope with vertex_interpolators (default: normal); tangent_basis: (H, W, 3, 3) rows of
+# TangentToWorld for the tangent-space normal blends (default: world axes, a flat +Z surface);
+# depth: camera depth in cm for Use_DistanceLOD (default: every texel near)
+OPTIONAL_INPUTS = ("height", "rvt_metallic", "surface_normal", "vertex_color", "tangent_basis", "depth")
+# Named after the MF_RVT_Read outputs the baked layers are read back through
+OUTPUTS = {"BaseColor": 3, "NormalWS": 3, "Roughness": 1, "Metallic": 1, "Height": 1}
+
+# Parameter defaults from build_master()
+MIX_DEFAULTS = {
+    "roughness_override": -1.0,
+    "metallic_override": -1.0,
+    "height_contrast": 0.2,
+    "height_balance": 0.5,
+    "use_height_blend": False,
+    "use_distance_lod": False,
+    "lod_fade_start": 5000.0,
+    "lod_fade_range": 2000.0,
+}
+
+# naming.json keys the master graph depends on, with the pipeline's defaults;
+# normal_blend -> (hlsl_reference function, blends in tangent space) like NORMAL_BLENDS
+CONFIG_DEFAULTS = {"height_packing": "none", "normal_blend": "ac", "vertex_interpolators": False}
+NORMAL_BLENDS = {
+    "ac": (hlsl_reference.blend_ac, False),
+    "rnm": (hlsl_reference.blend_rnm, True),
+    "whiteout": (hlsl_reference.blend_whiteout, True),
+    "udn": (hlsl_reference.blend_udn, True),
+}
+
+def load_mix_config(path=CONFIG_PATH):
+    data = json.loads(Path(path).read_text(encoding="utf-8")) if Path(path).exists() else {}
+    cfg = {k: data.get(k, v) for k, v in CONFIG_DEFAULTS.items()}
+    if cfg["normal_blend"] not in NORMAL_BLENDS:
+        raise ValueError(f"naming.json: normal_blend must be one of {sorted(NORMAL_BLENDS)}, got {cfg['normal_blend']!r}")
+    return cfg
+
+# -------------- Layer mix --------------
+def _scalar(a):
+    return a[..., 0] if a.ndim == 3 else a
+
+def local_height(src, height_packing):
+    if height_packing == "orm_alpha":
+        return src["orm"][..., 3]
+    if height_packing == "basecolor_alpha":
+        return src["base_color"][..., 3]
+    return _scalar(src["height"])
+
+def blend_normals(src, w, normal_blend):
+    fn, tangent_space = NORMAL_BLENDS[normal_blend]
+    if not tangent_space:
+        return fn(src["normal"], src["rvt_normal"], w)
+    # mul(tbn, v) into tangent space, mul(v, tbn) back, as in add_normal_blend()
+    tbn = src.get("tangent_basis")
+    if tbn is None:
+        return fn(src["normal"], src["rvt_normal"], w)
+    to_ts = lambda v: np.einsum("...ij,...j->...i", tbn, v)
+    return np.einsum("...i,...ij->...j", fn(to_ts(src["normal"]), to_ts(src["rvt_normal"]), w), tbn)
+
+def mix_layers(src, params=None, config=None, origin=(0, 0)):
+    # origin: (y, x) of src[0, 0] in the bake, for the distance-LOD dither pattern
+    p = dict(MIX_DEFAULTS, **(params or {}))
+    cfg = dict(CONFIG_DEFAULTS, **(config or {}))
+    height = local_height(src, cfg["height_packing"])
+    up = np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+    if p["use_height_blend"]:
+        w = height_weight(height, _scalar(src["rvt_height"]), p["height_contrast"], p["height_balance"])
+    else:
+        # VertexColor.R * (1 - |N . up|) from the per-pixel normal, or with vertex_interpolators from the
+        # vertex normal (the master interpolates it per vertex, here it is evaluated per texel)
+        surface_n = src.get("surface_normal", src["normal"]) if cfg["vertex_interpolators"] else src["normal"]
+        slope_mask = 1.0 - np.abs(dot(surface_n, up))
+        vcol = _scalar(src["vertex_color"]) if "vertex_color" in src else 1.0
+        w = vcol * slope_mask
+
+    far = np.zeros(height.shape, dtype=np.float32)
+    if p["use_distance_lod"] and "depth" in src:
+        ys, xs = np.indices(height.shape, dtype=np.float32)
+        svpos = np.stack([xs + origin[1] + 0.5, ys + origin[0] + 0.5], axis=-1)
+        far = hlsl_reference.distance_lod(_scalar(src["depth"]), p["lod_fade_start"], p["lod_fade_range"], svpos)
+        # RVT-only texels take the RVT side of every blend
+        w = np.maximum(w, far)
+    near = (far < 0.5)
+
+    orm = src["orm"]
+    # If nodes as wired in build_master(): the override wins when it is >= the ORM value
+    rough = np.maximum(p["roughness_override"], orm[..., 1])
+    metal = np.maximum(p["metallic_override"], orm[..., 2])
+    rvt_metal = _scalar(src["rvt_metallic"]) if "rvt_metallic" in src else np.zeros_like(w)
+
+    w3 = w[..., None]
+    # Far texels skip the local samples (LodSample returns 0) and the normal blend (RVT normal passed through)
+    normal = np.where(near[..., None], blend_normals(src, w, cfg["normal_blend"]), normalize(src["rvt_normal"]))
+    return {
+        "BaseColor": lerp(np.where(near[..., None], src["base_color"][..., :3], 0.0), src["rvt_base_color"][..., :3], w3),
+        "NormalWS": normal,
+        "Roughness": lerp(rough, _scalar(src["rvt_roughness"]), w),
+        "Metallic": lerp(metal, rvt_metal, w),
+        # RVT output writes the local height, not the blended one
+        "Height": np.where(near, height, 0.0),
+    }
+
+def downsample(img, normal=False):
+    # 2x2 box filter; normals are renormalized after averaging
+    h, w = img.shape[0] // 2, img.shape[1] // 2
+    img = img[:h * 2, :w * 2]
+    out = img.reshape(h, 2, w, 2, *img.shape[2:]).mean(axis=(1, 3))
+    return normalize(out) if normal else out
+
+# -------------- Tiled bake --------------
+def load_bake_config(path):
+    # bake.json with its input paths made absolute against the file's folder, not the current directory
+    path = Path(path).resolve()
+    cfg = json.loads(path.read_text(encoding="utf-8"))
+    cfg["inputs"] = {k: str(path.parent / v) for k, v in cfg["inputs"].items()}
+    return cfg
+
+def mip_count(size):
+    return int(math.log2(size)) + 1
+
+def output_path(out_dir, name, level):
+    return Path(out_dir) / f"{name}_mip{level}.npy"
+
+_worker = {}
+
+def _init_worker(inputs, out_dir, levels, params, config):
+    _worker["src"] = {k: np.load(v, mmap_mode="r") for k, v in inputs.items()}
+    _worker["dst"] = {
+        (name, lvl): np.load(output_path(out_dir, name, lvl), mmap_mode="r+")
+        for name in OUTPUTS for lvl in range(levels)
+    }
+    _worker["levels"] = levels
+    _worker["params"] = params
+    _worker["config"] = config
+
+def _bake_tile(tile):
+    y, x, size = tile
+    src = {k: np.asarray(v[y:y + size, x:x + size], dtype=np.float32) for k, v in _worker["src"].items()}
+    out = mix_layers(src, _worker["params"], _worker["config"], origin=(y, x))
+    for name, img in out.items():
+        for lvl in range(_worker["levels"]):
+            s = size >> lvl
+            if s == 0:
+                break
+            _worker["dst"][(name, lvl)][y >> lvl:(y >> lvl) + s, x >> lvl:(x >> lvl) + s] = img.reshape(s, s, -1)
+            img = downsample(img, normal=(name == "NormalWS"))
+    for mm in _worker["dst"].values():
+        mm.flush()
+    return tile
+
+def bake(inputs, out_dir, tile_size=TILE_SIZE, workers=None, params=None, config=None):
+    config = config or load_mix_config()
+    missing = [k for k in INPUTS if k not in inputs and k not in OPTIONAL_INPUTS]
+    if config["height_packing"] == "none" and "height" not in inputs:
+        missing.append("height")
+    if missing:
+        raise ValueError(f"rvt_baker: missing inputs {missing}")
+    h, w = np.load(inputs["base_color"], mmap_mode="r").shape[:2]
+    if h != w or h & (h - 1) or h % tile_size:
+        raise ValueError(f"rvt_baker: expected a square power-of-two size divisible by {tile_size}, got {w}x{h}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    levels = mip_count(h)
+    tile_levels = mip_count(tile_size)
+    for name, channels in OUTPUTS.items():
+        for lvl in range(levels):
+            s = h >> lvl
+            np.lib.format.open_memmap(output_path(out_dir, name, lvl), mode="w+", dtype=np.float32, shape=(s, s, channels))
+
+    tiles = [(y, x, tile_size) for y in range(0, h, tile_size) for x in range(0, w, tile_size)]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=({k: str(v) for k, v in inputs.items()}, str(out_dir), tile_levels, params, config)) as pool:
+        for _ in pool.map(_bake_tile, tiles, chunksize=max(1, len(tiles) // (4 * (workers or os.cpu_count() or 1)))):
+            pass
+
+    # Mips smaller than a tile are built from the last tile-level mip, which is already small
+    for name in OUTPUTS:
+        for lvl in range(tile_levels, levels):
+            prev = np.load(output_path(out_dir, name, lvl - 1), mmap_mode="r")
+            dst = np.load(output_path(out_dir, name, lvl), mmap_mode="r+")
+            dst[:] = downsample(np.asarray(prev), normal=(name == "NormalWS"))
+            dst.flush()
+
+    dt = time.perf_counter() - t0
+    print(f"rvt_baker: {len(tiles)} tiles, {levels} mips, {w}x{h} in {dt:.2f}s ({w * h / dt / 1e6:.1f} Mpx/s) -> {out_dir}")
+    return out_dir
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python -m Scripts.rvt_baker bake.json <out_dir>")
+        sys.exit(1)
+    cfg = load_bake_config(sys.argv[1])
+    bake(cfg["inputs"], sys.argv[2], cfg.get("tile_size", TILE_SIZE), cfg.get("workers"), cfg.get("params"))
@@ -0,0 +1,179 @@
+# RVT sizing autotuner for T_VT_PBR_Master (no editor needed for the numbers).
+#   cd Content && python -m Scripts.rvt_tuner [--bounds 2048x2048] [--texels-per-meter 32] [--budget-mb 256] [--material-type NAME]
+# Defaults come from "rvt_sizing" in Config/naming.json. For every tile size and compression choice it
+# sizes the virtual texture for the target density, then estimates page counts, mips and the physical
+# pool needed for one screen's working set; the pick is written to the asset by create_pbr_rvt_pipeline.py.
+# Memory figures are estimates (block-compressed bytes per texel, bordered pages), not engine readbacks.
+import json
+import math
+import sys
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "Config" / "naming.json"
+
+TILE_SIZES = (64, 128, 256, 512, 1024)
+MAX_TILE_COUNT = 4096       # 2^12 tiles per side
+MAX_REMOVE_LOW_MIPS = 5
+MIB = 1024.0 * 1024.0
+
+DEFAULTS = {
+    "bounds_m": [2048.0, 2048.0],       # RVT volume X/Y size in meters
+    "texels_per_meter": 32.0,
+    "pool_budget_mb": 256.0,
+    "material_type": "BASE_COLOR_NORMAL_SPECULAR",
+    "tile_border": 4,                   # texels per side, even
+    "screen": [2560, 1440],
+    "oversubscription": 3.0,            # visible pages x this: mip transitions, page borders, shadow/second views
+    "max_page_m": 256.0,                # coarser tail mips (one page over more than this) are removed
+}
+
+# RuntimeVirtualTextureMaterialType -> bytes per texel over all layers: (compressed, uncompressed)
+# e.g. BaseColor_Normal_Specular = BC1 + BC5 + BC1 compressed, three BGRA8 layers otherwise
+MATERIAL_TYPES = {
+    "BASE_COLOR": (0.5, 4.0),
+    "MASK4": (1.0, 4.0),
+    "BASE_COLOR_NORMAL_ROUGHNESS": (1.5, 8.0),
+    "BASE_COLOR_NORMAL_SPECULAR": (2.0, 12.0),
+    "BASE_COLOR_NORMAL_SPECULAR_YCO_CG": (2.5, 12.0),
+    "BASE_COLOR_NORMAL_SPECULAR_MASK_YCO_CG": (3.0, 12.0),
+    "WORLD_HEIGHT": (None, 2.0),        # G16, never block-compressed
+    "DISPLACEMENT": (None, 2.0),
+}
+
+# -------------- Config --------------
+def load_sizing(path=CONFIG_PATH, overrides=None):
+    sizing = dict(DEFAULTS)
+    if Path(path).exists():
+        sizing.update(json.loads(Path(path).read_text(encoding="utf-8")).get("rvt_sizing", {}))
+    sizing.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    if sizing["material_type"] not in MATERIAL_TYPES:
+        raise ValueError(f"rvt_sizing: material_type must be one of {sorted(MATERIAL_TYPES)}, got {sizing['material_type']!r}")
+    if sizing["tile_border"] % 2 or not 0 <= sizing["tile_border"] <= 8:
+        raise ValueError(f"rvt_sizing: tile_border must be 0, 2, 4, 6 or 8, got {sizing['tile_border']}")
+    return sizing
+
+# -------------- Estimates --------------
+def next_pow2(x):
+    return 1 << max(0, math.ceil(math.log2(max(x, 1.0))))
+
+def estimate(sizing, tile_size, compressed):
+    # One candidate: (tile size, compression) sized for the target density
+    extent = max(sizing["bounds_m"])
+    want = extent * sizing["texels_per_meter"]
+    tiles = min(next_pow2(want / tile_size), MAX_TILE_COUNT)
+    virtual = tiles * tile_size
+    mips = int(math.log2(tiles)) + 1
+    # Tail mips whose single page spans more than max_page_m of world are cut (cheaper far updates)
+    page_m = [extent * tile_size * (1 << m) / virtual for m in range(mips)]
+    remove_low = min(sum(1 for p in page_m if p > sizing["max_page_m"]), MAX_REMOVE_LOW_MIPS, mips - 1)
+    kept = mips - remove_low
+    total_pages = sum((tiles >> m) ** 2 for m in range(kept))
+    # Pages one view touches: the screen tiled by pages (+1 for misalignment), then oversubscribed
+    w, h = sizing["screen"]
+    visible = (w / tile_size + 1) * (h / tile_size + 1)
+    working_set = min(total_pages, math.ceil(visible * sizing["oversubscription"]))
+    bytes_texel = MATERIAL_TYPES[sizing["material_type"]][0 if compressed else 1]
+    page_bytes = (tile_size + 2 * sizing["tile_border"]) ** 2 * bytes_texel
+    return {
+        "tile_size": tile_size,
+        "compressed": compressed,
+        "tile_count": tiles,
+        "virtual_size": virtual,
+        "texels_per_meter": virtual / extent,
+        "clamped": tiles * tile_size < want,
+        "mips": kept,
+        "remove_low_mips": remove_low,
+        "total_pages": total_pages,
+        "working_set_pages": working_set,
+        "pool_mb": working_set * page_bytes / MIB,
+        "full_mb": total_pages * page_bytes / MIB,
+        "page_table_kb": total_pages * 4 / 1024.0,
+    }
+
+def candidates(sizing):
+    compressions = (True, False) if MATERIAL_TYPES[sizing["material_type"]][0] is not None else (False,)
+    return [estimate(sizing, t, c) for c in compressions for t in TILE_SIZES]
+
+def choose(rows, budget_mb):
+    # Density first (unclamped), then the pool must hold the working set, else pages thrash.
+    # Within budget: compressed, then the least pool + page table memory (small tiles pay in page
+    # table and requests, large tiles in partly visible pages), larger tile on a tie.
+    fits = [r for r in rows if not r["clamped"] and r["pool_mb"] <= budget_mb]
+    if fits:
+        return min(fits, key=lambda r: (not r["compressed"], r["pool_mb"] + r["page_table_kb"] / 1024.0, -r["tile_size"])), None
+    best = min(rows, key=lambda r: (r["clamped"], r["pool_mb"]))
+    if best["clamped"]:
+        return best, f"{best['texels_per_meter']:.1f} texels/m is the most a {MAX_TILE_COUNT}-tile RVT gives over these bounds"
+    return best, f"working set needs {best['pool_mb']:.0f} MB > {budget_mb:.0f} MB budget: expect page thrash"
+
+def tune(sizing):
+    # -> (chosen row, all rows, warning or None)
+    rows = candidates(sizing)
+    pick, warning = choose(rows, sizing["pool_budget_mb"])
+    return pick, rows, warning
+
+# -------------- Report --------------
+def print_table(sizing, rows, pick, warning=None):
+    bx, by = sizing["bounds_m"]
+    print(f"RVT sizing: {bx:g} x {by:g} m, {sizing['texels_per_meter']:g} texels/m, "
+          f"{sizing['material_type']}, pool budget {sizing['pool_budget_mb']:g} MB")
+    print(f"   {'tile':>5} {'bc':>3} {'tiles':>6} {'virtual':>8} {'tex/m':>7} {'mips':>5} {'cut':>4}"
+          f" {'pages':>10} {'working':>8} {'pool MB':>9} {'full MB':>10} {'pt KB':>8}")
+    for r in rows:
+        mark = "*" if r is pick else " "
+        print(f" {mark} {r['tile_size']:>5} {'y' if r['compressed'] else 'n':>3} {r['tile_count']:>6} {r['virtual_size']:>8}"
+              f" {r['texels_per_meter']:>7.1f} {r['mips']:>5} {r['remove_low_mips']:>4} {r['total_pages']:>10}"
+              f" {r['working_set_pages']:>8} {r['pool_mb']:>9.1f} {r['full_mb']:>10.1f} {r['page_table_kb']:>8.0f}")
+    if warning:
+        print(f"   ! {warning}")
+
+# -------------- Editor --------------
+def apply_settings(rvt, sizing, pick, unreal):
+    # RuntimeVirtualTexture stores tile count / tile size as log2 steps and the border in steps of 2
+    rvt.set_editor_property("material_type", getattr(unreal.RuntimeVirtualTextureMaterialType, sizing["material_type"]))
+    rvt.set_editor_property("tile_count", int(math.log2(pick["tile_count"])))
+    rvt.set_editor_property("tile_size", int(math.log2(pick["tile_size"])) - 6)
+    rvt.set_editor_property("tile_border_size", sizing["tile_border"] // 2)
+    rvt.set_editor_property("compress_textures", pick["compressed"])
+    rvt.set_editor_property("remove_low_mips", pick["remove_low_mips"])
+
+def level_bounds_m(unreal):
+    # X/Y size in meters of the largest RuntimeVirtualTextureVolume in the open level, or None
+    actors = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).get_all_level_actors()
+    sizes = []
+    for actor in actors:
+        if isinstance(actor, unreal.RuntimeVirtualTextureVolume):
+            _, extent = actor.get_actor_bounds(False)
+            sizes.append([extent.x * 2.0 / 100.0, extent.y * 2.0 / 100.0])
+    return max(sizes, key=max) if sizes else None
+
+def tune_level(rvt_path=None):
+    # Editor: size the pipeline RVT for the volumes in the open level and save it
+    import unreal
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    pipeline.load_config()
+    bounds = level_bounds_m(unreal)
+    if bounds is None:
+        unreal.log_warning("rvt_tuner: no RuntimeVirtualTextureVolume in the level, using rvt_sizing bounds")
+    sizing = load_sizing(pipeline.CONFIG_PATH, {"bounds_m": bounds})
+    pick, rows, warning = tune(sizing)
+    print_table(sizing, rows, pick, warning)
+    rvt = unreal.EditorAssetLibrary.load_asset(rvt_path or pipeline.RVT_ASSET)
+    apply_settings(rvt, sizing, pick, unreal)
+    unreal.EditorAssetLibrary.save_loaded_assets([rvt], only_if_is_dirty=False)
+    return pick
+
+def _arg(argv, flag, convert):
+    return convert(argv[argv.index(flag) + 1]) if flag in argv else None
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    sizing = load_sizing(overrides={
+        "bounds_m": _arg(argv, "--bounds", lambda v: [float(x) for x in v.lower().split("x")]),
+        "texels_per_meter": _arg(argv, "--texels-per-meter", float),
+        "pool_budget_mb": _arg(argv, "--budget-mb", float),
+        "material_type": _arg(argv, "--material-type", str.upper),
+    })
+    pick, rows, warning = tune(sizing)
+    print_table(sizing, rows, pick, warning)
+    sys.exit(1 if warning else 0)
@@ -0,0 +1,354 @@
+# Offline shader cost estimate for the generated PBR/RVT materials (no editor needed).
+#   cd Content && python -m Scripts.shader_cost [--report out.json] [--write-baseline] [--no-budget]
+#                                               [--permutations permutation_report.json ...] [--all]
+# Runs the builders against fake_unreal, then estimates ALU / transcendental / texture-sample counts
+# per node and per static-switch permutation. Ops are counted per HLSL operation, not per lane.
+# Only the permutations instances use are costed: "permutations" in shader_budget.json (switch overrides
+# on top of the master's defaults, per asset name), or the output of permutation_report.py from the editor.
+# --all costs every 2^N combination instead (report only, no budget check).
+# Costs are per pixel: nodes that only feed a VertexInterpolator run per vertex and are not counted.
+import itertools
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from Scripts import fake_unreal
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "Config"
+BUDGET_PATH = CONFIG_DIR / "shader_budget.json"
+BASELINE_PATH = CONFIG_DIR / "shader_cost_baseline.json"
+METRICS = ("alu", "transcendental", "samples")
+
+# -------------- HLSL --------------
+TRANSCENDENTALS = {"sin", "cos", "tan", "asin", "acos", "atan", "atan2", "sincos", "pow", "exp", "exp2", "log", "log2", "sqrt", "rsqrt"}
+# intrinsic -> (alu, transcendental) on top of its arguments
+INTRINSICS = {
+    "normalize": (2, 1),   # dot + rsqrt + mul
+    "length": (1, 1),
+    "distance": (2, 1),
+    "dot": (1, 0),
+    "cross": (2, 0),
+    "mul": (3, 0),
+    "lerp": (2, 0),
+    "smoothstep": (5, 0),
+    "clamp": (2, 0),
+    "min": (1, 0),
+    "max": (1, 0),
+    "step": (1, 0),
+    "floor": (1, 0),
+    "frac": (1, 0),
+    "radians": (1, 0),
+    "degrees": (1, 0),
+    "saturate": (0, 0),    # free output modifier
+    "abs": (0, 0),         # free input modifier
+}
+SAMPLE_METHODS = ("Sample", "SampleLevel", "SampleGrad", "SampleBias")
+
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_FUNC_DEF = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\s+([A-Za-z_][A-Za-z0-9_]*)\s*\([^)]*\)\s*\{")
+_CALL = re.compile(r"(\.)?\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+_NUMBER_EXP = re.compile(r"\d[eE][+-]")
+_OPERATOR = re.compile(r"[-+*/](?!=)|[-+*/]=")
+
+def split_functions(code):
+    # -> ({name: body}, top-level code with function definitions removed)
+    code = _COMMENT.sub("", code)
+    funcs = {}
+    rest = []
+    pos = 0
+    for m in _FUNC_DEF.finditer(code):
+        if m.start() < pos:
+            continue
+        depth, i = 1, m.end()
+        while depth and i < len(code):
+            depth += {"{": 1, "}": -1}.get(code[i], 0)
+            i += 1
+        funcs[m.group(1)] = code[m.end():i - 1]
+        rest.append(code[pos:m.start()])
+        pos = i
+    rest.append(code[pos:])
+    return funcs, "".join(rest)
+
+def body_cost(body, funcs, _stack=()):
+    cost = Counter()
+    for m in _CALL.finditer(body):
+        method, name = m.group(1), m.group(2)
+        if method and name in SAMPLE_METHODS:
+            cost["samples"] += 1
+        elif name in funcs and name not in _stack:
+            cost += body_cost(funcs[name], funcs, _stack + (name,))
+        elif name in TRANSCENDENTALS:
+            cost["transcendental"] += 1
+        elif name in INTRINSICS:
+            alu, trans = INTRINSICS[name]
+            cost["alu"] += alu
+            cost["transcendental"] += trans
+    stripped = _NUMBER_EXP.sub("0", body.replace("++", "").replace("--", ""))
+    cost["alu"] += len(_OPERATOR.findall(stripped))
+    return cost
+
+def hlsl_cost(code):
+    # Cost of a Custom node's code: the top-level statements, expanding calls into its own functions
+    funcs, top = split_functions(code)
+    return body_cost(top, funcs)
+
+def snippet_cost(code):
+    # Cost of every function a snippet defines
+    funcs, _ = split_functions(code)
+    total = Counter()
+    for body in funcs.values():
+        total += body_cost(body, funcs)
+    return total
+
+# -------------- Graph --------------
+# Expression kind -> cost; anything not listed (parameters, constants, masks, inputs) is free
+NODE_COSTS = {
+    "Add": Counter(alu=1),
+    "Subtract": Counter(alu=1),
+    "Multiply": Counter(alu=1),
+    "Divide": Counter(alu=1),
+    "DotProduct": Counter(alu=1),
+    "OneMinus": Counter(alu=1),
+    "Min": Counter(alu=1),
+    "Max": Counter(alu=1),
+    "Clamp": Counter(alu=2),
+    "LinearInterpolate": Counter(alu=2),
+    "If": Counter(alu=2),
+    "Transform": Counter(alu=3),
+    "Normalize": Counter(alu=2, transcendental=1),
+    "Sine": Counter(transcendental=1),
+    "Cosine": Counter(transcendental=1),
+    "Power": Counter(transcendental=1),
+    "TextureSample": Counter(samples=1),
+    # Page table lookup + one fetch per physical layer (BaseColor/Normal/Specular = 2)
+    "RuntimeVirtualTextureSample": Counter(samples=3),
+}
+
+def expression_inputs(node, asset):
+    # -> [(source node, source pin, input name)]
+    found = []
+    for prop, value in vars(node).items():
+        if prop == "owner":
+            continue
+        if isinstance(value, fake_unreal.MaterialExpression):
+            found.append((value, "", prop))
+        elif isinstance(value, fake_unreal.OutputPin):
+            found.append((value.node, value.name, prop))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, fake_unreal.CustomInput) and item.input is not None:
+                    src = item.input
+                    if isinstance(src, fake_unreal.OutputPin):
+                        found.append((src.node, src.name, item.input_name))
+                    else:
+                        found.append((src, "", item.input_name))
+    for src, pin, dst, dst_pin in asset.connections:
+        if dst is node:
+            found.append((src, pin, dst_pin))
+    return found
+
+def graph_roots(asset):
+    roots = [e for e in asset.expressions if e.kind in ("FunctionOutput", "RuntimeVirtualTextureOutput")]
+    attrs = asset.__dict__.get("material_attributes")
+    if isinstance(attrs, fake_unreal.OutputPin):
+        attrs = attrs.node
+    if isinstance(attrs, fake_unreal.MaterialExpression):
+        roots.append(attrs)
+    return roots
+
+def switch_parameters(asset):
+    # StaticBoolParameters that actually drive a StaticSwitch
+    names = set()
+    for e in asset.expressions:
+        if e.kind == "StaticSwitch":
+            for src, _, prop in expression_inputs(e, asset):
+                if prop == "value" and src.kind == "StaticBoolParameter":
+                    names.add(src.parameter_name)
+    return sorted(names)
+
+def reachable(asset, switches):
+    # Nodes that survive static-switch elimination; StaticSwitch takes A when true, B when false
+    seen = {}
+    stack = list(graph_roots(asset))
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen[id(node)] = node
+        if node.kind == "VertexInterpolator":
+            # Inputs run in the vertex shader: per-vertex work, not per-pixel cost
+            continue
+        inputs = expression_inputs(node, asset)
+        if node.kind == "StaticSwitch":
+            value = next((src for src, _, prop in inputs if prop == "value"), None)
+            on = switches.get(value.parameter_name, bool(value.__dict__.get("default_value"))) if value is not None \
+                else bool(node.__dict__.get("default_value"))
+            # Property names when assigned, pin names ("True"/"False") when connected
+            inputs = [i for i in inputs if i[2] in (("a", "True") if on else ("b", "False"))]
+        stack.extend(src for src, _, _ in inputs)
+    return list(seen.values())
+
+def node_cost(node, function_costs):
+    if node.kind == "Custom":
+        return hlsl_cost(node.__dict__.get("code", ""))
+    if node.kind == "MaterialFunctionCall":
+        func = node.__dict__.get("material_function")
+        return Counter(function_costs.get(getattr(func, "path", None), Counter()))
+    return Counter(NODE_COSTS.get(node.kind, Counter()))
+
+def _totals(cost):
+    return {m: int(cost.get(m, 0)) for m in METRICS}
+
+def switch_defaults(asset, params):
+    values = {e.parameter_name: bool(e.__dict__.get("default_value")) for e in asset.expressions
+              if e.kind == "StaticBoolParameter"}
+    return {p: values.get(p, False) for p in params}
+
+def permutation_list(asset, params, overrides=None):
+    # -> [{switch: value}]: each override dict applied on top of the defaults (the default permutation
+    # always included), or every combination when overrides is None
+    if overrides is None:
+        return [dict(zip(params, values)) for values in itertools.product((False, True), repeat=len(params))]
+    defaults = switch_defaults(asset, params)
+    perms = []
+    for override in [{}, *overrides]:
+        unknown = sorted(set(override) - set(params))
+        if unknown:
+            raise ValueError(f"shader_cost: {asset.name} has no static switch {', '.join(unknown)}")
+        switches = {**defaults, **{k: bool(v) for k, v in override.items()}}
+        if switches not in perms:
+            perms.append(switches)
+    return perms
+
+def analyze_asset(asset, function_costs, overrides=None):
+    params = switch_parameters(asset)
+    static_bools = sorted({e.parameter_name for e in asset.expressions if e.kind == "StaticBoolParameter"})
+    nodes = []
+    for e in asset.expressions:
+        cost = node_cost(e, function_costs)
+        if cost:
+            nodes.append({"node": repr(e), "kind": e.kind, **_totals(cost)})
+    perms = []
+    for switches in permutation_list(asset, params, overrides):
+        total = Counter()
+        for node in reachable(asset, switches):
+            total += node_cost(node, function_costs)
+        perms.append({"switches": switches, **_totals(total)})
+    return {
+        "nodes": nodes,
+        "switch_parameters": params,
+        "unwired_static_bools": [p for p in static_bools if p not in params],
+        "possible_permutations": 2 ** len(params),
+        "permutations": perms,
+    }
+
+# -------------- Pipeline capture --------------
+def capture_pipeline():
+    fake_unreal.install()
+    fake_unreal.reset()
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    from Scripts import material_graph
+    pipeline.load_config()
+    assets = [pipeline.run_builder(b) for b in (pipeline.build_mf_uv, pipeline.build_mf_rvt, pipeline.build_master,
+                                                pipeline.build_layers_master)]
+    # Same graphs the pipeline compiles: after the optimization pass
+    for asset in assets:
+        material_graph.optimize(asset)
+    return pipeline, assets
+
+def load_permutations(budget, report_paths=()):
+    # Asset name -> [switch overrides]; a permutation_report.py output replaces its master's list
+    used = dict(budget.get("permutations", {}))
+    for path in report_paths:
+        report = json.loads(Path(path).read_text(encoding="utf-8"))
+        used[report["master"].rsplit("/", 1)[-1]] = [p["switches"] for p in report["permutations"]]
+    return used
+
+def analyze_pipeline(permutations=None):
+    # permutations: asset name -> [switch overrides] (assets not listed: default permutation only);
+    # None costs every combination
+    from Scripts import hlsl_snippets
+    _, assets = capture_pipeline()
+    report = {"snippets": {}, "assets": {}}
+    for name in dir(hlsl_snippets):
+        if name.endswith("_HLSL"):
+            report["snippets"][name] = _totals(snippet_cost(getattr(hlsl_snippets, name)))
+    function_costs = {}
+    for asset in assets:
+        overrides = None if permutations is None else permutations.get(asset.name, [])
+        entry = analyze_asset(asset, function_costs, overrides)
+        report["assets"][asset.path] = entry
+        if isinstance(asset, fake_unreal.MaterialFunction):
+            function_costs[asset.path] = Counter({m: entry["permutations"][-1][m] for m in METRICS})
+    return report
+
+# -------------- Budget --------------
+def permutation_key(switches):
+    return ",".join(f"{k}={int(v)}" for k, v in sorted(switches.items())) or "default"
+
+def check_budget(report, budget, baseline=None):
+    # Fails on absolute limits and on growth over the baseline beyond `tolerance`
+    failures = []
+    limits = budget.get("limits", {})
+    tolerance = budget.get("tolerance", 0.0)
+    for path, entry in report["assets"].items():
+        base_perms = {}
+        if baseline and path in baseline.get("assets", {}):
+            base_perms = {permutation_key(p["switches"]): p for p in baseline["assets"][path]["permutations"]}
+        for perm in entry["permutations"]:
+            key = permutation_key(perm["switches"])
+            for m in METRICS:
+                if m in limits and perm[m] > limits[m]:
+                    failures.append(f"{path} [{key}] {m}={perm[m]} exceeds limit {limits[m]}")
+                old = base_perms.get(key, {}).get(m)
+                if old is not None and perm[m] > old * (1.0 + tolerance):
+                    failures.append(f"{path} [{key}] {m}={perm[m]} regressed from {old} (+{tolerance:.0%} allowed)")
+    return failures
+
+def print_summary(report):
+    print(f"{'snippet':<24}{'alu':>6}{'trans':>7}{'tex':>5}")
+    for name, c in report["snippets"].items():
+        print(f"{name:<24}{c['alu']:>6}{c['transcendental']:>7}{c['samples']:>5}")
+    for path, entry in report["assets"].items():
+        print(f"{path}: {len(entry['permutations'])} of {entry['possible_permutations']} permutations")
+        for perm in entry["permutations"]:
+            print(f"   {permutation_key(perm['switches']):<60}{perm['alu']:>6}{perm['transcendental']:>7}{perm['samples']:>5}")
+        if entry["unwired_static_bools"]:
+            print(f"   static bools not driving any switch: {', '.join(entry['unwired_static_bools'])}")
+
+def _arg_values(argv, flag):
+    # Values after `flag` up to the next option
+    if flag not in argv:
+        return []
+    values = []
+    for arg in argv[argv.index(flag) + 1:]:
+        if arg.startswith("--"):
+            break
+        values.append(arg)
+    return values
+
+def main(argv):
+    budget = json.loads(BUDGET_PATH.read_text(encoding="utf-8")) if BUDGET_PATH.exists() else {}
+    every = "--all" in argv
+    report = analyze_pipeline(None if every else load_permutations(budget, _arg_values(argv, "--permutations")))
+    print_summary(report)
+    if "--report" in argv:
+        Path(argv[argv.index("--report") + 1]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if every:
+        return 0
+    if "--write-baseline" in argv:
+        BASELINE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"baseline written -> {BASELINE_PATH}")
+        return 0
+    if "--no-budget" in argv or not budget:
+        return 0
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else None
+    failures = check_budget(report, budget, baseline)
+    for f in failures:
+        print(f"FAIL {f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,44 @@
+# pytest setup for the offline tools (no editor needed):
+#   cd Content && python -m pytest -q Scripts/tests
+# Modules import each other as Scripts.<name>, so the Content dir goes on sys.path.
+import sys
+from pathlib import Path
+
+import pytest
+
+CONTENT_DIR = Path(__file__).resolve().parents[2]
+if str(CONTENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CONTENT_DIR))
+
+from Scripts import fake_unreal
+
+NAMING_PATH = CONTENT_DIR / "Config" / "naming.json"
+
+@pytest.fixture
+def fake_editor(tmp_path):
+    # Fresh fake_unreal state with tmp_path as the project Content dir
+    fake_unreal.reset()
+    yield fake_unreal.install(tmp_path)
+    fake_unreal.reset()
+    fake_unreal.install(CONTENT_DIR)
+
+@pytest.fixture
+def pipeline(fake_editor, tmp_path, monkeypatch):
+    # create_pbr_rvt_pipeline on a copy of naming.json, with its manifest in tmp_path. Saving writes each
+    # package to <Content>/<path>.uasset like the editor does, so the manifest's package check has files.
+    from Scripts import build_cache
+    from Scripts import create_pbr_rvt_pipeline as module
+
+    def save_loaded_assets(assets, only_if_is_dirty=True):
+        for asset in assets:
+            f = build_cache.package_file(tmp_path, asset.path)
+            f.parent.mkdir(parents=True, exist_ok=True)
+            f.write_text(f"{asset.path} {len(getattr(asset, 'expressions', ()))}", encoding="utf-8")
+        return True
+
+    config = tmp_path / "naming.json"
+    config.write_text(NAMING_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.setattr(module, "CONFIG_PATH", config)
+    monkeypatch.setattr(module, "MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr(fake_editor.EditorAssetLibrary, "save_loaded_assets", staticmethod(save_loaded_assets))
+    return module
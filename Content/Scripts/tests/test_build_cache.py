@@ -0,0 +1,112 @@
+# BuildCache manifest: skip when inputs and package are unchanged, rebuild on any change.
+import json
+
+from Scripts import build_cache
+from Scripts.build_cache import BuildCache
+
+ASSET = "/Game/PBR/M_Test"
+
+def write_package(content_dir, path, data="v1"):
+    f = build_cache.package_file(content_dir, path)
+    f.parent.mkdir(parents=True, exist_ok=True)
+    f.write_text(data, encoding="utf-8")
+
+def built(tmp_path, config=None, sources=("src",)):
+    # One asset built and recorded in a saved manifest -> (manifest path, its digest)
+    manifest = tmp_path / "manifest.json"
+    cache = BuildCache(manifest, tmp_path)
+    digest = cache.input_hash(ASSET, config or {"a": 1}, list(sources))
+    write_package(tmp_path, ASSET)
+    cache.record(ASSET, digest)
+    cache.save()
+    return manifest, digest
+
+def test_unchanged_asset_is_fresh(tmp_path):
+    manifest, _ = built(tmp_path)
+    cache = BuildCache(manifest, tmp_path)
+    assert cache.is_fresh(ASSET, cache.input_hash(ASSET, {"a": 1}, ["src"]))
+
+def test_config_and_source_changes_invalidate(tmp_path):
+    manifest, _ = built(tmp_path)
+    cache = BuildCache(manifest, tmp_path)
+    assert not cache.is_fresh(ASSET, cache.input_hash(ASSET, {"a": 2}, ["src"]))
+    assert not cache.is_fresh(ASSET, cache.input_hash(ASSET, {"a": 1}, ["src changed"]))
+    # Key order is not a change
+    assert BuildCache(manifest, tmp_path).input_hash(ASSET, {"a": 1, "b": 2}, []) == \
+        BuildCache(manifest, tmp_path).input_hash(ASSET, {"b": 2, "a": 1}, [])
+
+def test_package_edit_or_delete_invalidates(tmp_path):
+    manifest, digest = built(tmp_path)
+    write_package(tmp_path, ASSET, "edited in the editor")
+    assert not BuildCache(manifest, tmp_path).is_fresh(ASSET, digest)
+    build_cache.package_file(tmp_path, ASSET).unlink()
+    assert not BuildCache(manifest, tmp_path).is_fresh(ASSET, digest)
+
+def test_force_rebuilds(tmp_path):
+    manifest, digest = built(tmp_path)
+    assert not BuildCache(manifest, tmp_path, force=True).is_fresh(ASSET, digest)
+
+def test_dependency_output_folds_into_dependents(tmp_path):
+    cache = BuildCache(tmp_path / "manifest.json", tmp_path)
+    cache.input_hash("/Game/PBR/MF_A", {}, ["a"])
+    before = cache.input_hash(ASSET, {}, ["m"], deps=("/Game/PBR/MF_A",))
+    cache.input_hash("/Game/PBR/MF_A", {}, ["a changed"])
+    assert cache.input_hash(ASSET, {}, ["m"], deps=("/Game/PBR/MF_A",)) != before
+
+def test_keep_output_keeps_dependents_fresh(tmp_path):
+    # A dependency rebuilt to the same graph hands its previous output hash downstream
+    cache = BuildCache(tmp_path / "manifest.json", tmp_path)
+    dep = "/Game/PBR/MF_A"
+    cache.record(dep, cache.input_hash(dep, {}, ["a"]))
+    old_output = cache.entries[dep]["output"]
+    cache.input_hash(dep, {}, ["a, comment edited"])
+    cache.keep_output(dep)
+    assert cache.hashes[dep] == old_output
+
+def test_unreadable_or_old_manifest_starts_empty(tmp_path):
+    manifest, digest = built(tmp_path)
+    data = json.loads(manifest.read_text(encoding="utf-8"))
+    manifest.write_text(json.dumps(dict(data, version=build_cache.MANIFEST_VERSION + 1)), encoding="utf-8")
+    assert BuildCache(manifest, tmp_path).entries == {}
+    manifest.write_text("{not json", encoding="utf-8")
+    assert not BuildCache(manifest, tmp_path).is_fresh(ASSET, digest)
+
+# -------------- Through the pipeline (fake_unreal) --------------
+def test_pipeline_skips_unchanged_assets(pipeline):
+    first = pipeline.main()
+    assert pipeline.MASTER_MAT in first
+    assert pipeline.main() == []
+    assert set(json.loads(pipeline.MANIFEST_PATH.read_text(encoding="utf-8"))["assets"]) >= set(first)
+
+def test_pipeline_rebuilds_what_a_config_change_touches(pipeline):
+    pipeline.main()
+    data = json.loads(pipeline.CONFIG_PATH.read_text(encoding="utf-8"))
+    packing = "orm_alpha" if data.get("height_packing", "none") != "orm_alpha" else "none"
+    pipeline.CONFIG_PATH.write_text(json.dumps(dict(data, height_packing=packing)), encoding="utf-8")
+    rebuilt = pipeline.main()
+    # Every input hash moved, but only graphs that actually differ are recompiled and saved
+    assert pipeline.MASTER_MAT in rebuilt
+    assert pipeline.MF_UV not in rebuilt
+    assert pipeline.main() == []
+
+def test_pipeline_rechecks_a_deleted_package(pipeline, tmp_path, capsys):
+    pipeline.main()
+    build_cache.package_file(tmp_path, pipeline.MF_UV).unlink()
+    capsys.readouterr()
+    pipeline.main()
+    out = capsys.readouterr().out
+    assert f"{pipeline.MF_UV} (up to date)" not in out
+    assert f"{pipeline.MASTER_MAT} (up to date)" in out
+
+def test_pipeline_updates_instance_and_rvt_in_place(pipeline, fake_editor):
+    # Non-graph assets are loaded and updated on a rebuild, never created over an existing path
+    pipeline.main()
+    mi = fake_editor.load_asset(pipeline.MI_BASE)
+    rvt = fake_editor.load_asset(pipeline.RVT_ASSET)
+    data = json.loads(pipeline.CONFIG_PATH.read_text(encoding="utf-8"))
+    sizing = dict(data["rvt_sizing"], texels_per_meter=data["rvt_sizing"]["texels_per_meter"] * 2)
+    pipeline.CONFIG_PATH.write_text(json.dumps(dict(data, rvt_sizing=sizing)), encoding="utf-8")
+    assert {pipeline.MI_BASE, pipeline.RVT_ASSET} <= set(pipeline.main(force=True))
+    assert fake_editor.load_asset(pipeline.MI_BASE) is mi
+    assert fake_editor.load_asset(pipeline.RVT_ASSET) is rvt
+    assert mi.get_editor_property("parent") is fake_editor.load_asset(pipeline.MASTER_MAT)
@@ -0,0 +1,125 @@
+# SlicedBuild driven by fake_unreal's Slate tick: start / cancel / resume / abort / failure.
+import pytest
+
+from Scripts import build_cache
+
+@pytest.fixture
+def scheduler(fake_editor):
+    from Scripts import editor_scheduler
+    yield editor_scheduler
+    editor_scheduler._active.clear()
+
+def steps(n, log=None):
+    # Work generator: n units, returns "built"; log collects what ran and whether it was closed
+    try:
+        for i in range(n):
+            if log is not None:
+                log.append(i)
+            yield (f"step {i}", i + 1, n)
+        return "built"
+    finally:
+        if log is not None:
+            log.append("closed")
+
+def test_start_runs_to_done(scheduler, fake_editor):
+    job = scheduler.SlicedBuild(steps(5)).start()
+    assert job.state == scheduler.RUNNING and job in scheduler._active
+    fake_editor.pump_ticks(100)
+    assert job.state == scheduler.DONE and job.result == "built"
+    assert (job.done, job.total) == (5, 5)
+    assert not fake_editor._tick_callbacks and job not in scheduler._active
+
+def test_budget_slices_one_step_per_tick(scheduler, fake_editor):
+    job = scheduler.SlicedBuild(steps(5), budget_ms=0.0).start()
+    assert fake_editor.pump_ticks(2) == 2
+    assert (job.done, job.label, job.ticks) == (2, "step 1", 2)
+    assert job._task.completed == 2
+
+def test_cancel_and_resume_continue_where_they_stopped(scheduler, fake_editor):
+    log = []
+    job = scheduler.SlicedBuild(steps(5, log), budget_ms=0.0).start()
+    fake_editor.pump_ticks(2)
+    job.cancel()
+    assert job.state == scheduler.CANCELLED and not fake_editor._tick_callbacks
+    # Cancelled jobs stay referenced so they can be resumed
+    assert job in scheduler._active
+    assert fake_editor.pump_ticks(3) == 0 and job.done == 2
+
+    job.resume()
+    assert job.state == scheduler.RUNNING
+    fake_editor.pump_ticks(100)
+    assert job.state == scheduler.DONE and log == [0, 1, 2, 3, 4, "closed"]
+    # New progress dialog picks up at the units already done
+    assert job.done == 5
+
+def test_dialog_cancel_button(scheduler, fake_editor):
+    job = scheduler.SlicedBuild(steps(5), budget_ms=0.0).start()
+    fake_editor.pump_ticks(1)
+    fake_editor.ScopedSlowTask.cancel_requested = True
+    fake_editor.pump_ticks(1)
+    assert job.state == scheduler.CANCELLED and job.done == 1
+    fake_editor.ScopedSlowTask.cancel_requested = False
+    job.resume()
+    fake_editor.pump_ticks(100)
+    assert job.state == scheduler.DONE
+
+def test_abort_closes_the_work(scheduler, fake_editor):
+    log = []
+    job = scheduler.SlicedBuild(steps(5, log), budget_ms=0.0).start()
+    fake_editor.pump_ticks(2)
+    job.abort()
+    assert job.state == scheduler.FAILED and log == [0, 1, "closed"]
+    assert not fake_editor._tick_callbacks and job not in scheduler._active
+    # Neither resume nor start revive an aborted job
+    assert job.resume().start().state == scheduler.FAILED and not fake_editor._tick_callbacks
+
+def test_failure_stops_and_reraises(scheduler, fake_editor):
+    def broken():
+        yield ("step 0", 1, 2)
+        raise ValueError("boom")
+
+    job = scheduler.SlicedBuild(broken(), budget_ms=0.0).start()
+    fake_editor.pump_ticks(1)
+    with pytest.raises(ValueError):
+        fake_editor.pump_ticks(1)
+    assert job.state == scheduler.FAILED and isinstance(job.error, ValueError)
+    assert not fake_editor._tick_callbacks and job not in scheduler._active
+
+# -------------- Pipeline build --------------
+def test_run_sliced_builds_the_pipeline(scheduler, pipeline, fake_editor):
+    job = scheduler.run_sliced(budget_ms=0.0)
+    fake_editor.pump_ticks(10000)
+    assert job.state == scheduler.DONE
+    assert pipeline.MASTER_MAT in job.result and job.ticks > len(job.result)
+    assert fake_editor.EditorAssetLibrary.does_asset_exist(pipeline.MASTER_MAT)
+
+def test_abort_mid_asset_drops_the_partial_asset(scheduler, pipeline, fake_editor, tmp_path):
+    job = scheduler.run_sliced(budget_ms=0.0)
+    while ": " not in job.label or pipeline.MASTER_MAT not in job.label:
+        assert fake_editor.pump_ticks(1) == 1
+    assert fake_editor.EditorAssetLibrary.does_asset_exist(pipeline.MASTER_MAT)
+    job.abort()
+    assert not fake_editor.EditorAssetLibrary.does_asset_exist(pipeline.MASTER_MAT)
+    # Nothing was saved or recorded, so the next build starts clean and completes
+    assert not build_cache.package_file(tmp_path, pipeline.MASTER_MAT).exists()
+    assert pipeline.MASTER_MAT in pipeline.main()
+
+def test_traced_build_unwraps_while_cancelled(scheduler, pipeline, fake_editor, tmp_path):
+    import json
+    mat_lib, build_master = pipeline.mat_lib, pipeline.build_master
+    trace = tmp_path / "trace.json"
+    job = scheduler.run_sliced(budget_ms=0.0, trace=trace)
+    assert pipeline.mat_lib is not mat_lib and pipeline.build_master is not build_master
+    while pipeline.MASTER_MAT not in job.label:
+        fake_editor.pump_ticks(1)
+    job.cancel()
+    assert pipeline.mat_lib is mat_lib and pipeline.build_master is build_master
+    assert not trace.exists()
+    job.resume()
+    assert pipeline.mat_lib is not mat_lib
+    fake_editor.pump_ticks(10000)
+    assert job.state == scheduler.DONE
+    assert pipeline.mat_lib is mat_lib and pipeline.build_master is build_master
+    # One trace for the whole job, spans from before and after the cancel
+    names = {e["name"] for e in json.loads(trace.read_text())["traceEvents"]}
+    assert {"check_graphs", "build_mf_uv", "build_master", "build_layers_master"} <= names
@@ -0,0 +1,52 @@
+# graph_check.check_pins: pins named in the builder sources against the declared function pins and
+# Custom node declarations, checked before the build creates anything.
+import pytest
+
+from Scripts import fake_unreal, graph_check
+
+def test_builders_have_no_pin_problems(pipeline):
+    pipeline.load_config()
+    assert pipeline.pin_problems() == []
+
+def test_wrong_function_pin_aborts_before_any_asset(pipeline, monkeypatch):
+    def add_normal_blend(mat, normal_ts, normal_ws, mf_rvt, weight, far, pos):
+        node = pipeline.mat_lib.create_material_expression(mat, fake_unreal.MaterialExpressionCustom, pos[0], pos[1])
+        node.inputs = [fake_unreal.CustomInput(input_name=f"Input{n}") for n in range(4)]
+        pipeline.connect(normal_ws, "", node, "Input0")
+        pipeline.connect(mf_rvt, "Normal", node, "Input1")
+        return node
+
+    monkeypatch.setattr(pipeline, "add_normal_blend", add_normal_blend)
+    with pytest.raises(RuntimeError, match="nothing was built"):
+        pipeline.main()
+    assert "AssetTools.create_asset" not in fake_unreal.call_counts()
+    assert fake_unreal._assets == {}
+
+def test_reports_unknown_and_ambiguous_pins(pipeline):
+    def builder():
+        mf_rvt = pipeline.mat_lib.create_material_expression(None, fake_unreal.MaterialExpressionMaterialFunctionCall, 0, 0)
+        mf_rvt.set_editor_property("material_function", fake_unreal.load_object(None, MF_RVT))
+        lod = pipeline.mat_lib.create_material_expression(None, fake_unreal.MaterialExpressionCustom, 0, 0)
+        lod.inputs = [fake_unreal.CustomInput(input_name=f"Input{n}") for n in range(2)]
+        lod.additional_outputs = [fake_unreal.CustomOutput(output_name="LodMipBias")]
+        pipeline.connect(mf_rvt, "", lod, "Input0")           # several outputs, none named
+        pipeline.connect(lod, "LodMipBais", mf_rvt, "MipBias")  # no such Custom output
+        pipeline.connect(lod, "", mf_rvt, "Mip")                # no such function input
+        pipeline.connect(lod, "", lod, "Input2")                # no such Custom input
+
+    MF_RVT = "/Game/MF_RVT_Read"
+    pins = {MF_RVT: ({"MipBias": "SCALAR"}, ("BaseColor", "Height"))}
+    problems = graph_check.check_pins([builder], pins, {"MF_RVT": MF_RVT})
+    assert len(problems) == 4
+    assert "without an output pin" in problems[0]
+    assert "lod.LodMipBais" in problems[1] and "additional outputs: LodMipBias" in problems[1]
+    assert "mf_rvt.Mip:" in problems[2]
+    assert "lod.Input2" in problems[3] and "inputs: Input0, Input1" in problems[3]
+
+def test_undeclared_function_pin_fails_at_creation(pipeline):
+    pipeline.load_config()
+    func = pipeline.create_material_function(pipeline.MF_RVT)
+    with pytest.raises(KeyError):
+        pipeline.add_function_input(func, pipeline.MF_RVT, "Mip")
+    with pytest.raises(KeyError):
+        pipeline.add_function_output(func, pipeline.MF_RVT, "Normal", None)
@@ -0,0 +1,164 @@
+# HLSL semantics of the hlsl_snippets functions on fixed inputs. The expected values are worked out by
+# hand from the HLSL source (comments show the steps), so a reference that drifts from the HLSL fails
+# here even though the goldens (blessed from the reference itself) would follow it.
+import math
+
+import numpy as np
+import pytest
+
+from Scripts import hlsl_reference as ref
+from Scripts.pbr_rows import uv_affine_rows
+
+def f32(*v):
+    return np.array(v, dtype=np.float32)
+
+def const_sampler(value):
+    # Base.Sample(SS, uv) of a texture that is the same everywhere
+    return lambda tex, uv: np.broadcast_to(f32(*value), uv.shape[:-1] + (len(value),))
+
+def uv_sampler(tex, uv):
+    # Returns the UV it was asked for, to see which projection a planar sample used
+    return np.asarray(uv, dtype=np.float32)
+
+def test_goldens_current():
+    assert ref.check() == []
+
+# -------------- Normal blends --------------
+def test_blend_ac():
+    # normalize(lerp(normalize((0,0,2)), normalize((2,0,0)), 0.5)) = normalize((0.5, 0, 0.5))
+    h = math.sqrt(0.5)
+    np.testing.assert_allclose(ref.blend_ac(f32(0, 0, 2), f32(2, 0, 0), 0.5), [h, 0, h], atol=1e-6)
+    np.testing.assert_allclose(ref.blend_ac(f32(0, 0, 2), f32(2, 0, 0), 0.0), [0, 0, 1], atol=1e-6)
+    np.testing.assert_allclose(ref.blend_ac(f32(0, 0, 2), f32(2, 0, 0), 1.0), [1, 0, 0], atol=1e-6)
+
+A = f32(0.6, 0.0, 0.8)
+B = f32(0.0, 0.6, 0.8)
+
+@pytest.mark.parametrize("blend", [ref.blend_rnm, ref.blend_whiteout])
+def test_tangent_blend_endpoints(blend):
+    # w = 0 keeps A: b = (0, 0, 1); w = 1 keeps B: the A terms are (0, 0, 1) (RNM: t.z * (t - (0,0,1)) = t.z * B)
+    np.testing.assert_allclose(blend(A, B, 0.0), A, atol=1e-6)
+    np.testing.assert_allclose(blend(A, B, 1.0), B, atol=1e-6)
+    np.testing.assert_allclose(blend(f32(0, 0, 1), f32(0, 0, 1), 0.5), [0, 0, 1], atol=1e-6)
+
+def test_blend_whiteout_half():
+    # b = (0, 0.3, lerp(1, 0.8, 0.5) = 0.9), d = (0.3, 0, 0.9) -> normalize((0.3, 0.3, 0.81))
+    np.testing.assert_allclose(ref.blend_whiteout(A, B, 0.5), f32(0.3, 0.3, 0.81) / math.sqrt(0.8361), atol=1e-6)
+
+def test_blend_udn_endpoints():
+    # UDN keeps b.z: w = 0 gives normalize((A.xy, 1)), not A; w = 1 gives B
+    np.testing.assert_allclose(ref.blend_udn(A, B, 0.0), f32(0.6, 0, 1) / math.sqrt(1.36), atol=1e-6)
+    np.testing.assert_allclose(ref.blend_udn(A, B, 1.0), B, atol=1e-6)
+
+def test_blend_udn_half():
+    # b = (0, 0.3, 0.9); xy = b.xy + A.xy * 0.5 = (0.3, 0.3) -> normalize((0.3, 0.3, 0.9))
+    np.testing.assert_allclose(ref.blend_udn(A, B, 0.5), f32(0.3, 0.3, 0.9) / math.sqrt(0.99), atol=1e-6)
+
+# -------------- Height / UV --------------
+@pytest.mark.parametrize("h_a, h_b, balance, expected", [
+    (0.3, 0.3, 0.5, 0.5),       # d = 0: t = (0 + 0.2) / 0.4 = 0.5 -> 0.5
+    (0.3, 0.4, 0.5, 0.84375),   # d = 0.1: t = 0.75 -> 0.5625 * 1.5
+    (0.4, 0.3, 0.5, 0.15625),   # d = -0.1: t = 0.25 -> 0.0625 * 2.5
+    (0.3, 0.3, 1.0, 1.0),       # off = 1 pushes d past the edge
+    (0.3, 0.3, 0.0, 0.0),       # off = -1
+    (0.3, 0.3, 2.0, 1.0),       # balance saturates to 1
+])
+def test_height_weight(h_a, h_b, balance, expected):
+    assert ref.height_weight(f32(h_a), f32(h_b), 0.2, balance) == pytest.approx(expected, abs=1e-6)
+
+def test_rotate2d():
+    # p = (1, 0.5) - 0.5 = (0.5, 0); 90 deg: (p.x*0 - 0, p.x*1 + 0) = (0, 0.5) -> (0.5, 1)
+    np.testing.assert_allclose(ref.rotate2d(f32(1.0, 0.5), 90.0), [0.5, 1.0], atol=1e-6)
+    np.testing.assert_allclose(ref.rotate2d(f32(0.0, 0.0), 180.0), [1.0, 1.0], atol=1e-6)
+
+def test_uv_affine():
+    # (dot((1, 2), (2, 3)) + 5, dot((0, -1), (2, 3)) + 1) = (13, -2); .w is unused
+    np.testing.assert_allclose(ref.uv_affine(f32(2, 3), f32(1, 2, 5, 9), f32(0, -1, 1, 9)), [13, -2])
+
+def test_uv_affine_rows_match_uv_block():
+    # MF_UVBlock_PBR with scale 2, 90 deg, offset (0.25, 0) on uv (0.5, 0.25):
+    # uv * 2 = (1, 0.5) -> Rotate2D -> (0.5, 1) -> + offset = (0.75, 1)
+    u, v = uv_affine_rows(2.0, 90.0, 0.25, 0.0)
+    np.testing.assert_allclose(ref.uv_affine(f32(0.5, 0.25), f32(*u, 0), f32(*v, 0)), [0.75, 1.0], atol=1e-6)
+
+# -------------- Planar projections --------------
+WP = f32(1, 2, 3)
+
+def test_triplanar_sample_projections():
+    # NW = +Z: w = (0, 0, 1), only uvZ = WP.xy is read
+    np.testing.assert_allclose(ref.triplanar_sample(None, uv_sampler, WP, f32(0, 0, 1), 1.0, 4.0), [1, 2])
+    # NW = (1, 1, 0), sharpness 1: w = (0.5, 0.5, 0): 0.5 * WP.zy + 0.5 * WP.xz = 0.5 * (3, 2) + 0.5 * (1, 3)
+    np.testing.assert_allclose(ref.triplanar_sample(None, uv_sampler, WP, f32(1, 1, 0), 1.0, 1.0), [2, 2.5], atol=1e-6)
+
+def test_dominant_axis_sample_projection():
+    # |NW| = (0.2, 0.9, 0.1): major axis y -> WP.xz * tiling
+    np.testing.assert_allclose(ref.dominant_axis_sample(None, uv_sampler, WP, f32(0.2, -0.9, 0.1), 2.0, 4.0), [2, 6])
+
+def test_biplanar_sample_weights():
+    # |NW| = (0.6, 0, 0.8), sharpness 1: major z (WP.xy), median x (WP.zy);
+    # (0.8 * (1, 2) + 0.6 * (3, 2)) / 1.4
+    expected = (0.8 * f32(1, 2) + 0.6 * f32(3, 2)) / 1.4
+    np.testing.assert_allclose(ref.biplanar_sample(None, uv_sampler, WP, f32(0.6, 0, 0.8), 1.0, 1.0), expected, atol=1e-6)
+
+FLAT = (0.5, 0.5, 1.0, 1.0)
+
+@pytest.mark.parametrize("fn", [ref.triplanar_normal, ref.biplanar_normal, ref.dominant_axis_normal])
+@pytest.mark.parametrize("nw", [(0, 0, 1), (0.6, 0, 0.8), (0, -1, 0), (0.48, 0.6, -0.64)])
+def test_planar_normal_flat_map_is_identity(fn, nw):
+    # A flat map unpacks to t = (0, 0, 1); every projection's whiteout gives (N + 0) with |t.z| * N on the
+    # axis itself, i.e. N, so the blend is N for any weights
+    np.testing.assert_allclose(fn(None, const_sampler(FLAT), WP, f32(*nw), 1.0, 4.0), nw, atol=1e-6)
+
+def test_dominant_axis_normal_detail():
+    # s.xy = (0.75, 0.5) -> t = (0.5, 0, sqrt(0.75)); on +Z: (t.xy + N.xy, |t.z| * N.z) = (0.5, 0, 0.866)
+    out = ref.dominant_axis_normal(None, const_sampler((0.75, 0.5, 0, 0)), WP, f32(0, 0, 1), 1.0, 4.0)
+    np.testing.assert_allclose(out, [0.5, 0, math.sqrt(0.75)], atol=1e-6)
+
+def test_planar_normal_ws_swizzles():
+    # t = (0.5, 0, 0.866); axis 0 (zy projection): (|t.z| * N.x, t.y + N.y, t.x + N.z) for N = +X
+    out = ref.planar_normal_ws(f32(0.75, 0.5, 0, 0), f32(1, 0, 0), np.int64(0))
+    np.testing.assert_allclose(out, [math.sqrt(0.75), 0, 0.5], atol=1e-6)
+
+# -------------- Layers --------------
+def test_layer_weights():
+    # s = m + h = (1.5, 1.2); top = 1.5; c = 0.5: w = (0.5, 0.2) / 0.7
+    m = f32(1, 1, 0, 0, 0, 0, 0, 0)
+    h = f32(0.5, 0.2, 0.9, 0, 0, 0, 0, 0)
+    np.testing.assert_allclose(ref.layer_weights(m, h, 8, 0.5)[:2], [5 / 7, 2 / 7], atol=1e-6)
+    # n = 1 ignores layer 1; layer 2 has no mask
+    np.testing.assert_allclose(ref.layer_weights(m, h, 1, 0.5), [1, 0, 0, 0, 0, 0, 0, 0], atol=1e-6)
+
+# -------------- Distance LOD --------------
+@pytest.mark.parametrize("svpos, expected", [
+    ((0.5, 0.5), 0.5 / 16),    # q = (0, 0): b = 0
+    ((2.5, 0.5), 8.5 / 16),    # q = (1, 0): lo = (1, 0): b = 4 * (2 * 1 + 0)
+    ((2.5, 2.5), 4.5 / 16),    # q = (1, 1): lo = (1, 1): b = 4 * (0 + 1)
+    ((4.5, 4.5), 1.5 / 16),    # q = (2, 2): hi = (1, 1): b = 2 * 0 + 1
+    ((4.5, 0.5), 2.5 / 16),    # q = (2, 0): hi = (1, 0): b = 2 * 1 + 0
+])
+def test_dither_threshold(svpos, expected):
+    assert ref.dither_threshold(f32(*svpos)) == pytest.approx(expected)
+
+def test_dither_threshold_covers_all_levels():
+    # Every 8x8 pixel block (4x4 quads) holds each of the 16 thresholds once per quad
+    ys, xs = np.mgrid[0:8, 0:8]
+    t = ref.dither_threshold(np.stack([xs, ys], axis=-1).astype(np.float32) + 0.5)
+    assert sorted(set(t.ravel().tolist())) == [(b + 0.5) / 16 for b in range(16)]
+
+def test_distance_lod():
+    # fade = (6000 - 5000) / 2000 = 0.5; thresholds 0.5/16 (far) and 8.5/16 (near)
+    assert ref.distance_fade(f32(6000), 5000.0, 2000.0) == pytest.approx(0.5)
+    assert ref.distance_fade(f32(5001), 5000.0, 0.0) == 1.0     # range clamps to 1e-3
+    assert ref.distance_lod(f32(6000), 5000.0, 2000.0, f32(0.5, 0.5)) == 1.0
+    assert ref.distance_lod(f32(6000), 5000.0, 2000.0, f32(2.5, 0.5)) == 0.0
+
+def test_distance_mip_bias():
+    # 0.5 + 1 * log2(20000 / 5000) = 2.5; nearer than start adds nothing
+    assert ref.distance_mip_bias(f32(20000), 0.5, 5000.0, 1.0) == pytest.approx(2.5)
+    assert ref.distance_mip_bias(f32(1000), 0.5, 5000.0, 1.0) == pytest.approx(0.5)
+
+def test_lod_sample_normal():
+    # s.xy = (1, 0.5) -> xy = (1, 0), z = sqrt(saturate(0)) = 0, w = 1; far pixels return 0
+    sampler = const_sampler((1.0, 0.5, 0.0, 1.0))
+    uv = np.zeros((2, 2), dtype=np.float32)
+    np.testing.assert_allclose(ref.lod_sample_normal(None, sampler, uv, f32(0.0, 1.0)), [[1, 0, 0, 1], [0, 0, 0, 0]])
@@ -0,0 +1,201 @@
+# material_graph on small graphs built against fake_unreal: snapshot / diff / in-place patch, and
+# optimize on the wasted-node patterns the builders used to emit (TexCoord + 0, duplicate normal /
+# Transform, unused outputs).
+import pytest
+
+@pytest.fixture
+def material_graph(fake_editor):
+    # Imports unreal, so only after fake_unreal is installed
+    from Scripts import material_graph
+    return material_graph
+
+def new_asset(unreal, name, asset_class):
+    factory = unreal.MaterialFunctionFactoryNew() if asset_class is unreal.MaterialFunction else unreal.MaterialFactoryNew()
+    asset = unreal.AssetToolsHelpers.get_asset_tools().create_asset(name, "/Game/Test", asset_class, factory)
+    if asset_class is unreal.Material:
+        asset.set_editor_property("use_material_attributes", True)
+    return asset
+
+def node(unreal, asset, kind, x=0, y=0):
+    return unreal.MaterialEditingLibrary.create_material_expression(asset, getattr(unreal, f"MaterialExpression{kind}"), x, y)
+
+def kinds(asset):
+    return sorted(e.kind for e in asset.expressions)
+
+def uv_function(unreal):
+    # (TexCoord + float2(0,0)) * UV_Scale -> UV_Main
+    func = new_asset(unreal, "MF_UV", unreal.MaterialFunction)
+    texcoord = node(unreal, func, "TextureCoordinate")
+    zero = node(unreal, func, "Constant2Vector", 0, 100)
+    zero.constant_x = 0.0
+    zero.constant_y = 0.0
+    add = node(unreal, func, "Add", 200)
+    add.a = texcoord
+    add.b = zero
+    scale = node(unreal, func, "FunctionInput", 200, 100)
+    scale.input_name = "UV_Scale"
+    mult = node(unreal, func, "Multiply", 400)
+    mult.a = add
+    mult.b = scale
+    out = node(unreal, func, "FunctionOutput", 600)
+    out.output_name = "UV_Main"
+    out.a = mult
+    return func, texcoord, mult
+
+def normal_material(unreal):
+    # Two PixelNormalWS, each through its own tangent -> world Transform, plus an unused FunctionOutput
+    # (rvt_bc) and an AppendVector feeding nothing (debug_bc)
+    mat = new_asset(unreal, "M_Test", unreal.Material)
+    transforms = []
+    for i in range(2):
+        normal = node(unreal, mat, "PixelNormalWS", -1300, -260 + i * 300)
+        trans = node(unreal, mat, "Transform", -1100, -260 + i * 300)
+        trans.transform_source_type = unreal.MaterialVectorCoordTransformSource.TANGENT
+        trans.transform_type = unreal.MaterialVectorCoordTransformType.WORLD
+        trans.input = normal
+        transforms.append(trans)
+    vcol = node(unreal, mat, "VertexColor", -1300, -700)
+    make = node(unreal, mat, "MakeMaterialAttributes", 350, -750)
+    make.base_color = vcol
+    make.normal = transforms[0]
+    rvt_out = node(unreal, mat, "RuntimeVirtualTextureOutput", -600, -750)
+    rvt_out.world_normal = transforms[1]
+    rvt_bc = node(unreal, mat, "FunctionOutput", -1400, -730)
+    rvt_bc.a = vcol
+    debug_bc = node(unreal, mat, "AppendVector", 900, -640)
+    debug_bc.a = vcol
+    debug_bc.b = vcol
+    mat.material_attributes = make
+    return mat, transforms, rvt_out
+
+def tint_material(unreal, name, tint=0.5, scaled=False):
+    # Tint * BaseColor -> MaterialAttributes; `scaled` puts a Multiply by Scale between Tint and the product
+    mat = new_asset(unreal, name, unreal.Material)
+    tint_param = node(unreal, mat, "ScalarParameter", -600, 0)
+    tint_param.parameter_name = "Tint"
+    tint_param.default_value = tint
+    color = node(unreal, mat, "VectorParameter", -600, 100)
+    color.parameter_name = "BaseColor"
+    source = tint_param
+    if scaled:
+        scale = node(unreal, mat, "ScalarParameter", -600, 200)
+        scale.parameter_name = "Scale"
+        source = node(unreal, mat, "Multiply", -400, 0)
+        unreal.MaterialEditingLibrary.connect_material_expressions(tint_param, "", source, "A")
+        unreal.MaterialEditingLibrary.connect_material_expressions(scale, "", source, "B")
+    mult = node(unreal, mat, "Multiply", -200, 0)
+    unreal.MaterialEditingLibrary.connect_material_expressions(source, "", mult, "A")
+    unreal.MaterialEditingLibrary.connect_material_expressions(color, "", mult, "B")
+    make = node(unreal, mat, "MakeMaterialAttributes", 0, 0)
+    unreal.MaterialEditingLibrary.connect_material_expressions(mult, "", make, "BaseColor")
+    unreal.MaterialEditingLibrary.connect_material_property(make, "", unreal.MaterialProperty.MP_MATERIAL_ATTRIBUTES)
+    return mat
+
+def patch(material_graph, live, staged):
+    before, target = material_graph.GraphSnapshot(live), material_graph.GraphSnapshot(staged)
+    diff = material_graph.diff_graphs(before, target)
+    material_graph.apply_diff(live, diff, before, target)
+    return diff
+
+# -------------- Diff / patch --------------
+def test_same_graph_diffs_empty(fake_editor, material_graph):
+    live = tint_material(fake_editor, "M_Live")
+    staged = tint_material(fake_editor, "M_Staged")
+    diff = material_graph.diff_graphs(material_graph.GraphSnapshot(live), material_graph.GraphSnapshot(staged))
+    assert diff.empty
+
+def test_one_parameter_change_sets_one_property(fake_editor, material_graph, monkeypatch):
+    live = tint_material(fake_editor, "M_Live")
+    staged = tint_material(fake_editor, "M_Staged", tint=0.8)
+    exprs = list(live.expressions)
+    copied = []
+    copy_property = material_graph._copy_property
+    monkeypatch.setattr(material_graph, "_copy_property", lambda src, dst, prop: copied.append(prop) or copy_property(src, dst, prop))
+    diff = patch(material_graph, live, staged)
+    assert diff.changed == {"ScalarParameter:Tint": ["default_value"]}
+    assert not (diff.added or diff.removed or diff.recreated or diff.relinked or diff.roots)
+    assert copied == ["default_value"]
+    assert live.expressions == exprs
+    assert exprs[0].default_value == 0.8
+
+def test_added_and_removed_node_with_links(fake_editor, material_graph):
+    live = tint_material(fake_editor, "M_Live")
+    scaled = tint_material(fake_editor, "M_Scaled", scaled=True)
+    kept = {id(e) for e in live.expressions}
+    diff = patch(material_graph, live, scaled)
+    assert sorted(diff.added) == ["Multiply@-400,0", "ScalarParameter:Scale"]
+    assert diff.relinked == {"Multiply@-200,0": ["A"]} and not diff.removed
+    assert material_graph.diff_graphs(material_graph.GraphSnapshot(live), material_graph.GraphSnapshot(scaled)).empty
+    assert kept <= {id(e) for e in live.expressions}
+
+    # And back: the Multiply and Scale go, the product reads Tint again. A removed link has no
+    # disconnect call, so the consumer is recreated.
+    plain = tint_material(fake_editor, "M_Plain")
+    diff = patch(material_graph, live, plain)
+    assert sorted(diff.removed) == ["Multiply@-400,0", "ScalarParameter:Scale"] and not diff.added
+    assert material_graph.diff_graphs(material_graph.GraphSnapshot(live), material_graph.GraphSnapshot(plain)).empty
+    assert len(live.expressions) == 4
+
+def test_unchanged_rebuild_is_not_recompiled(pipeline, capsys):
+    from Scripts import fake_unreal
+    pipeline.main()
+    master = fake_unreal.load_asset(pipeline.MASTER_MAT)
+    exprs = list(master.expressions)
+    capsys.readouterr()
+    fake_unreal.stats.clear()
+    # Forced: the instance and RVT are rebuilt, the graphs come out identical
+    assert pipeline.main(force=True) == [pipeline.MI_BASE, pipeline.RVT_ASSET]
+    out = capsys.readouterr().out
+    assert f" = {pipeline.MASTER_MAT} (graph unchanged)" in out
+    counts = fake_unreal.call_counts()
+    assert "MaterialEditingLibrary.recompile_material" not in counts
+    assert "MaterialEditingLibrary.recompile_material_function" not in counts
+    assert fake_unreal.load_asset(pipeline.MASTER_MAT) is master and master.expressions == exprs
+    assert not any("_Staging" in path for path in fake_unreal._assets)
+
+# -------------- Optimize --------------
+def test_folds_identity_add(fake_editor, material_graph):
+    func, texcoord, mult = uv_function(fake_editor)
+    stats = material_graph.optimize(func)
+    assert (stats.folded, stats.merged, stats.dead) == (1, 0, 1)
+    assert kinds(func) == ["FunctionInput", "FunctionOutput", "Multiply", "TextureCoordinate"]
+    assert material_graph.read_links(func, mult)["a"] == (texcoord, "")
+
+def test_keeps_add_that_would_widen(fake_editor, material_graph):
+    # scalar + float2(0,0) is a float2: not an identity
+    func, texcoord, mult = uv_function(fake_editor)
+    scalar = node(fake_editor, func, "ScalarParameter", -200)
+    scalar.parameter_name = "Offset"
+    add = next(e for e in func.expressions if e.kind == "Add")
+    add.a = scalar
+    stats = material_graph.optimize(func)
+    assert stats.folded == 0
+    assert "Add" in kinds(func)
+
+def test_merges_duplicate_normal_and_transform(fake_editor, material_graph):
+    mat, transforms, rvt_out = normal_material(fake_editor)
+    stats = material_graph.optimize(mat)
+    assert stats.merged == 2
+    assert kinds(mat).count("PixelNormalWS") == 1 and kinds(mat).count("Transform") == 1
+    assert material_graph.read_links(mat, rvt_out)["world_normal"] == (transforms[0], "")
+
+def test_removes_dead_outputs(fake_editor, material_graph):
+    mat, _, _ = normal_material(fake_editor)
+    stats = material_graph.optimize(mat)
+    assert stats.dead == 2
+    assert "FunctionOutput" not in kinds(mat) and "AppendVector" not in kinds(mat)
+    assert "VertexColor" in kinds(mat)
+
+def test_reports_removed_count(fake_editor, material_graph):
+    mat, _, _ = normal_material(fake_editor)
+    before = len(mat.expressions)
+    stats = material_graph.optimize(mat)
+    assert stats.removed == before - len(mat.expressions) == 4
+    assert stats.summary() == "4 nodes removed (0 folded, 2 merged, 2 dead)"
+    fresh = material_graph.GraphSnapshot(mat)
+    assert sorted(stats.snapshot.nodes) == sorted(fresh.nodes)
+    assert stats.snapshot.roots == fresh.roots
+
+def test_builders_emit_nothing_to_remove(pipeline, capsys):
+    pipeline.main()
+    assert "nodes removed" not in capsys.readouterr().out
@@ -0,0 +1,31 @@
+# rvt_baker: bake.json loading and the slope source of the layer mix (numpy only, no editor).
+import json
+
+import numpy as np
+
+from Scripts import rvt_baker
+
+def test_bake_config_inputs_are_relative_to_the_file(tmp_path, monkeypatch):
+    folder = tmp_path / "bakes"
+    folder.mkdir()
+    (folder / "bake.json").write_text(json.dumps({"inputs": {"base_color": "maps/bc.npy", "orm": str(tmp_path / "orm.npy")}}))
+    monkeypatch.chdir(tmp_path)
+    cfg = rvt_baker.load_bake_config("bakes/bake.json")
+    assert cfg["inputs"]["base_color"] == str(folder / "maps" / "bc.npy")
+    assert cfg["inputs"]["orm"] == str(tmp_path / "orm.npy")
+
+def test_slope_follows_vertex_interpolators():
+    # Flat per-pixel normal (no slope), vertical vertex normal (full slope): the weight tells which was used
+    shape = (2, 2)
+    src = {
+        "base_color": np.zeros(shape + (3,), np.float32), "orm": np.zeros(shape + (3,), np.float32),
+        "height": np.zeros(shape, np.float32),
+        "normal": np.broadcast_to(np.array([0, 0, 1], np.float32), shape + (3,)),
+        "surface_normal": np.broadcast_to(np.array([1, 0, 0], np.float32), shape + (3,)),
+        "rvt_base_color": np.ones(shape + (3,), np.float32), "rvt_normal": np.broadcast_to(np.array([0, 0, 1], np.float32), shape + (3,)),
+        "rvt_roughness": np.zeros(shape, np.float32), "rvt_height": np.zeros(shape, np.float32),
+    }
+    per_pixel = rvt_baker.mix_layers(src, config={"vertex_interpolators": False})
+    per_vertex = rvt_baker.mix_layers(src, config={"vertex_interpolators": True})
+    np.testing.assert_allclose(per_pixel["BaseColor"], 0.0)
+    np.testing.assert_allclose(per_vertex["BaseColor"], 1.0)
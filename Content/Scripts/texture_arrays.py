@@ -0,0 +1,122 @@
+# Texture2DArray builder for M_PBR_Layers: one slice per FPBR_RVT_Row, in row order.
+# Offline (no editor): stacks the rows' source images into BaseColor / Normal / ORMH arrays, ORMH being
+# ORM with Height packed into alpha (texture_packer.py); .npy sources are memory-mapped and streamed.
+#   cd Content && python -m Scripts.texture_arrays <rows.csv|rows.json> <src_dir> <out_dir> [--name TA_PBR_Layers]
+# In the editor, create_array_assets() builds the same arrays as Texture2DArray assets from the rows' textures.
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from Scripts.pbr_rows import iter_file_rows
+from Scripts.texture_packer import CHUNK_ROWS, IMAGE_EXTENSIONS, from_unit, open_image, pack_chunk
+
+DEFAULT_NAME = "TA_PBR_Layers"
+LAYER_MAX = 8
+
+# Array slot -> (row field for RGB, row field packed into alpha or None)
+ARRAY_SLOTS = {
+    "BaseColor": ("BaseColor", None),
+    "Normal": ("Normal", None),
+    "ORMH": ("ORM", "Height"),
+}
+
+# -------------- Rows --------------
+def read_layers(rows_path):
+    layers = [(name, row) for name, row in iter_file_rows(rows_path) if name]
+    if not 2 <= len(layers) <= LAYER_MAX:
+        raise ValueError(f"texture_arrays: {len(layers)} rows in {rows_path}, M_PBR_Layers takes 2..{LAYER_MAX}")
+    return layers
+
+def index_sources(src_dir):
+    # Texture asset name (file stem) -> source image
+    found = {}
+    for f in sorted(Path(src_dir).rglob("*")):
+        if f.suffix.lower() in IMAGE_EXTENSIONS:
+            found.setdefault(f.stem.lower(), f)
+    return found
+
+def source_for(sources, asset_path, layer, field):
+    if not asset_path:
+        raise ValueError(f"{layer}: no {field} texture in its row")
+    name = asset_path.split("/")[-1].split(".")[0]
+    if name.lower() not in sources:
+        raise FileNotFoundError(f"{layer}: no source image named {name}.* for {field}")
+    return sources[name.lower()]
+
+# -------------- Stacking --------------
+def stack_slot(layers, sources, slot, out_path, chunk_rows=CHUNK_ROWS):
+    rgb_field, alpha_field = ARRAY_SLOTS[slot]
+    images = []
+    for name, row in layers:
+        rgb = open_image(source_for(sources, row[rgb_field], name, rgb_field))
+        alpha = open_image(source_for(sources, row[alpha_field], name, alpha_field)) if alpha_field else None
+        images.append((name, rgb, alpha))
+    h, w = images[0][1].shape[:2]
+    dtype = images[0][1].dtype
+    for name, rgb, alpha in images:
+        for img in (rgb, alpha):
+            if img is not None and img.shape[:2] != (h, w):
+                raise ValueError(f"{slot}: layer {name} is {img.shape[1]}x{img.shape[0]}, array slices are {w}x{h}")
+
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=(len(images), h, w, 4))
+    for i, (_, rgb, alpha) in enumerate(images):
+        for y in range(0, h, chunk_rows):
+            rows = rgb[y:y + chunk_rows]
+            # Slices without a packed alpha get A = 1
+            top = alpha[y:y + chunk_rows] if alpha is not None else np.ones(rows.shape[:2] + (1,), np.float32)
+            out[i, y:y + chunk_rows] = from_unit(pack_chunk(rows, top), dtype)
+    out.flush()
+    return out.shape
+
+def build_arrays(rows_path, src_dir, out_dir, name=DEFAULT_NAME):
+    layers = read_layers(rows_path)
+    sources = index_sources(src_dir)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    manifest = {"layers": [layer for layer, _ in layers], "arrays": {}}
+    for slot in ARRAY_SLOTS:
+        out_path = out_dir / f"{name}_{slot}.npy"
+        shape = stack_slot(layers, sources, slot, out_path)
+        manifest["arrays"][slot] = {"file": out_path.name, "shape": list(shape)}
+        print(f"   {out_path} {shape[0]} x {shape[2]}x{shape[1]}")
+    # Slice order is the layer index M_PBR_Layers samples and the splat channel order (Splat0.r = layer 0)
+    (out_dir / f"{name}.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"texture_arrays: {len(layers)} layers -> {out_dir} in {time.perf_counter() - t0:.2f}s")
+    return manifest
+
+# -------------- Editor --------------
+def create_array_assets(rows_source, asset_prefix=None):
+    # Texture2DArray assets from the rows' Texture2Ds (same slice order); needs the editor.
+    # ORMH expects ORM textures that already carry Height in alpha (texture_packer.py, height_packing=orm_alpha).
+    import unreal
+    from Scripts import bulk_instances
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    pipeline.load_config()
+    prefix = asset_prefix or pipeline.LAYER_ARRAYS
+    folder, base = prefix.rsplit("/", 1)
+    pipeline.ensure_folder(folder)
+    layers = [(name, row) for name, row in bulk_instances.iter_rows(rows_source) if name]
+    textures = bulk_instances.TextureCache()
+    created = []
+    for slot, (rgb_field, _) in ARRAY_SLOTS.items():
+        path = f"{folder}/{base}_{slot}"
+        if unreal.EditorAssetLibrary.does_asset_exist(path):
+            array = unreal.EditorAssetLibrary.load_asset(path)
+        else:
+            array = pipeline.asset_tools.create_asset(f"{base}_{slot}", folder, unreal.Texture2DArray, unreal.Texture2DArrayFactory())
+        # Setting source_textures rebuilds the array from its slices
+        array.set_editor_property("source_textures", [textures.get(row[rgb_field]) for _, row in layers])
+        created.append(array)
+    unreal.EditorAssetLibrary.save_loaded_assets(created, only_if_is_dirty=False)
+    return created
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) < 3:
+        print("usage: python -m Scripts.texture_arrays <rows.csv|rows.json> <src_dir> <out_dir> [--name TA_PBR_Layers]")
+        sys.exit(1)
+    build_arrays(args[0], args[1], args[2], name=args[args.index("--name") + 1] if "--name" in args else DEFAULT_NAME)
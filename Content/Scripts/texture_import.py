@@ -0,0 +1,189 @@
+# Batched texture import for PBR source sets, feeding FPBR_RVT_Row entries.
+#   Editor:  py Scripts/texture_import.py <src_dir> <rows.json> [--reimport] [--datatable /Game/Path/DT_Rows]
+#   Offline: cd Content && python -m Scripts.texture_import <src_dir> <rows.json>   (plan + rows only)
+# Sets are found by file-name suffix (texture_packer.SLOT_SUFFIXES; packed _ORMH / _BCH files take the
+# ORM / BaseColor slot when height_packing is set). Files are imported in AssetImportTask batches
+# (automated, no dialogs), then every texture gets its slot's compression settings in one property
+# change, only where they differ, and each batch is saved at once. Rows use the imported asset paths.
+import json
+import sys
+import time
+from pathlib import Path
+
+from Scripts.texture_packer import CONFIG_PATH, IMAGE_EXTENSIONS, TARGETS, discover_sets
+from Scripts.texture_slots import SLOT_SETTINGS, virtual_texture_slots
+
+DEFAULT_FOLDER = "Textures"
+DEFAULT_BATCH = 64
+# Editor imports; .npy is an offline-only format
+IMPORT_EXTENSIONS = tuple(e for e in IMAGE_EXTENSIONS if e != ".npy")
+
+# Slot settings (SLOT_SETTINGS) live in texture_slots.py with the sampler types the masters use for them
+ENUM_SETTINGS = {"compression_settings": "TextureCompressionSettings", "lod_group": "TextureGroup"}
+
+# -------------- Config --------------
+def load_import_config(data):
+    # naming.json "texture_import": {"folder", "batch_size", "virtual_texture_slots"}
+    cfg = {"folder": DEFAULT_FOLDER, "batch_size": DEFAULT_BATCH, "virtual_texture_slots": []}
+    cfg.update(data.get("texture_import", {}))
+    cfg["virtual_texture_slots"] = virtual_texture_slots(data)
+    return cfg
+
+# -------------- Plan --------------
+def discover_import_sets(src_dir, height_packing="none"):
+    # -> {set name: {slot: path}}; with height packing the packed file takes its slot and Height is dropped
+    sets = discover_sets(src_dir)
+    if height_packing not in TARGETS:
+        return sets
+    slot, suffix = TARGETS[height_packing]
+    packed = set()
+    for f in sorted(Path(src_dir).rglob("*")):
+        if f.suffix.lower() in IMAGE_EXTENSIONS and f.stem.lower().endswith(suffix.lower()):
+            name = f.stem[:-len(suffix)]
+            sets.setdefault(name, {})[slot] = f
+            packed.add(name)
+    for name, slots in sets.items():
+        if name not in packed and "Height" in slots:
+            print(f"   {name}: no {suffix} file, run texture_packer first (Height is not imported with {height_packing})")
+        slots.pop("Height", None)
+    return sets
+
+def slot_settings(slot, packed=False, virtual_slots=()):
+    # Settings for one texture; BC1 instead of BC3 unless height is packed into its alpha
+    settings = dict(SLOT_SETTINGS[slot])
+    if slot in ("BaseColor", "ORM"):
+        settings["compression_no_alpha"] = not packed
+    settings["virtual_texture_streaming"] = slot in virtual_slots
+    return settings
+
+def plan_imports(sets, folder, height_packing="none", virtual_slots=()):
+    # -> [{set, slot, source, asset, settings}] in set order; unsupported files are reported and skipped
+    packed_slot = TARGETS[height_packing][0] if height_packing in TARGETS else None
+    items = []
+    for name, slots in sorted(sets.items()):
+        for slot, source in slots.items():
+            if Path(source).suffix.lower() not in IMPORT_EXTENSIONS:
+                print(f"   skip {source}: not an importable image")
+                continue
+            items.append({
+                "set": name,
+                "slot": slot,
+                "source": str(source),
+                "asset": f"{folder}/{name}/{Path(source).stem}",
+                "settings": slot_settings(slot, slot == packed_slot, virtual_slots),
+            })
+    return items
+
+def build_rows(items):
+    # FPBR_RVT_Row per set (pbr_rows / bulk_instances JSON format); missing slots stay None
+    rows = {}
+    for item in items:
+        rows.setdefault(item["set"], {"Name": item["set"], "BaseColor": None, "Normal": None, "ORM": None, "Height": None})
+        rows[item["set"]][item["slot"]] = item["asset"]
+    return list(rows.values())
+
+def write_rows(rows, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+def print_plan(items):
+    for item in items:
+        s = item["settings"]
+        print(f"   {item['asset']:<60} {s['compression_settings']:<13} {'sRGB' if s['srgb'] else 'linear':<7}"
+              f"{' VT' if s['virtual_texture_streaming'] else ''}")
+
+# -------------- Editor --------------
+def _resolve(settings, unreal):
+    return {k: getattr(getattr(unreal, ENUM_SETTINGS[k]), v) if k in ENUM_SETTINGS else v for k, v in settings.items()}
+
+def apply_settings(texture, settings, unreal):
+    # One property change (one recompress) with only the settings that differ; True if anything changed
+    wanted = _resolve(settings, unreal)
+    changed = {k: v for k, v in wanted.items() if texture.get_editor_property(k) != v}
+    if changed:
+        texture.set_editor_properties(changed)
+    return bool(changed)
+
+def import_task(item, unreal):
+    folder, name = item["asset"].rsplit("/", 1)
+    task = unreal.AssetImportTask()
+    task.set_editor_property("filename", item["source"])
+    task.set_editor_property("destination_path", folder)
+    task.set_editor_property("destination_name", name)
+    task.set_editor_property("replace_existing", True)
+    task.set_editor_property("automated", True)
+    task.set_editor_property("save", False)
+    factory = unreal.TextureFactory()
+    # Compressed once, after the slot settings are applied, not at import with the defaults
+    factory.set_editor_property("defer_compression", True)
+    task.set_editor_property("factory", factory)
+    return task
+
+def import_sets(src_dir, rows_path, reimport=False, datatable=None):
+    # Editor: import every set under src_dir, configure it and write the FPBR_RVT_Row JSON
+    import unreal
+    from Scripts import create_pbr_rvt_pipeline as pipeline
+    data = pipeline.load_config()
+    cfg = load_import_config(data)
+    folder = f"{pipeline.ROOT}/{cfg['folder']}".replace("//", "/")
+    items = plan_imports(discover_import_sets(src_dir, pipeline.HEIGHT_PACKING), folder, pipeline.HEIGHT_PACKING,
+                         cfg["virtual_texture_slots"])
+    ed_lib = unreal.EditorAssetLibrary
+    t0 = time.perf_counter()
+    imported = configured = 0
+    for start in range(0, len(items), cfg["batch_size"]):
+        batch = items[start:start + cfg["batch_size"]]
+        new = [item for item in batch if reimport or not ed_lib.does_asset_exist(item["asset"])]
+        if new:
+            pipeline.asset_tools.import_asset_tasks([import_task(item, unreal) for item in new])
+            imported += len(new)
+        textures = []
+        for item in batch:
+            texture = ed_lib.load_asset(item["asset"])
+            if texture is None:
+                unreal.log_warning(f"texture_import: {item['source']} was not imported")
+                continue
+            changed = apply_settings(texture, item["settings"], unreal)
+            configured += changed
+            # Imports are not saved by their task; existing textures only when reconfigured
+            if changed or item in new:
+                textures.append(texture)
+        if textures:
+            ed_lib.save_loaded_assets(textures, only_if_is_dirty=False)
+        print(f"   {start + len(batch)}/{len(items)} textures ({(start + len(batch)) / (time.perf_counter() - t0):.1f}/s)")
+
+    rows = build_rows(items)
+    write_rows(rows, rows_path)
+    if datatable:
+        table = ed_lib.load_asset(datatable)
+        unreal.DataTableFunctionLibrary.fill_data_table_from_json_string(table, json.dumps(rows))
+        ed_lib.save_loaded_assets([table], only_if_is_dirty=False)
+    print(f"texture_import: {len(rows)} sets, {imported} imported, {configured} reconfigured "
+          f"in {time.perf_counter() - t0:.2f}s -> {rows_path}")
+    return rows
+
+def plan_offline(src_dir, rows_path):
+    # No editor: print the plan and write the rows it would produce
+    data = json.loads(CONFIG_PATH.read_text(encoding="utf-8")) if CONFIG_PATH.exists() else {}
+    cfg = load_import_config(data)
+    packing = data.get("height_packing", "none")
+    folder = f"{data.get('root', '/Game')}/{cfg['folder']}".replace("//", "/")
+    items = plan_imports(discover_import_sets(src_dir, packing), folder, packing, cfg["virtual_texture_slots"])
+    print_plan(items)
+    rows = build_rows(items)
+    write_rows(rows, rows_path)
+    print(f"texture_import: {len(rows)} sets, {len(items)} textures planned -> {rows_path}")
+    return rows
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) < 2:
+        print("usage: texture_import.py <src_dir> <rows.json> [--reimport] [--datatable /Game/Path/DT_Rows]")
+        sys.exit(1)
+    try:
+        import unreal  # noqa: F401
+    except ImportError:
+        plan_offline(args[0], args[1])
+    else:
+        import_sets(args[0], args[1], reimport="--reimport" in args,
+                    datatable=args[args.index("--datatable") + 1] if "--datatable" in args else None)
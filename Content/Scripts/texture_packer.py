@@ -0,0 +1,176 @@
+# Offline channel packer: writes Height into the alpha of ORM or BaseColor (no editor needed).
+#   cd Content && python -m Scripts.texture_packer <src_dir> <out_dir> [--target orm_alpha|basecolor_alpha] [--workers N]
+# Texture sets are found by suffix (Rock_ORM.png + Rock_H.png -> Rock_ORMH.png). .npy sources are
+# memory-mapped and streamed in row chunks; other formats need Pillow and are decoded whole. PNGs are
+# written here (8 or 16 bits per channel, row chunks streamed): Pillow cannot write 16-bit RGBA.
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed for non-.npy images
+    Image = None
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "Config" / "naming.json"
+CHUNK_ROWS = 256
+
+# Texture slot -> accepted file-name suffixes (case-insensitive)
+SLOT_SUFFIXES = {
+    "BaseColor": ("_BaseColor", "_Albedo", "_BC", "_D"),
+    "Normal": ("_Normal", "_N"),
+    "ORM": ("_ORM",),
+    "Height": ("_Height", "_Disp", "_H"),
+}
+IMAGE_EXTENSIONS = (".npy", ".png", ".tga", ".tif", ".tiff", ".exr", ".jpg", ".jpeg")
+# height_packing -> (slot that receives height in alpha, suffix of the packed output)
+TARGETS = {"orm_alpha": ("ORM", "_ORMH"), "basecolor_alpha": ("BaseColor", "_BCH")}
+
+# -------------- Discovery --------------
+def split_slot(path):
+    stem = Path(path).stem
+    for slot, suffixes in SLOT_SUFFIXES.items():
+        for suffix in suffixes:
+            if stem.lower().endswith(suffix.lower()):
+                return stem[:-len(suffix)], slot
+    return None, None
+
+def discover_sets(src_dir):
+    # -> {set name: {slot: path}}
+    sets = {}
+    for f in sorted(Path(src_dir).rglob("*")):
+        if f.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        name, slot = split_slot(f)
+        if name:
+            sets.setdefault(name, {}).setdefault(slot, f)
+    return sets
+
+# -------------- Image IO --------------
+def open_image(path):
+    # (H, W, C) array; .npy stays memory-mapped
+    path = Path(path)
+    if path.suffix.lower() == ".npy":
+        img = np.load(path, mmap_mode="r")
+    else:
+        if Image is None:
+            raise RuntimeError(f"texture_packer: Pillow is required to read {path.name}")
+        img = np.asarray(Image.open(path))
+        if img.dtype.kind == "i":
+            # 16-bit grayscale opens as 32-bit integer mode "I"
+            img = np.clip(img, 0, 65535).astype(np.uint16)
+    return img[..., None] if img.ndim == 2 else img
+
+def write_png(path, shape, dtype, chunks):
+    # Streams (rows, W, C) uint8 / uint16 chunks into an unfiltered PNG, one IDAT per chunk
+    h, w, c = shape
+    bits = 16 if dtype == np.uint16 else 8
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[c]  # gray, gray + alpha, RGB, RGBA
+
+    def png_chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    z = zlib.compressobj(6)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, bits, color_type, 0, 0, 0)))
+        for rows in chunks:
+            # PNG samples are big-endian; each row starts with filter type 0
+            data = np.ascontiguousarray(rows, dtype=">u2" if bits == 16 else np.uint8).view(np.uint8)
+            data = np.concatenate([np.zeros((len(rows), 1), np.uint8), data.reshape(len(rows), -1)], axis=1)
+            packed = z.compress(data.tobytes())
+            if packed:
+                f.write(png_chunk(b"IDAT", packed))
+        f.write(png_chunk(b"IDAT", z.flush()))
+        f.write(png_chunk(b"IEND", b""))
+
+def to_unit(chunk):
+    if chunk.dtype == np.uint8:
+        return chunk.astype(np.float32) / 255.0
+    if chunk.dtype == np.uint16:
+        return chunk.astype(np.float32) / 65535.0
+    return chunk.astype(np.float32)
+
+def from_unit(chunk, dtype):
+    if dtype == np.uint8:
+        return np.round(np.clip(chunk, 0.0, 1.0) * 255.0).astype(np.uint8)
+    if dtype == np.uint16:
+        return np.round(np.clip(chunk, 0.0, 1.0) * 65535.0).astype(np.uint16)
+    return chunk.astype(dtype)
+
+def pack_chunk(rgb, height):
+    # RGB from the target texture, A = first channel of the height map
+    return np.concatenate([to_unit(rgb[..., :3]), to_unit(height[..., :1])], axis=-1)
+
+def pack_set(name, rgb_path, height_path, out_dir, suffix, chunk_rows=CHUNK_ROWS):
+    rgb = open_image(rgb_path)
+    height = open_image(height_path)
+    if rgb.shape[:2] != height.shape[:2]:
+        raise ValueError(f"{name}: {Path(rgb_path).name} is {rgb.shape[1]}x{rgb.shape[0]}, "
+                         f"{Path(height_path).name} is {height.shape[1]}x{height.shape[0]}")
+    h, w = rgb.shape[:2]
+    # Alpha keeps the RGB bit depth: a 16-bit height packed into an 8-bit texture loses precision.
+    # PNG holds 8 or 16 bits: float sources are written as 16-bit.
+    dtype = rgb.dtype
+    as_npy = Path(rgb_path).suffix.lower() == ".npy"
+    if not as_npy and dtype != np.uint8:
+        dtype = np.dtype(np.uint16)
+    out_path = Path(out_dir) / f"{name}{suffix}{'.npy' if as_npy else '.png'}"
+    chunks = (from_unit(pack_chunk(rgb[y:y + chunk_rows], height[y:y + chunk_rows]), dtype)
+              for y in range(0, h, chunk_rows))
+    if as_npy:
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=(h, w, 4))
+        for y, rows in zip(range(0, h, chunk_rows), chunks):
+            out[y:y + chunk_rows] = rows
+        out.flush()
+    else:
+        write_png(out_path, (h, w, 4), dtype, chunks)
+    return str(out_path), h * w
+
+def _pack_job(job):
+    return pack_set(*job)
+
+def pack_directory(src_dir, out_dir, target=None, workers=None, chunk_rows=CHUNK_ROWS):
+    if target is None:
+        target = "orm_alpha"
+        if CONFIG_PATH.exists():
+            target = json.loads(CONFIG_PATH.read_text(encoding="utf-8")).get("height_packing", "none")
+        if target == "none":
+            target = "orm_alpha"
+    slot, suffix = TARGETS[target]
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for name, slots in discover_sets(src_dir).items():
+        if slot in slots and "Height" in slots:
+            jobs.append((name, str(slots[slot]), str(slots["Height"]), str(out_dir), suffix, chunk_rows))
+        elif "Height" in slots:
+            print(f"   skip {name}: no {slot} texture to pack Height into")
+
+    t0 = time.perf_counter()
+    pixels = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for out_path, n in pool.map(_pack_job, jobs):
+            pixels += n
+            print(f"   {out_path}")
+    dt = time.perf_counter() - t0
+    print(f"texture_packer: {len(jobs)} sets -> {target} in {dt:.2f}s ({pixels / max(dt, 1e-9) / 1e6:.1f} Mpx/s)")
+    return len(jobs)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) < 2:
+        print("usage: python -m Scripts.texture_packer <src_dir> <out_dir> [--target orm_alpha|basecolor_alpha] [--workers N]")
+        sys.exit(1)
+    pack_directory(
+        args[0], args[1],
+        target=args[args.index("--target") + 1] if "--target" in args else None,
+        workers=int(args[args.index("--workers") + 1]) if "--workers" in args else None,
+    )
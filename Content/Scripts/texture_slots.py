@@ -0,0 +1,30 @@
+# Texture slots of M_PBR_Master / M_PBR_Layers: import settings (texture_import.py) and material sampler
+# types (create_pbr_rvt_pipeline.py) from one table, so a texture and the parameter sampling it agree.
+# No editor or numpy needed: both sides import it.
+
+# Slot -> (Texture2D settings as enum member names, MaterialSamplerType member).
+# BC5 normals, linear BC1/BC3 masks, G8/G16 height.
+SLOTS = {
+    "BaseColor": ({"compression_settings": "TC_DEFAULT", "srgb": True, "lod_group": "TEXTUREGROUP_WORLD"},
+                  "SAMPLERTYPE_COLOR"),
+    "Normal": ({"compression_settings": "TC_NORMALMAP", "srgb": False, "lod_group": "TEXTUREGROUP_WORLD_NORMAL_MAP"},
+               "SAMPLERTYPE_NORMAL"),
+    "ORM": ({"compression_settings": "TC_MASKS", "srgb": False, "lod_group": "TEXTUREGROUP_WORLD_SPECULAR"},
+            "SAMPLERTYPE_MASKS"),
+    "Height": ({"compression_settings": "TC_GRAYSCALE", "srgb": False, "lod_group": "TEXTUREGROUP_WORLD"},
+               "SAMPLERTYPE_LINEAR_GRAYSCALE"),
+}
+SLOT_SETTINGS = {slot: settings for slot, (settings, _) in SLOTS.items()}
+
+def virtual_texture_slots(data):
+    # naming.json "texture_import.virtual_texture_slots": slots imported with virtual texture streaming
+    slots = list(data.get("texture_import", {}).get("virtual_texture_slots", []))
+    unknown = [s for s in slots if s not in SLOTS]
+    if unknown:
+        raise ValueError(f"naming.json: texture_import.virtual_texture_slots must be in {sorted(SLOTS)}, got {unknown}")
+    return slots
+
+def sampler_type(slot, virtual_slots=()):
+    # MaterialSamplerType member name; a streaming virtual texture needs the VIRTUAL_ variant
+    name = SLOTS[slot][1]
+    return name.replace("SAMPLERTYPE_", "SAMPLERTYPE_VIRTUAL_") if slot in virtual_slots else name